@@ -2,13 +2,36 @@
 """
 MCP Server Inspector Tool
 Launches the MCP inspector to test and debug MCP servers.
+
+`uv sync` only runs when uv.lock, pyproject.toml or the virtual environment
+changed since the last successful sync. While the inspector starts, the
+research server's modules are byte-compiled in the background so the first
+connection does not pay for it. With
+--attach the inspector connects to an already running SSE research server
+instead of spawning one.
+
+`inspector load WORKLOAD [options]` runs a headless load test instead; see
+mcp_project/loadgen.py or `inspector load --help`.
 """
 
+import argparse
+import hashlib
 import os
-import sys
+import shutil
+import socket
 import subprocess
+import sys
+import threading
+import time
 import webbrowser
 from pathlib import Path
+from urllib.parse import urlparse
+
+DEFAULT_SSE_URL = "http://localhost:8000/sse"
+# Written inside the virtual environment, so a recreated .venv always re-syncs
+SYNC_FINGERPRINT_FILE = ".inspector-sync"
+# Printed by the inspector once its web UI is being served
+INSPECTOR_READY_MARKER = "up and running"
 
 
 def get_inspector_proxy_address():
@@ -17,46 +40,170 @@ def get_inspector_proxy_address():
     return "http://localhost:6277"
 
 
-def launch_inspector():
+class PhaseTimer:
+    """Records how long each startup phase took."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    def record(self, name, seconds):
+        self.phases[name] = seconds
+
+    def run(self, name, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self):
+        print("⏱️  Startup timings:")
+        for name, seconds in self.phases.items():
+            print(f"   {name:<18} {seconds:7.2f}s")
+        print(f"   {'total':<18} {time.perf_counter() - self.started:7.2f}s")
+
+
+def sync_fingerprint(project_dir):
+    """Hash the lockfile, project file and interpreter of the environment."""
+    digest = hashlib.sha256()
+    for name in ("uv.lock", "pyproject.toml", ".venv/pyvenv.cfg"):
+        path = project_dir / name
+        digest.update(name.encode())
+        digest.update(path.read_bytes() if path.exists() else b"missing")
+    return digest.hexdigest()
+
+
+def sync_dependencies(project_dir, force=False):
+    """Run `uv sync` unless nothing changed since the last one; return whether it ran."""
+    fingerprint = sync_fingerprint(project_dir)
+    marker = project_dir / ".venv" / SYNC_FINGERPRINT_FILE
+    if not force and marker.exists() and marker.read_text() == fingerprint:
+        return False
+
+    subprocess.run(["uv", "sync"], check=True, capture_output=True, cwd=project_dir)
+    # Syncing may create the environment, which changes the fingerprint
+    try:
+        marker.write_text(sync_fingerprint(project_dir))
+    except OSError:
+        # No writable .venv here (e.g. UV_PROJECT_ENVIRONMENT points
+        # elsewhere), so the next launch simply syncs again
+        pass
+    return True
+
+
+def prewarm_server(mcp_project_dir):
+    """Byte-compile the research server's modules with the project's interpreter."""
+    # Compiling rather than importing: an import would run the server's
+    # module-level setup (store, caches, vectors) in a second process
+    subprocess.run(
+        ["uv", "run", "--no-sync", "python3", "-m", "compileall", "-q", "-l", "."],
+        cwd=mcp_project_dir,
+        capture_output=True,
+    )
+
+
+def server_reachable(url, timeout=1.0):
+    """Return whether something is listening at the host and port of url."""
+    parsed = urlparse(url)
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def run_inspector(inspector_cmd, timer, prewarm=None):
+    """Run the inspector, recording how long it took to come up."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        inspector_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    ready = False
+    try:
+        for line in process.stdout:
+            print(line, end="")
+            if not ready and INSPECTOR_READY_MARKER in line:
+                ready = True
+                timer.record("inspector start", time.perf_counter() - start)
+                if prewarm is not None:
+                    prewarm.join()
+                timer.report()
+        process.wait()
+        if not ready:
+            timer.report()
+    except KeyboardInterrupt:
+        process.terminate()
+        process.wait()
+        raise
+
+
+def launch_inspector(attach_url=None, force_sync=False, prewarm=True):
     """Launch the MCP inspector with the research server."""
     print("🚀 Launching MCP Server Inspector...")
-    
+    timer = PhaseTimer()
+
     # Check if we're in the right directory
     project_dir = Path(__file__).parent
     mcp_project_dir = project_dir / "mcp_project"
-    
+
     if not mcp_project_dir.exists():
         print("❌ Error: mcp_project directory not found!")
         print("Please make sure you're in the correct directory.")
         return
-    
+
+    if shutil.which("npx") is None:
+        print("❌ Error: npx not found. Please install Node.js and npm first.")
+        print("You can install Node.js from: https://nodejs.org/")
+        return
+
     # Change to mcp_project directory
     os.chdir(mcp_project_dir)
-    
-    # Install dependencies if needed
-    print("📦 Installing dependencies...")
-    try:
-        subprocess.run(["uv", "sync"], check=True, capture_output=True)
-        print("✅ Dependencies installed successfully!")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error installing dependencies: {e}")
-        return
-    
+
+    if attach_url:
+        if not server_reachable(attach_url):
+            print(f"❌ Error: no server is listening at {attach_url}")
+            print("Start one with: cd mcp_project && uv run research_server.py")
+            return
+        print(f"🔗 Attaching to running server at {attach_url}")
+        inspector_cmd = [
+            "npx", "@modelcontextprotocol/inspector",
+            "--transport", "sse", "--server-url", attach_url
+        ]
+        prewarm_thread = None
+    else:
+        # Install dependencies if needed
+        print("📦 Checking dependencies...")
+        try:
+            synced = timer.run("uv sync", sync_dependencies, project_dir, force_sync)
+            print("✅ Dependencies installed successfully!" if synced else "✅ Dependencies up to date, skipped uv sync.")
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error installing dependencies: {e}")
+            return
+
+        prewarm_thread = None
+        if prewarm:
+            prewarm_thread = threading.Thread(
+                target=lambda: timer.run("server prewarm", prewarm_server, mcp_project_dir),
+                daemon=True
+            )
+            prewarm_thread.start()
+
+        # The environment was just checked, so the spawned server skips uv's own sync
+        inspector_cmd = [
+            "npx", "@modelcontextprotocol/inspector",
+            "uv", "run", "--no-sync", "python3", "research_server.py"
+        ]
+
     # Launch the inspector
     print("🔧 Starting MCP Inspector...")
     print("This will open the inspector in your browser.")
     print("Press Ctrl+C to stop the inspector when done.")
-    
+
     try:
-        # Launch the inspector using npx
-        inspector_cmd = [
-            "npx", "@modelcontextprotocol/inspector", 
-            "uv", "run", "python3", "research_server.py"
-        ]
-        
         print(f"Running: {' '.join(inspector_cmd)}")
-        subprocess.run(inspector_cmd)
-        
+        run_inspector(inspector_cmd, timer, prewarm_thread)
+
     except KeyboardInterrupt:
         print("\n🛑 Inspector stopped by user.")
     except FileNotFoundError:
@@ -66,19 +213,40 @@ def launch_inspector():
         print(f"❌ Error launching inspector: {e}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Launch the MCP inspector for the research server.")
+    parser.add_argument(
+        "--attach", nargs="?", const=DEFAULT_SSE_URL, metavar="URL",
+        help=f"Connect to a running SSE server instead of spawning one (default {DEFAULT_SSE_URL})"
+    )
+    parser.add_argument("--force-sync", action="store_true", help="Run uv sync even if nothing changed")
+    parser.add_argument("--no-prewarm", action="store_true", help="Do not pre-compile the server while the inspector starts")
+    return parser.parse_args()
+
+
+def run_load_test(argv):
+    """Run the headless load generator from mcp_project/loadgen.py."""
+    sys.path.insert(0, str(Path(__file__).parent / "mcp_project"))
+    from loadgen import main as load_main
+    return load_main(argv)
+
+
 def main():
     """Main entry point."""
+    if sys.argv[1:2] == ["load"]:
+        sys.exit(run_load_test(sys.argv[2:]))
+    args = parse_args()
     print("=" * 50)
     print("🔍 MCP Server Inspector Tool")
     print("=" * 50)
-    
+
     # Get the inspector proxy address
     proxy_address = get_inspector_proxy_address()
     print(f"📡 Inspector Proxy Address: {proxy_address}")
     print()
-    
+
     # Launch the inspector
-    launch_inspector()
+    launch_inspector(args.attach, args.force_sync, not args.no_prewarm)
 
 
 if __name__ == "__main__":
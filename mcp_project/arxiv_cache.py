@@ -0,0 +1,248 @@
+"""
+Disk-backed cache for arXiv lookups.
+
+Entries are kept in LRU order and persisted to a single JSON file so that
+repeated searches for the same topic or paper survive server restarts.
+Changes are written in a background thread at most once per save_delay
+seconds, so the async tools never serialize the cache on the event loop.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def search_key(topic, max_results, sort_by="relevance"):
+    """Build the cache key for a topic search."""
+    normalized = " ".join(topic.lower().split())
+    return f"search:{sort_by}:{max_results}:{normalized}"
+
+
+def paper_key(paper_id):
+    """Build the cache key for a single paper lookup."""
+    return f"paper:{paper_id.strip()}"
+
+
+class ArxivCache:
+    """LRU cache with a TTL, persisted to disk as JSON."""
+
+    def __init__(self, path, ttl_seconds=3600, max_entries=512, serve_stale=False, save_delay=1.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.serve_stale = serve_stale
+        self.save_delay = save_delay
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._tasks = set()
+        self._lock = threading.RLock()
+        # Serializes writes, so an older snapshot never replaces a newer one
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # A corrupt cache file is not fatal, start over
+            return
+        for key, entry in data.get("entries", []):
+            self._entries[key] = entry
+        self._evict()
+
+    def _save(self):
+        with self._save_lock:
+            with self._lock:
+                entries = list(self._entries.items())
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump({"entries": entries}, f)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+
+    def _timed_save(self):
+        with self._lock:
+            self._save_timer = None
+        self._save()
+
+    def _schedule_save(self):
+        # Every change within save_delay seconds goes out in one write
+        with self._lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self._timed_save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """Write pending changes to disk now."""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._save()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _is_fresh(self, entry):
+        return time.time() - entry["stored_at"] < self.ttl_seconds
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._is_fresh(entry):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["value"]
+
+    def set(self, key, value):
+        """Store value under key and schedule a write to disk."""
+        with self._lock:
+            self._entries[key] = {"value": value, "stored_at": time.time()}
+            self._entries.move_to_end(key)
+            self._evict()
+            self._schedule_save()
+
+    def set_many(self, items):
+        """Store several key/value pairs and schedule a write to disk."""
+        with self._lock:
+            now = time.time()
+            for key, value in items.items():
+                self._entries[key] = {"value": value, "stored_at": now}
+                self._entries.move_to_end(key)
+            self._evict()
+            self._schedule_save()
+
+    def _lookup(self, key):
+        """Return (value, status) where status is "fresh", "stale" or "miss"."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if self._is_fresh(entry):
+                    self.hits += 1
+                    return entry["value"], "fresh"
+                if self.serve_stale:
+                    self.stale_hits += 1
+                    return entry["value"], "stale"
+            self.misses += 1
+            return None, "miss"
+
+    def _store(self, key, value, related):
+        # related(value) gives extra entries saved in the same write
+        items = dict(related(value)) if related else {}
+        items[key] = value
+        self.set_many(items)
+
+    def get_or_fetch(self, key, fetch, related=None):
+        """
+        Return the cached value for key, calling fetch() on a miss.
+
+        When serve_stale is enabled, an expired entry is returned immediately
+        and refreshed in a background thread. If given, related(value)
+        returns a dict of further entries cached together with the fetched
+        value in one update.
+        """
+        value, status = self._lookup(key)
+        if status == "stale":
+            self._refresh_in_background(key, fetch, related)
+        if status != "miss":
+            return value
+
+        value = fetch()
+        self._store(key, value, related)
+        return value
+
+    async def aget_or_fetch(self, key, fetch, related=None):
+        """
+        Async variant of get_or_fetch where fetch() returns an awaitable.
+
+        Stale entries are refreshed in a background task on the running loop.
+        """
+        value, status = self._lookup(key)
+        if status == "stale":
+            self._refresh_in_background_async(key, fetch, related)
+        if status != "miss":
+            return value
+
+        value = await fetch()
+        self._store(key, value, related)
+        return value
+
+    def _refresh_in_background(self, key, fetch, related=None):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, fetch(), related)
+            except Exception:
+                # Keep serving the stale entry, the next request retries
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _refresh_in_background_async(self, key, fetch, related=None):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                self._store(key, await fetch(), related)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        # Hold a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
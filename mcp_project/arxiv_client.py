@@ -0,0 +1,112 @@
+"""
+Non-blocking client for the arXiv query API.
+
+All requests go through one pooled httpx.AsyncClient, a semaphore bounds how
+many run at once, and concurrent calls for the same query share a single
+in-flight request.
+"""
+
+import asyncio
+import re
+from urllib.parse import urlencode
+
+import feedparser
+import httpx
+
+from tracing import tracer
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+
+
+def paper_from_entry(entry) -> dict:
+    """Convert an Atom feed entry into the paper dict used by the server."""
+    pdf_url = next(
+        (link.get("href") for link in entry.get("links", []) if link.get("title") == "pdf"),
+        None,
+    )
+    return {
+        "title": re.sub(r"\s+", " ", entry.get("title", "")),
+        "authors": [author.get("name") for author in entry.get("authors", [])],
+        "published": entry.get("published", "")[:10],
+        "summary": entry.get("summary", ""),
+        "pdf_url": pdf_url,
+        "arxiv_id": entry.id.split('/')[-1],
+    }
+
+
+def parse_feed(text: str) -> list[dict]:
+    """Parse an arXiv Atom response into paper dicts."""
+    feed = feedparser.parse(text)
+    # Unknown IDs come back as an "Error" entry without an abs/ link
+    return [paper_from_entry(e) for e in feed.entries if "/abs/" in e.get("id", "")]
+
+
+class AsyncArxivClient:
+    """Shared, connection-pooled arXiv client with request coalescing."""
+
+    def __init__(
+        self,
+        base_url=ARXIV_API_URL,
+        max_concurrency=4,
+        timeout=15.0,
+        max_connections=10,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = {}
+        self._client = None
+
+    def _get_client(self):
+        # Created lazily so the client binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def search(self, query, max_results=5, sort_by="relevance", start=0):
+        """Search arXiv and return up to max_results paper dicts."""
+        return await self._query({
+            "search_query": query,
+            "start": start,
+            "max_results": max_results,
+            "sortBy": sort_by,
+            "sortOrder": "descending",
+        })
+
+    async def fetch_ids(self, paper_ids):
+        """Fetch papers by arXiv ID. Unknown IDs are omitted from the result."""
+        return await self._query({
+            "id_list": ",".join(paper_ids),
+            "max_results": len(paper_ids),
+        })
+
+    async def _query(self, params):
+        key = urlencode(sorted(params.items()))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _request(self, params):
+        with tracer.span("arxiv.request", params=params) as span:
+            async with self._semaphore:
+                response = await self._get_client().get(self.base_url, params=params)
+            span.set(status_code=response.status_code, result_bytes=len(response.content))
+            response.raise_for_status()
+            return parse_feed(response.text)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
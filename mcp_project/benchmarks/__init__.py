@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the chatbot and the research server.
+
+Run from mcp_project with `uv run python -m benchmarks.run`. arXiv,
+Anthropic and the MCP servers are all replaced by local fakes, so results
+depend only on this code and the machine.
+"""
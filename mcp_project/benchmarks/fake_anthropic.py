@@ -0,0 +1,106 @@
+"""
+Scripted stand-in for the Anthropic Messages streaming API.
+
+Each query gets `rounds` assistant turns that stream some text and then the
+scripted tool_use blocks; after that many rounds of tool results the turn
+ends with plain text. Point the SDK at it with ANTHROPIC_BASE_URL.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+
+def _event(event_type, **data):
+    return f"event: {event_type}\ndata: {json.dumps({'type': event_type, **data})}\n\n"
+
+
+def _tool_rounds_so_far(messages):
+    """Rounds of tool results since the user's latest query."""
+    rounds = 0
+    for message in reversed(messages):
+        if message["role"] != "user":
+            continue
+        content = message["content"]
+        if isinstance(content, list) and any(block.get("type") == "tool_result" for block in content):
+            rounds += 1
+        else:
+            break
+    return rounds
+
+
+class FakeAnthropic:
+    """uvicorn server in a background thread serving POST /v1/messages."""
+
+    def __init__(self, tool_calls, rounds=1, text="Looking into that now.", chunk_delay=0.005,
+                 first_token_delay=0.05, port=0):
+        # tool_calls: list of (tool name, input dict) issued in every round
+        self.tool_calls = tool_calls
+        self.rounds = rounds
+        self.text = text
+        self.chunk_delay = chunk_delay
+        self.first_token_delay = first_token_delay
+        self.requests = 0
+        app = Starlette(routes=[Route("/v1/messages", self._messages, methods=["POST"])])
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+        self._thread = None
+
+    @property
+    def url(self):
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join()
+
+    async def _messages(self, request):
+        body = await request.json()
+        self.requests += 1
+        use_tools = _tool_rounds_so_far(body["messages"]) < self.rounds
+        input_tokens = len(json.dumps(body)) // 4
+
+        async def stream():
+            yield _event("message_start", message={
+                "id": f"msg_{self.requests}", "type": "message", "role": "assistant",
+                "model": body["model"], "content": [], "stop_reason": None, "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": 0},
+            })
+            await asyncio.sleep(self.first_token_delay)
+            yield _event("content_block_start", index=0, content_block={"type": "text", "text": ""})
+            words = self.text.split(" ") if use_tools else ["Here", "is", "the", "summary."]
+            for word in words:
+                await asyncio.sleep(self.chunk_delay)
+                yield _event("content_block_delta", index=0, delta={"type": "text_delta", "text": word + " "})
+            yield _event("content_block_stop", index=0)
+            if use_tools:
+                for index, (name, tool_input) in enumerate(self.tool_calls, 1):
+                    yield _event("content_block_start", index=index, content_block={
+                        "type": "tool_use", "id": f"toolu_{self.requests}_{index}", "name": name, "input": {},
+                    })
+                    yield _event("content_block_delta", index=index, delta={
+                        "type": "input_json_delta", "partial_json": json.dumps(tool_input),
+                    })
+                    yield _event("content_block_stop", index=index)
+                    await asyncio.sleep(self.chunk_delay)
+            yield _event(
+                "message_delta",
+                delta={"stop_reason": "tool_use" if use_tools else "end_turn", "stop_sequence": None},
+                usage={"output_tokens": 20 + 10 * len(self.tool_calls) * use_tools},
+            )
+            yield _event("message_stop")
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
@@ -0,0 +1,97 @@
+"""
+Local stand-in for the arXiv query API.
+
+Serves deterministic Atom feeds: a search for max_results=N returns N papers
+whose IDs derive from the query, and an id_list query returns one entry per
+ID. Every response is delayed by `latency` seconds to mimic the network.
+"""
+
+import hashlib
+import http.server
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<title>arXiv Query</title>
+{entries}
+</feed>"""
+
+ENTRY = """<entry>
+<id>http://arxiv.org/abs/{paper_id}</id>
+<published>2024-{month:02d}-{day:02d}T00:00:00Z</published>
+<title>{title}</title>
+<summary>{summary}</summary>
+<author><name>{author}</name></author>
+<link href="http://arxiv.org/abs/{paper_id}" rel="alternate" type="text/html"/>
+<link title="pdf" href="http://arxiv.org/pdf/{paper_id}" rel="related" type="application/pdf"/>
+</entry>"""
+
+
+def _paper_ids(query, count, start=0):
+    digest = int(hashlib.sha256(query.encode()).hexdigest(), 16)
+    return [f"24{digest % 12 + 1:02d}.{(digest + i) % 100000:05d}v1" for i in range(start, start + count)]
+
+
+def render_entry(paper_id, query=""):
+    number = int(paper_id.split(".")[1][:5])
+    return ENTRY.format(
+        paper_id=paper_id,
+        month=number % 12 + 1,
+        day=number % 28 + 1,
+        title=escape(f"Benchmark paper {paper_id} on {query or 'assorted topics'}"),
+        summary=escape(
+            f"We study {query or 'a problem'} with a method evaluated on standard "
+            f"benchmarks. Results for paper {paper_id} improve on prior work."
+        ),
+        author=f"Author {number % 97}",
+    )
+
+
+class FakeArxiv:
+    """Threaded HTTP server answering /api/query like arXiv."""
+
+    def __init__(self, latency=0.0, port=0):
+        self.latency = latency
+        self.requests = 0
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.requests += 1
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                time.sleep(fake.latency)
+                if "id_list" in params:
+                    entries = [render_entry(paper_id) for paper_id in params["id_list"].split(",")]
+                else:
+                    query = params.get("search_query", "")
+                    ids = _paper_ids(query, int(params.get("max_results", 10)), int(params.get("start", 0)))
+                    entries = [render_entry(paper_id, query) for paper_id in ids]
+                body = FEED.format(entries="\n".join(entries)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/atom+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api/query"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
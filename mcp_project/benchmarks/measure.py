@@ -0,0 +1,66 @@
+"""
+Latency and memory measurements shared by the benchmarks and loadgen.py.
+
+Kept free of chatbot and server imports so the load generator can use them
+without pulling in (and patching the event loop for) the chatbot.
+"""
+
+import os
+
+
+def summarize(durations):
+    """Latency percentiles in milliseconds for a list of durations in seconds."""
+    if not durations:
+        return {}
+    values = sorted(d * 1000 for d in durations)
+
+    def pick(p):
+        return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 3)
+
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def rss_kb(pid):
+    """Resident memory of a process in kilobytes, 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def child_pids():
+    """Map each parent PID to the PIDs of its children, from /proc."""
+    children = {}
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree_rss_kb(pid, include_root=True):
+    """Total RSS of pid and all of its descendants, 0 if it is gone."""
+    children = child_pids()
+    total = 0
+    stack = [pid] if include_root else list(children.get(pid, []))
+    while stack:
+        current = stack.pop()
+        total += rss_kb(current)
+        stack.extend(children.get(current, []))
+    return total
@@ -0,0 +1,362 @@
+"""
+Run the offline benchmarks and write the results as JSON.
+
+    uv run python -m benchmarks.run                      # all scenarios
+    uv run python -m benchmarks.run -s chat_turn -o new.json
+    uv run python -m benchmarks.run --compare old.json   # flag regressions
+
+Scenarios:
+    connect          starting stub servers cold vs. from the capability catalog
+    tool_throughput  concurrent call_tool against a stub with fixed latency
+    chat_turn        process_query against the fake Anthropic endpoint
+    research         research_server tools over MCP against the fake arXiv
+
+Times are in milliseconds, memory in kilobytes.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import resource
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from anthropic import AsyncAnthropic
+
+from benchmarks.fake_anthropic import FakeAnthropic
+from benchmarks.fake_arxiv import FakeArxiv
+from benchmarks.measure import process_tree_rss_kb, rss_kb, summarize
+from capability_catalog import CapabilityCatalog
+from mcp_chatbot import MCP_ChatBot
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_server.py")
+RESULT_SCHEMA = 1
+
+
+def memory_usage():
+    """RSS of this process and of its child processes (the MCP servers)."""
+    return {
+        "rss_kb": rss_kb("self"),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "servers_rss_kb": process_tree_rss_kb(os.getpid(), include_root=False),
+    }
+
+
+def stub_config(latency_ms=10, startup_ms=0, payload=256):
+    return {
+        "command": sys.executable,
+        "args": [STUB_SERVER],
+        "env": {
+            "STUB_LATENCY_MS": str(latency_ms),
+            "STUB_STARTUP_MS": str(startup_ms),
+            "STUB_PAYLOAD": str(payload),
+        },
+    }
+
+
+def new_chatbot(workdir, **kwargs):
+    """A chatbot whose capability catalog lives in workdir."""
+    bot = MCP_ChatBot(show_token_usage=False, **kwargs)
+    bot.catalog = CapabilityCatalog(os.path.join(workdir, "catalog.json"))
+    return bot
+
+
+def tool_use(name, tool_input, n):
+    return SimpleNamespace(name=name, id=f"toolu_bench_{n}", input=tool_input)
+
+
+async def bench_connect(options, workdir):
+    """Time connecting to several stub servers, cold and from the catalog."""
+    servers = {
+        f"stub{i}": stub_config(startup_ms=options.startup_ms)
+        for i in range(options.servers)
+    }
+    cold, catalog, first_call = [], [], []
+    for _ in range(options.repeat):
+        for lazy, timings in ((False, cold), (True, catalog)):
+            bot = new_chatbot(workdir, lazy_connect=lazy)
+            try:
+                start = time.perf_counter()
+                await asyncio.gather(*[bot.connect_to_server(n, c) for n, c in servers.items()])
+                timings.append(time.perf_counter() - start)
+                if lazy:
+                    # With the catalog the first call pays for starting the server
+                    start = time.perf_counter()
+                    await bot.call_tool(tool_use("stub0_echo", {"text": "x", "delay_ms": 0}, 0),
+                                        asyncio.Semaphore(1))
+                    first_call.append(time.perf_counter() - start)
+            finally:
+                await bot.cleanup()
+    return {
+        "servers": options.servers,
+        "cold_connect": summarize(cold),
+        "catalog_connect": summarize(catalog),
+        "catalog_first_call": summarize(first_call),
+    }
+
+
+async def bench_tool_throughput(options, workdir):
+    """Throughput and latency of concurrent tool calls for each pool size."""
+    results = {}
+    for size in (1, 2):
+        bot = new_chatbot(workdir, lazy_connect=False, max_concurrent_tools=options.concurrency)
+        try:
+            await bot.connect_to_server("stub", stub_config(latency_ms=options.latency_ms), {
+                "size": size,
+                "maxConcurrentPerSession": options.concurrency,
+                "maxQueue": options.calls,
+            })
+            semaphore = asyncio.Semaphore(options.concurrency)
+            # Warm up so every server in the pool is running before timing
+            await asyncio.gather(*[
+                bot.call_tool(tool_use("stub_payload", {}, n), semaphore)
+                for n in range(options.concurrency)
+            ])
+            durations = []
+            errors = 0
+
+            async def timed_call(n):
+                nonlocal errors
+                start = time.perf_counter()
+                result = await bot.call_tool(tool_use("stub_payload", {}, n), semaphore)
+                durations.append(time.perf_counter() - start)
+                errors += bool(result.get("is_error"))
+
+            start = time.perf_counter()
+            await asyncio.gather(*[timed_call(n) for n in range(options.calls)])
+            elapsed = time.perf_counter() - start
+            results[f"pool_size_{size}"] = {
+                "calls": options.calls,
+                "concurrency": options.concurrency,
+                "calls_per_s": round(options.calls / elapsed, 2),
+                "errors": errors,
+                "latency": summarize(durations),
+                **memory_usage(),
+            }
+        finally:
+            await bot.cleanup()
+    return {"stub_latency_ms": options.latency_ms, **results}
+
+
+async def bench_chat_turn(options, workdir):
+    """Latency of full query turns, alone and with concurrent conversations."""
+    fake = FakeAnthropic(
+        tool_calls=[
+            ("stub_echo", {"text": "hello"}),
+            ("stub_payload", {"size": 4096}),
+            ("stub_echo", {"text": "again", "delay_ms": options.latency_ms * 2}),
+        ],
+        rounds=2,
+    ).start()
+    bot = new_chatbot(workdir, lazy_connect=False)
+    bot.anthropic = AsyncAnthropic(base_url=fake.url, api_key="benchmark")
+    try:
+        await bot.connect_to_server("stub", stub_config(latency_ms=options.latency_ms))
+
+        async def turn(history):
+            start = time.perf_counter()
+            await bot.process_query("Summarize recent work", messages=history, on_text=lambda text: None)
+            return time.perf_counter() - start
+
+        sequential = [await turn([]) for _ in range(options.turns)]
+
+        start = time.perf_counter()
+        concurrent = await asyncio.gather(*[turn([]) for _ in range(options.conversations)])
+        elapsed = time.perf_counter() - start
+
+        # One conversation whose history grows with every turn
+        history = []
+        growing = [await turn(history) for _ in range(options.turns)]
+        return {
+            "tool_calls_per_round": len(fake.tool_calls),
+            "rounds_per_turn": fake.rounds,
+            "sequential": summarize(sequential),
+            "concurrent": {
+                "conversations": options.conversations,
+                "turns_per_s": round(options.conversations / elapsed, 2),
+                "latency": summarize(concurrent),
+            },
+            "growing_history": summarize(growing),
+            **memory_usage(),
+        }
+    finally:
+        await bot.cleanup()
+        fake.stop()
+
+
+async def bench_research(options, workdir):
+    """research_server tools and resources, called in-process over MCP."""
+    from fastmcp import Client
+
+    fake = FakeArxiv(latency=options.arxiv_latency_ms / 1000).start()
+    previous_dir = os.getcwd()
+    research_dir = os.path.join(workdir, "research")
+    os.makedirs(research_dir)
+    os.environ["ARXIV_API_URL"] = fake.url
+    # The server keeps its paper store and cache relative to the working directory
+    os.chdir(research_dir)
+    try:
+        import research_server
+
+        async with Client(research_server.mcp) as client:
+            async def timed(coro_factory, repeat):
+                durations = []
+                for i in range(repeat):
+                    start = time.perf_counter()
+                    await coro_factory(i)
+                    durations.append(time.perf_counter() - start)
+                return summarize(durations)
+
+            topics = [f"topic {i}" for i in range(options.repeat)]
+            cold = await timed(lambda i: client.call_tool(
+                "search_papers", {"topic": topics[i], "max_results": 20}), len(topics))
+            cached = await timed(lambda i: client.call_tool(
+                "search_papers", {"topic": topics[i], "max_results": 20}), len(topics))
+            local = await timed(lambda i: client.call_tool(
+                "search_local", {"query": "benchmark method results", "max_results": 10}), options.turns)
+            ids = [p["arxiv_id"] for p in research_server.paper_store.iter_papers()][:20]
+            batch = await timed(lambda i: client.call_tool(
+                "extract_info_batch", {"paper_ids": ids}), options.turns)
+            page = await timed(lambda i: client.read_resource(
+                f"papers://{topics[0].replace(' ', '_')}/page/1"), options.turns)
+
+        return {
+            "arxiv_latency_ms": options.arxiv_latency_ms,
+            "arxiv_requests": fake.requests,
+            "search_cold": cold,
+            "search_cached": cached,
+            "search_local": local,
+            "extract_info_batch_20": batch,
+            "topic_page": page,
+            **memory_usage(),
+        }
+    finally:
+        os.chdir(previous_dir)
+        fake.stop()
+
+
+SCENARIOS = {
+    "connect": bench_connect,
+    "tool_throughput": bench_tool_throughput,
+    "chat_turn": bench_chat_turn,
+    "research": bench_research,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(options):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in options.scenario or SCENARIOS:
+            print(f"Running {name}...", file=sys.stderr)
+            start = time.perf_counter()
+            # Keep connection banners and tool errors out of the JSON on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = await SCENARIOS[name](options, workdir)
+            result["wall_s"] = round(time.perf_counter() - start, 3)
+            results[name] = result
+    return {
+        "schema": RESULT_SCHEMA,
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {k: v for k, v in vars(options).items() if k not in ("output", "compare", "scenario")},
+        "scenarios": results,
+    }
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        items = {}
+        for key, child in value.items():
+            items.update(_flatten(child, f"{prefix}.{key}" if prefix else key))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare(baseline, current, threshold):
+    """Print metric changes between two result files; return the regressions."""
+    old = _flatten(baseline["scenarios"])
+    new = _flatten(current["scenarios"])
+    regressions = []
+    if baseline.get("options") != current["options"]:
+        print("Warning: the baseline was run with different options", file=sys.stderr)
+    print(f"\n{'metric':<60} {'baseline':>12} {'current':>12} {'change':>8}", file=sys.stderr)
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        if before == 0:
+            continue
+        change = (after - before) / before
+        # Throughput should go up; times and memory should go down
+        higher_is_better = key.endswith("_per_s")
+        worse = -change if higher_is_better else change
+        flag = ""
+        if key.endswith(("_ms", "_kb", "_per_s", "_s")) and worse > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<60} {before:>12} {after:>12} {change:>+8.1%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline MCP chatbot and research server benchmarks")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("-o", "--output", help="write results to this file instead of stdout")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression (default 0.10)")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions of connect and search runs")
+    parser.add_argument("--servers", type=int, default=3, help="stub servers in the connect scenario")
+    parser.add_argument("--startup-ms", type=float, default=0, help="artificial stub server startup delay")
+    parser.add_argument("--latency-ms", type=float, default=10, help="stub tool call latency")
+    parser.add_argument("--calls", type=int, default=200, help="tool calls in the throughput scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent tool calls")
+    parser.add_argument("--turns", type=int, default=10, help="query turns per chat measurement")
+    parser.add_argument("--conversations", type=int, default=8, help="concurrent conversations")
+    parser.add_argument("--arxiv-latency-ms", type=float, default=50, help="fake arXiv response delay")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    results = asyncio.run(run(options))
+    text = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Results written to {options.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, options.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metrics regressed by more than {options.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
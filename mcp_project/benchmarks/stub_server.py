@@ -0,0 +1,58 @@
+"""
+Stub MCP server with controllable latency, for benchmarks.
+
+    STUB_STARTUP_MS   delay before the server starts answering (default 0)
+    STUB_LATENCY_MS   default delay of every tool call (default 10)
+    STUB_PAYLOAD      default size in bytes of tool results (default 256)
+"""
+
+import asyncio
+import os
+import time
+
+from fastmcp import FastMCP
+
+STARTUP_MS = float(os.environ.get("STUB_STARTUP_MS", 0))
+LATENCY_MS = float(os.environ.get("STUB_LATENCY_MS", 10))
+PAYLOAD = int(os.environ.get("STUB_PAYLOAD", 256))
+
+mcp = FastMCP("stub")
+
+
+@mcp.tool()
+async def echo(text: str, delay_ms: float = -1) -> str:
+    """Return text after delay_ms milliseconds (the server default if negative)."""
+    await asyncio.sleep((LATENCY_MS if delay_ms < 0 else delay_ms) / 1000)
+    return text
+
+
+@mcp.tool()
+async def payload(size: int = -1) -> str:
+    """Return size bytes of text after the default latency."""
+    await asyncio.sleep(LATENCY_MS / 1000)
+    return "x" * (PAYLOAD if size < 0 else size)
+
+
+@mcp.tool()
+def spin(ms: float = 5) -> str:
+    """Busy-wait for ms milliseconds, blocking the server."""
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+    return "done"
+
+
+@mcp.tool()
+def crash() -> str:
+    """Exit the server process immediately, as a crash would."""
+    os._exit(1)
+
+
+@mcp.resource("stub://status")
+def status() -> str:
+    return "ok"
+
+
+if __name__ == "__main__":
+    time.sleep(STARTUP_MS / 1000)
+    mcp.run(show_banner=False)
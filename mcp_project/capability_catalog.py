@@ -0,0 +1,95 @@
+"""
+On-disk catalog of the tools, prompts and resources each MCP server offers.
+
+Entries are keyed by server name and stamped with a hash of the server's
+config, so a changed command or argument list invalidates the entry.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+# Bump when the shape of catalog entries changes to invalidate old entries
+CATALOG_VERSION = 2
+
+
+def config_hash(server_config):
+    """Stable hash of a server's entry in server_config.json."""
+    encoded = json.dumps(server_config, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _dump(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+def describe_capabilities(tools, prompts, resources, resource_templates=()):
+    """Turn the list_* results of a server into catalog data."""
+    return {
+        "tools": [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "inputSchema": tool.inputSchema,
+            }
+            for tool in tools
+        ],
+        "prompts": [
+            {
+                "name": prompt.name,
+                "description": prompt.description,
+                "arguments": [_dump(arg) for arg in prompt.arguments or []],
+            }
+            for prompt in prompts
+        ],
+        "resources": [str(resource.uri) for resource in resources],
+        "resource_templates": [template.uriTemplate for template in resource_templates],
+    }
+
+
+class CapabilityCatalog:
+    """JSON file mapping server names to their advertised capabilities."""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+
+    def get(self, server_name, server_config):
+        """Return cached capabilities if they match the current config."""
+        entry = self._entries.get(server_name)
+        if (
+            entry
+            and entry.get("version") == CATALOG_VERSION
+            and entry.get("config_hash") == config_hash(server_config)
+        ):
+            return entry["capabilities"]
+        return None
+
+    def put(self, server_name, server_config, capabilities):
+        """Record capabilities for a server and persist the catalog."""
+        self._entries[server_name] = {
+            "version": CATALOG_VERSION,
+            "config_hash": config_hash(server_config),
+            "capabilities": capabilities,
+        }
+        self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,233 @@
+"""
+HTTP service that lets many users chat through one MCP_ChatBot.
+
+Every conversation shares the chatbot's server pools, tool list and tool
+result cache, but keeps its own message history. Queries within one
+conversation run in order; a bounded number may wait behind the current
+one, and a global limit caps how many queries talk to the model at once.
+
+    POST   /conversations                 -> {"id": ...}
+    POST   /conversations/{id}/messages   {"content": ..., "stream": false}
+    GET    /conversations/{id}
+    DELETE /conversations/{id}
+    GET    /tools
+    GET    /health
+    GET    /metrics                       (Prometheus latency histograms)
+
+With "stream": true the reply is sent as newline-delimited JSON events:
+{"type": "text", "text": ...} while the model writes, then
+{"type": "done", "reply": ...} or {"type": "error", "error": ...}.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from tracing import tracer
+
+DEFAULT_SERVICE_CONFIG = {
+    # Queries allowed to run against the model at the same time
+    "maxActiveQueries": 16,
+    # Queries a conversation may have running or waiting
+    "maxPendingPerConversation": 2,
+    "maxConversations": 1000,
+    # Seconds of inactivity before a conversation is forgotten
+    "conversationTtl": 3600,
+}
+
+
+class ServiceBusyError(Exception):
+    """Raised when a conversation or the service cannot take more work."""
+
+
+class Conversation:
+    """One user's message history and its queue of queries."""
+
+    def __init__(self, conversation_id, max_pending):
+        self.id = conversation_id
+        self.messages = []
+        self.max_pending = max_pending
+        self.pending = 0
+        self.created_at = time.time()
+        self.last_active = time.monotonic()
+        # Queries run one at a time so each reply sees the whole history
+        self.lock = asyncio.Lock()
+
+    def reserve(self):
+        """Claim a place in the queue."""
+        if self.pending >= self.max_pending:
+            raise ServiceBusyError(
+                f"Conversation {self.id} already has {self.pending} queries in progress"
+            )
+        self.pending += 1
+        self.last_active = time.monotonic()
+
+    def release(self):
+        self.pending -= 1
+        self.last_active = time.monotonic()
+
+    def describe(self):
+        return {
+            "id": self.id,
+            "messages": len(self.messages),
+            "pending": self.pending,
+            "created_at": self.created_at,
+        }
+
+
+class ChatService:
+    """Conversations served by one shared chatbot."""
+
+    def __init__(self, chatbot, settings=None):
+        config = dict(DEFAULT_SERVICE_CONFIG)
+        config.update(settings or {})
+        self.chatbot = chatbot
+        self.conversations = {}
+        self.max_pending = config["maxPendingPerConversation"]
+        self.max_conversations = config["maxConversations"]
+        self.conversation_ttl = config["conversationTtl"]
+        self._active = asyncio.Semaphore(config["maxActiveQueries"])
+
+    def expire_conversations(self):
+        """Forget conversations that have been idle past the TTL."""
+        now = time.monotonic()
+        for conversation_id, conversation in list(self.conversations.items()):
+            if not conversation.pending and now - conversation.last_active > self.conversation_ttl:
+                del self.conversations[conversation_id]
+
+    def create_conversation(self):
+        self.expire_conversations()
+        if len(self.conversations) >= self.max_conversations:
+            raise ServiceBusyError(f"Too many open conversations ({len(self.conversations)})")
+        conversation = Conversation(uuid.uuid4().hex, self.max_pending)
+        self.conversations[conversation.id] = conversation
+        return conversation
+
+    def submit(self, conversation, query, on_text=None):
+        """Queue a query on a conversation and return the task answering it."""
+        conversation.reserve()
+        return asyncio.create_task(self._answer(conversation, query, on_text))
+
+    async def _answer(self, conversation, query, on_text):
+        try:
+            async with conversation.lock, self._active:
+                start = len(conversation.messages)
+                try:
+                    return await self.chatbot.process_query(
+                        query, messages=conversation.messages, on_text=on_text or (lambda text: None)
+                    )
+                except BaseException:
+                    # Drop the unfinished exchange so the history stays valid
+                    del conversation.messages[start:]
+                    raise
+        finally:
+            conversation.release()
+
+    def app(self):
+        return Starlette(routes=[
+            Route("/health", self.health, methods=["GET"]),
+            Route("/tools", self.tools, methods=["GET"]),
+            Route("/metrics", self.metrics, methods=["GET"]),
+            Route("/conversations", self.create, methods=["POST"]),
+            Route("/conversations/{conversation_id}", self.show, methods=["GET"]),
+            Route("/conversations/{conversation_id}", self.delete, methods=["DELETE"]),
+            Route("/conversations/{conversation_id}/messages", self.message, methods=["POST"]),
+        ])
+
+    async def health(self, request):
+        return JSONResponse({
+            "status": "ok",
+            "conversations": len(self.conversations),
+            "servers": {name: pool.is_running for name, pool in self.chatbot.servers.items()},
+        })
+
+    async def tools(self, request):
+        return JSONResponse([
+            {"name": tool["name"], "description": tool["description"]}
+            for tool in self.chatbot.available_tools
+        ])
+
+    async def metrics(self, request):
+        return PlainTextResponse(tracer.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    async def create(self, request):
+        try:
+            conversation = self.create_conversation()
+        except ServiceBusyError as e:
+            return JSONResponse({"error": str(e)}, status_code=503)
+        return JSONResponse(conversation.describe(), status_code=201)
+
+    def _conversation(self, request):
+        return self.conversations.get(request.path_params["conversation_id"])
+
+    async def show(self, request):
+        conversation = self._conversation(request)
+        if conversation is None:
+            return JSONResponse({"error": "Conversation not found"}, status_code=404)
+        return JSONResponse(conversation.describe())
+
+    async def delete(self, request):
+        conversation = self.conversations.pop(request.path_params["conversation_id"], None)
+        if conversation is None:
+            return JSONResponse({"error": "Conversation not found"}, status_code=404)
+        return Response(status_code=204)
+
+    async def message(self, request):
+        conversation = self._conversation(request)
+        if conversation is None:
+            return JSONResponse({"error": "Conversation not found"}, status_code=404)
+        try:
+            body = await request.json()
+            query = body["content"].strip()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return JSONResponse({"error": "Expected a JSON body with a \"content\" string"}, status_code=400)
+        if not query:
+            return JSONResponse({"error": "Empty query"}, status_code=400)
+
+        if not body.get("stream"):
+            try:
+                task = self.submit(conversation, query)
+            except ServiceBusyError as e:
+                return JSONResponse({"error": str(e)}, status_code=429)
+            try:
+                reply = await task
+            except Exception as e:
+                return JSONResponse({"error": f"Error processing query: {e}"}, status_code=502)
+            return JSONResponse({"reply": reply})
+
+        chunks = asyncio.Queue()
+        try:
+            task = self.submit(conversation, query, on_text=chunks.put_nowait)
+        except ServiceBusyError as e:
+            return JSONResponse({"error": str(e)}, status_code=429)
+        task.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        async def events():
+            try:
+                while (text := await chunks.get()) is not None:
+                    yield json.dumps({"type": "text", "text": text}) + "\n"
+                try:
+                    yield json.dumps({"type": "done", "reply": task.result()}) + "\n"
+                except Exception as e:
+                    yield json.dumps({"type": "error", "error": f"Error processing query: {e}"}) + "\n"
+            finally:
+                # The client went away before the reply finished
+                task.cancel()
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+async def serve(chatbot, host, port):
+    """Serve conversations over HTTP until interrupted."""
+    with open("server_config.json", "r") as file:
+        settings = json.load(file).get("chatService", {})
+    service = ChatService(chatbot, settings)
+    print(f"\nServing conversations on http://{host}:{port}")
+    server = uvicorn.Server(uvicorn.Config(service.app(), host=host, port=port, log_level="info"))
+    await server.serve()
@@ -0,0 +1,120 @@
+"""
+Conversation history helpers for the chatbot's tool loop.
+
+Tool results (fetched pages, file contents) can be much larger than the
+conversation around them. These helpers keep the messages sent to Claude
+under a token budget and mark the stable prefix for prompt caching.
+"""
+
+import copy
+import json
+
+# Rough conversion used for budgeting; close enough for English text and JSON
+CHARS_PER_TOKEN = 4
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _block_to_dict(block):
+    if hasattr(block, "model_dump"):
+        return block.model_dump(exclude_none=True)
+    return block
+
+
+def estimate_tokens(value):
+    """Estimate the token count of a message, block or list of them."""
+    if isinstance(value, str):
+        return len(value) // CHARS_PER_TOKEN
+    if isinstance(value, list):
+        return sum(estimate_tokens(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_tokens(v) for v in value.values())
+    if hasattr(value, "model_dump"):
+        return estimate_tokens(value.model_dump(exclude_none=True))
+    return len(json.dumps(value, default=str)) // CHARS_PER_TOKEN
+
+
+def tool_result_blocks(content):
+    """Convert MCP tool result content into Anthropic content blocks."""
+    blocks = []
+    for item in content:
+        if getattr(item, "type", None) == "text":
+            blocks.append({"type": "text", "text": item.text})
+        else:
+            blocks.append(_block_to_dict(item))
+    return blocks
+
+
+def _truncate_text(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}\n[... truncated {len(text) - max_chars} characters]"
+
+
+def _iter_tool_results(message):
+    if message["role"] != "user" or not isinstance(message["content"], list):
+        return
+    for block in message["content"]:
+        if isinstance(block, dict) and block.get("type") == "tool_result":
+            yield block
+
+
+def truncate_tool_results(messages, max_chars):
+    """Cap the text of every tool result at max_chars, in place."""
+    for message in messages:
+        for block in _iter_tool_results(message):
+            content = block["content"]
+            if isinstance(content, str):
+                block["content"] = _truncate_text(content, max_chars)
+                continue
+            for item in content:
+                if isinstance(item, dict) and item.get("type") == "text":
+                    item["text"] = _truncate_text(item["text"], max_chars)
+
+
+def compact_messages(messages, token_budget, max_tool_result_chars, keep_recent=4):
+    """
+    Shrink messages in place until they fit token_budget.
+
+    Oversized tool results are truncated first. If that is not enough, tool
+    results outside the last keep_recent messages are replaced with a short
+    placeholder, oldest first. Message structure is preserved so every
+    tool_use still has its tool_result.
+    """
+    truncate_tool_results(messages, max_tool_result_chars)
+
+    total = estimate_tokens(messages)
+    for message in messages[:-keep_recent] if keep_recent else messages:
+        if total <= token_budget:
+            break
+        for block in _iter_tool_results(message):
+            before = estimate_tokens(block["content"])
+            block["content"] = f"[Earlier tool result omitted to save context ({before} tokens)]"
+            total -= before - estimate_tokens(block["content"])
+    return total
+
+
+def with_cache_breakpoints(tools, messages):
+    """
+    Return copies of tools and messages with prompt-cache breakpoints.
+
+    The tool list and everything up to the latest user message are stable
+    between iterations of the tool loop, so both are marked cacheable.
+    """
+    cached_tools = list(tools)
+    if cached_tools:
+        cached_tools[-1] = {**cached_tools[-1], "cache_control": CACHE_CONTROL}
+
+    cached_messages = list(messages)
+    if cached_messages and cached_messages[-1]["role"] == "user":
+        last = copy.copy(cached_messages[-1])
+        content = last["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        else:
+            content = [_block_to_dict(block) for block in content]
+        if content:
+            content[-1] = {**content[-1], "cache_control": CACHE_CONTROL}
+        last["content"] = content
+        cached_messages[-1] = last
+    return cached_tools, cached_messages
@@ -0,0 +1,338 @@
+"""
+Headless load generator for any MCP server in server_config.json.
+
+A workload file lists the calls to replay, in order and repeated until the
+run ends:
+
+    {"calls": [
+        {"type": "tool", "name": "search_local", "arguments": {"query": "graph"}},
+        {"type": "resource", "uri": "papers://folders"},
+        {"type": "prompt", "name": "generate_search_prompt", "arguments": {"topic": "llm"}}
+    ]}
+
+Calls run either closed-loop with a fixed number in flight (--concurrency)
+or open-loop at a target request rate (--rate), where latency is measured
+from each call's scheduled start so a saturated server shows up as queueing
+instead of a lower send rate. The report has throughput, latency
+percentiles, error rates per call and the server's RSS sampled over time.
+
+    python loadgen.py workload.json --server research --concurrency 8 --duration 30
+    python loadgen.py workload.json --url http://localhost:8000/sse --rate 50 --pid 1234
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+from benchmarks.measure import process_tree_rss_kb, summarize
+
+CALL_TYPES = ("tool", "resource", "prompt")
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server_config.json")
+
+
+def load_workload(path):
+    """Read and validate a workload file; return its list of calls."""
+    with open(path) as f:
+        workload = json.load(f)
+    calls = workload["calls"] if isinstance(workload, dict) else workload
+    if not calls:
+        raise ValueError(f"{path} has no calls")
+    for call in calls:
+        if call.get("type") not in CALL_TYPES:
+            raise ValueError(f"Unknown call type in {call}; expected one of {', '.join(CALL_TYPES)}")
+        if call["type"] == "resource" and "uri" not in call:
+            raise ValueError(f"Resource call without a uri: {call}")
+        if call["type"] != "resource" and "name" not in call:
+            raise ValueError(f"{call['type'].title()} call without a name: {call}")
+    return calls
+
+
+def call_label(call):
+    return f"{call['type']}:{call.get('uri') or call.get('name')}"
+
+
+async def invoke(session, call):
+    """Run one workload call; raise if the server reports an error."""
+    if call["type"] == "tool":
+        result = await session.call_tool(call["name"], call.get("arguments", {}))
+        if result.isError:
+            text = " ".join(getattr(block, "text", "") for block in result.content)
+            raise RuntimeError(text or "tool returned an error")
+    elif call["type"] == "resource":
+        await session.read_resource(call["uri"])
+    else:
+        await session.get_prompt(call["name"], call.get("arguments", {}))
+
+
+class LoadRun:
+    """Drives a workload against one or more sessions and collects results."""
+
+    def __init__(self, sessions, calls, duration, max_requests, rss_probe, interval):
+        self.sessions = sessions
+        self.calls = calls
+        self.duration = duration
+        self.max_requests = max_requests
+        # Returns the server's RSS in kB, or None when it cannot be measured
+        self.rss_probe = rss_probe
+        self.interval = interval
+        self.issued = 0
+        self.in_flight = 0
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = {}
+        self.timeline = []
+        self._window_done = 0
+        self._window_errors = 0
+        self._started = None
+
+    def _next_call(self):
+        """Return (session, call) for the next request, or None when the run is over."""
+        if self.max_requests and self.issued >= self.max_requests:
+            return None
+        if self.duration and time.perf_counter() - self._started >= self.duration:
+            return None
+        n = self.issued
+        self.issued += 1
+        return self.sessions[n % len(self.sessions)], self.calls[n % len(self.calls)]
+
+    async def _timed(self, session, call, scheduled_at):
+        label = call_label(call)
+        self.in_flight += 1
+        try:
+            await invoke(session, call)
+        except Exception as e:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            self.error_samples.setdefault(label, str(e)[:200])
+            self._window_errors += 1
+        finally:
+            self.in_flight -= 1
+            self._window_done += 1
+            self.latencies.setdefault(label, []).append(time.perf_counter() - scheduled_at)
+
+    async def _closed_loop(self, concurrency):
+        async def worker():
+            while (item := self._next_call()) is not None:
+                await self._timed(*item, time.perf_counter())
+
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+    async def _open_loop(self, rate, concurrency):
+        limit = asyncio.Semaphore(concurrency)
+        tasks = set()
+
+        async def bounded(session, call, scheduled_at):
+            async with limit:
+                await self._timed(session, call, scheduled_at)
+
+        next_at = time.perf_counter()
+        while (item := self._next_call()) is not None:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(bounded(*item, next_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_at += 1 / rate
+        await asyncio.gather(*tasks)
+
+    async def _sample(self):
+        last = self._started
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._record_sample(now, now - last)
+            last = now
+
+    def _record_sample(self, now, window):
+        self.timeline.append({
+            "t_s": round(now - self._started, 2),
+            "requests_per_s": round(self._window_done / window, 2) if window else 0.0,
+            "errors": self._window_errors,
+            "in_flight": self.in_flight,
+            "server_rss_kb": self.rss_probe() if self.rss_probe else None,
+        })
+        self._window_done = self._window_errors = 0
+
+    async def run(self, concurrency, rate=None):
+        self._started = time.perf_counter()
+        sampler = asyncio.create_task(self._sample())
+        try:
+            if rate:
+                await self._open_loop(rate, concurrency)
+            else:
+                await self._closed_loop(concurrency)
+        finally:
+            sampler.cancel()
+            elapsed = time.perf_counter() - self._started
+        window = elapsed - (self.timeline[-1]["t_s"] if self.timeline else 0)
+        # A sliver of a window at the end would show a meaningless rate
+        if not self.timeline or window >= self.interval / 2:
+            self._record_sample(time.perf_counter(), window)
+        return self.report(elapsed, concurrency, rate)
+
+    def report(self, elapsed, concurrency, rate):
+        all_latencies = [d for durations in self.latencies.values() for d in durations]
+        total = len(all_latencies)
+        errors = sum(self.errors.values())
+        rss = [s["server_rss_kb"] for s in self.timeline if s["server_rss_kb"]]
+        return {
+            "mode": "rate" if rate else "concurrency",
+            "concurrency": concurrency,
+            "target_rate_per_s": rate,
+            "sessions": len(self.sessions),
+            "duration_s": round(elapsed, 3),
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "throughput_per_s": round(total / elapsed, 2) if elapsed else 0.0,
+            "latency": summarize(all_latencies),
+            "peak_server_rss_kb": max(rss) if rss else None,
+            "calls": {
+                label: {
+                    "requests": len(durations),
+                    "errors": self.errors.get(label, 0),
+                    "error_rate": round(self.errors.get(label, 0) / len(durations), 4),
+                    "first_error": self.error_samples.get(label),
+                    **summarize(durations),
+                }
+                for label, durations in sorted(self.latencies.items())
+            },
+            "timeline": self.timeline,
+        }
+
+
+def server_params(config_path, name):
+    """Stdio parameters for a named server in server_config.json."""
+    with open(config_path) as f:
+        servers = json.load(f).get("mcpServers", {})
+    if name not in servers:
+        raise ValueError(f"No server named {name!r} in {config_path}; choose from {', '.join(servers)}")
+    # Commands such as `uv run research_server.py` are relative to the config,
+    # unless the server's entry sets its own cwd
+    params = {"cwd": os.path.dirname(os.path.abspath(config_path)), **servers[name]}
+    # Servers that can serve either transport (research_server.py) are told
+    # to use stdio, since this process talks to them over their pipes
+    params["env"] = {"MCP_TRANSPORT": "stdio", **params.get("env", {})}
+    return StdioServerParameters(**params)
+
+
+async def open_sessions(stack, options):
+    """Connect options.sessions sessions; return them and a probe of server RSS."""
+    sessions = []
+    for _ in range(options.sessions):
+        if options.url:
+            read, write = await stack.enter_async_context(sse_client(options.url))
+        else:
+            params = server_params(options.config, options.server)
+            read, write = await stack.enter_async_context(stdio_client(params))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        sessions.append(session)
+
+    if not options.url:
+        # Every stdio session runs its own server process under this one
+        return sessions, lambda: process_tree_rss_kb(os.getpid(), include_root=False)
+    if options.pid:
+        return sessions, lambda: process_tree_rss_kb(options.pid)
+    return sessions, None
+
+
+def print_report(report):
+    mode = f"{report['target_rate_per_s']}/s target" if report["mode"] == "rate" else f"{report['concurrency']} in flight"
+    latency = report["latency"]
+    print(f"\n📊 {report['requests']} requests in {report['duration_s']}s ({mode}, {report['sessions']} session(s))")
+    print(f"   Throughput: {report['throughput_per_s']}/s   Errors: {report['errors']} ({report['error_rate']:.2%})")
+    if latency:
+        print(f"   Latency: p50 {latency['p50_ms']}ms  p95 {latency['p95_ms']}ms  "
+              f"p99 {latency['p99_ms']}ms  max {latency['max_ms']}ms")
+    if report["peak_server_rss_kb"]:
+        print(f"   Peak server RSS: {report['peak_server_rss_kb'] / 1024:.1f} MB")
+
+    print(f"\n{'call':<40} {'requests':>9} {'errors':>7} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    for label, stats in report["calls"].items():
+        print(f"{label:<40} {stats['requests']:>9} {stats['errors']:>7} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+        if stats["first_error"]:
+            print(f"   first error: {stats['first_error']}")
+
+    print(f"\n{'t_s':>7} {'req/s':>9} {'errors':>7} {'in_flight':>9} {'rss_mb':>8}")
+    for sample in report["timeline"]:
+        rss = f"{sample['server_rss_kb'] / 1024:.1f}" if sample["server_rss_kb"] else "-"
+        print(f"{sample['t_s']:>7} {sample['requests_per_s']:>9} {sample['errors']:>7} "
+              f"{sample['in_flight']:>9} {rss:>8}")
+
+
+def innermost_error(error):
+    """The error inside the task groups of the MCP transports."""
+    while isinstance(error, BaseExceptionGroup) and len(error.exceptions) == 1:
+        error = error.exceptions[0]
+    return error
+
+
+async def run(options):
+    calls = load_workload(options.workload)
+    async with contextlib.AsyncExitStack() as stack:
+        try:
+            sessions, rss_probe = await asyncio.wait_for(
+                open_sessions(stack, options), options.connect_timeout
+            )
+        except Exception as e:
+            target = options.url or f"server {options.server!r}"
+            raise ConnectionError(f"Could not connect to {target}: {innermost_error(e)}") from None
+        target = options.url or options.server
+        print(f"🔥 Replaying {len(calls)} calls against {target}...", file=sys.stderr)
+        load = LoadRun(sessions, calls, options.duration, options.requests, rss_probe, options.interval)
+        return await load.run(options.concurrency, options.rate)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a workload against an MCP server and report its performance")
+    parser.add_argument("workload", help="JSON file of tool, resource and prompt calls")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--server", default="research", help="server name in the config to start over stdio (default research)")
+    target.add_argument("--url", help="SSE endpoint of a running server, e.g. http://localhost:8000/sse")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="server config file (default mcp_project/server_config.json)")
+    parser.add_argument("--pid", type=int, help="PID of an SSE server, to sample its RSS")
+    parser.add_argument("--concurrency", type=int, default=8, help="calls in flight (the cap with --rate; default 8)")
+    parser.add_argument("--rate", type=float, help="target requests per second instead of fixed concurrency")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run (default 30; 0 for no limit)")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (default no limit)")
+    parser.add_argument("--sessions", type=int, default=1, help="client sessions to spread calls over (default 1)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between timeline samples (default 1)")
+    parser.add_argument("--connect-timeout", type=float, default=30, help="seconds to wait for the sessions to start (default 30)")
+    parser.add_argument("-o", "--output", help="also write the report as JSON to this file")
+    options = parser.parse_args(argv)
+    if not options.duration and not options.requests:
+        parser.error("set --duration or --requests so the run ends")
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    try:
+        report = asyncio.run(run(options))
+    except Exception as e:
+        # Closing the transports wraps the error in their task groups again
+        error = innermost_error(e)
+        if not isinstance(error, ConnectionError):
+            raise
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+    print_report(report)
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
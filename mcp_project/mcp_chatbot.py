@@ -1,214 +1,480 @@
 from dotenv import load_dotenv
-from anthropic import Anthropic
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from contextlib import AsyncExitStack
+from anthropic import AsyncAnthropic
+from datetime import timedelta
+from mcp import types
+import argparse
 import json
 import asyncio
+import time
 import nest_asyncio
 
+from capability_catalog import CapabilityCatalog, describe_capabilities
+from chat_service import serve
+from history import compact_messages, tool_result_blocks, with_cache_breakpoints
+from registry import CapabilityRegistry
+from session_pool import ServerPool, pool_config
+from tool_cache import ToolResultCache
+from tracing import payload_size, tracer
+
 nest_asyncio.apply()
 
 load_dotenv()
 
+# Capabilities of each server, used to advertise tools before servers start
+CATALOG_FILE = ".mcp_catalog.json"
+MODEL = 'claude-3-7-sonnet-20250219'
+
 class MCP_ChatBot:
-    def __init__(self):
-        self.exit_stack = AsyncExitStack()
-        self.anthropic = Anthropic()
+    def __init__(
+        self,
+        max_concurrent_tools=8,
+        tool_timeout=60.0,
+        history_token_budget=60000,
+        max_tool_result_chars=20000,
+        keep_recent_messages=4,
+        show_token_usage=True,
+        lazy_connect=True,
+        idle_timeout=None
+    ):
+        self.anthropic = AsyncAnthropic()
         # Tools list required for Anthropic API
         self.available_tools = []
         # Prompts list for quick display 
         self.available_prompts = []
-        # Sessions dict maps tool/prompt names or resource URIs to MCP client sessions
-        self.sessions = {}
+        # Supervised session pools by server name
+        self.servers = {}
+        # Routes namespaced tools/prompts and resource URIs to server names
+        self.registry = CapabilityRegistry()
+        # Optional tool result cache, configured from server_config.json
+        self.tool_cache = None
+        # Limits for running the tool calls of a single turn concurrently
+        self.max_concurrent_tools = max_concurrent_tools
+        self.tool_timeout = tool_timeout
+        # History compaction and token reporting for long tool loops
+        self.history_token_budget = history_token_budget
+        self.max_tool_result_chars = max_tool_result_chars
+        self.keep_recent_messages = keep_recent_messages
+        self.show_token_usage = show_token_usage
+        # With lazy_connect, servers found in the capability catalog are only
+        # started on first use; idle_timeout (seconds) stops unused servers
+        self.lazy_connect = lazy_connect
+        self.idle_timeout = idle_timeout
+        self.catalog = CapabilityCatalog(CATALOG_FILE)
+        self._background_tasks = set()
 
-    async def connect_to_server(self, server_name, server_config):
-        try:
-            server_params = StdioServerParameters(**server_config)
-            stdio_transport = await self.exit_stack.enter_async_context(
-                stdio_client(server_params)
+    async def connect_to_server(self, server_name, server_config, pool_settings=None):
+        pool = ServerPool(
+            server_name, server_config, pool_settings,
+            on_notification=lambda notification, session: self.handle_notification(
+                server_name, notification, session
             )
-            read, write = stdio_transport
-            session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
+        )
+        self.servers[server_name] = pool
+        
+        capabilities = None
+        if self.lazy_connect:
+            capabilities = self.catalog.get(server_name, server_config)
+        
+        if capabilities is not None:
+            # Advertise the cached capabilities without starting the server,
+            # and re-check them in the background once it does start
+            self.register_capabilities(server_name, capabilities)
+            pool.on_start = lambda session: self.run_in_background(
+                self.refresh_capabilities(server_name, session)
             )
-            await session.initialize()
-            
-            print(f"\nConnected to {server_name}")
-            
-            tools = []
-            prompts = []
-            resources = []
-            
-            try:
-                # List available tools
-                response = await session.list_tools()
-                tools = [t.name for t in response.tools]
-                
-                for tool in response.tools:
-                    # Namespace the tool name with the server name
-                    namespaced_tool_name = f"{server_name}_{tool.name}"
-                    self.sessions[namespaced_tool_name] = session
-                    self.available_tools.append({
-                        "name": namespaced_tool_name,
-                        "description": f"[{server_name}] {tool.description}",
-                        "input_schema": tool.inputSchema
-                    })
-            except Exception as e:
-                print(f"  → No tools available")
-            
-            try:
-                # List available prompts
-                prompts_response = await session.list_prompts()
-                if prompts_response and prompts_response.prompts:
-                    prompts = [p.name for p in prompts_response.prompts]
-                    
-                    for prompt in prompts_response.prompts:
-                        self.sessions[prompt.name] = session
-                        self.available_prompts.append({
-                            "name": prompt.name,
-                            "description": prompt.description,
-                            "arguments": prompt.arguments
-                        })
-            except Exception as e:
-                # Silently ignore - not all servers support prompts
-                pass
-            
-            try:
-                # List available resources
-                resources_response = await session.list_resources()
-                if resources_response and resources_response.resources:
-                    resources = [str(r.uri) for r in resources_response.resources]
-                    
-                    for resource in resources_response.resources:
-                        resource_uri = str(resource.uri)
-                        self.sessions[resource_uri] = session
-            except Exception as e:
-                # Silently ignore - not all servers support resources
-                pass
-            
-            # Print summary for this server
-            if tools or prompts or resources:
-                summary = []
-                if tools:
-                    summary.append(f"tools: {tools}")
-                if prompts:
-                    summary.append(f"prompts: {prompts}")
-                if resources:
-                    summary.append(f"resources: {resources}")
-                print(f"  → {', '.join(summary)}")
-            else:
-                print(f"  → No capabilities discovered")
-                
+            print(f"\nLoaded {server_name} from capability catalog (starts on first use)")
+            self.print_capabilities(capabilities)
+            return
+        
+        try:
+            async with pool.acquire() as session:
+                print(f"\nConnected to {server_name}")
+                capabilities = await self.refresh_capabilities(server_name, session)
+            self.print_capabilities(capabilities)
         except Exception as e:
             print(f"Error connecting to {server_name}: {e}")
 
+    async def discover_capabilities(self, session):
+        """List the tools, prompts and resources of a running server."""
+        tools = []
+        prompts = []
+        resources = []
+        resource_templates = []
+        
+        try:
+            # List available tools
+            tools = (await session.list_tools()).tools
+        except Exception:
+            pass
+        
+        try:
+            # List available prompts
+            prompts_response = await session.list_prompts()
+            if prompts_response and prompts_response.prompts:
+                prompts = prompts_response.prompts
+        except Exception:
+            # Silently ignore - not all servers support prompts
+            pass
+        
+        try:
+            # List available resources
+            resources_response = await session.list_resources()
+            if resources_response and resources_response.resources:
+                resources = resources_response.resources
+        except Exception:
+            # Silently ignore - not all servers support resources
+            pass
+        
+        try:
+            # List available resource templates, e.g. papers://{topic}
+            templates_response = await session.list_resource_templates()
+            if templates_response and templates_response.resourceTemplates:
+                resource_templates = templates_response.resourceTemplates
+        except Exception:
+            pass
+        
+        return describe_capabilities(tools, prompts, resources, resource_templates)
+
+    async def refresh_capabilities(self, server_name, session):
+        """Discover a server's capabilities, register them and update the catalog."""
+        pool = self.servers[server_name]
+        capabilities = await self.discover_capabilities(session)
+        self.catalog.put(server_name, pool.config, capabilities)
+        self.replace_capabilities(server_name, capabilities)
+        return capabilities
+
+    def handle_notification(self, server_name, notification, session):
+        """Refresh a server's capabilities when it reports a list change."""
+        if isinstance(notification, (
+            types.ToolListChangedNotification,
+            types.PromptListChangedNotification,
+            types.ResourceListChangedNotification
+        )):
+            self.run_in_background(self.refresh_capabilities(server_name, session))
+
+    def register_capabilities(self, server_name, capabilities):
+        """Make a server's tools, prompts and resources available."""
+        self.registry.register(server_name, capabilities)
+        
+        for tool in capabilities["tools"]:
+            # Namespace the tool name with the server name
+            namespaced_tool_name = f"{server_name}_{tool['name']}"
+            self.available_tools.append({
+                "name": namespaced_tool_name,
+                "description": f"[{server_name}] {tool['description']}",
+                "input_schema": tool["inputSchema"]
+            })
+        
+        for prompt in capabilities["prompts"]:
+            # Prompts are namespaced like tools so servers cannot collide
+            self.available_prompts.append({
+                "name": f"{server_name}_{prompt['name']}",
+                "server": server_name,
+                "description": prompt["description"],
+                "arguments": prompt["arguments"]
+            })
+
+    def replace_capabilities(self, server_name, capabilities):
+        """
+        Re-register a server's capabilities with its tools where they were.
+
+        The tool list is part of the cached prompt prefix, so a refresh that
+        finds the same tools must leave available_tools unchanged.
+        """
+        server_tools = {
+            name for name, (server, _) in self.registry.tools.items() if server == server_name
+        }
+        position = next(
+            (i for i, tool in enumerate(self.available_tools) if tool["name"] in server_tools),
+            len(self.available_tools)
+        )
+        self.unregister_server(server_name)
+        following = self.available_tools[position:]
+        self.available_tools = self.available_tools[:position]
+        self.register_capabilities(server_name, capabilities)
+        self.available_tools.extend(following)
+
+    def unregister_server(self, server_name):
+        """Forget everything registered for a server."""
+        server_tools = {
+            name for name, (server, _) in self.registry.tools.items() if server == server_name
+        }
+        self.available_tools = [
+            tool for tool in self.available_tools if tool["name"] not in server_tools
+        ]
+        self.available_prompts = [
+            prompt for prompt in self.available_prompts
+            if prompt["server"] != server_name
+        ]
+        self.registry.unregister(server_name)
+
+    def print_capabilities(self, capabilities):
+        """Print a one-line summary of a server's capabilities."""
+        tools = [tool["name"] for tool in capabilities["tools"]]
+        prompts = [prompt["name"] for prompt in capabilities["prompts"]]
+        resources = capabilities["resources"]
+        
+        if tools or prompts or resources:
+            summary = []
+            if tools:
+                summary.append(f"tools: {tools}")
+            if prompts:
+                summary.append(f"prompts: {prompts}")
+            if resources:
+                summary.append(f"resources: {resources}")
+            print(f"  → {', '.join(summary)}")
+        else:
+            print(f"  → No capabilities discovered")
+
+    def run_in_background(self, coro):
+        """Run a coroutine as a task that is kept alive until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def close_idle_servers(self):
+        """Periodically stop servers that have been idle past idle_timeout."""
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            for pool in list(self.servers.values()):
+                if await pool.close_idle(self.idle_timeout):
+                    print(f"\nStopped idle server {pool.name}")
+
     async def connect_to_servers(self):
         """Connect to all configured MCP servers asynchronously."""
         try:
             with open("server_config.json", "r") as file:
                 data = json.load(file)
             servers = data.get("mcpServers", {})
+            self.tool_cache = ToolResultCache.from_config(data.get("toolCache", {}))
+            pool_section = data.get("sessionPool", {})
+            if self.idle_timeout is None:
+                self.idle_timeout = pool_section.get("idleTimeout")
             
             # Create tasks for all server connections
             tasks = [
-                self.connect_to_server(server_name, server_config)
+                self.connect_to_server(
+                    server_name, server_config, pool_config(pool_section, server_name)
+                )
                 for server_name, server_config in servers.items()
             ]
             
             # Connect to all servers in parallel
             await asyncio.gather(*tasks, return_exceptions=True)
+            
+            # Health-check and restart servers in the background
+            for pool in self.servers.values():
+                self.run_in_background(pool.supervise())
+            if self.idle_timeout:
+                self.run_in_background(self.close_idle_servers())
         except Exception as e:
             print(f"Error loading server config: {e}")
             raise
     
-    async def process_query(self, query):
-        messages = [{'role':'user', 'content':query}]
+    def resolve_tool(self, tool_name):
+        """Return (server name, pool, original tool name) for a namespaced tool."""
+        route = self.registry.resolve_tool(tool_name)
+        if route is None:
+            return None, None, tool_name
+        server_name, original_tool_name = route
+        return server_name, self.servers[server_name], original_tool_name
+    
+    async def call_tool(self, tool_use, semaphore):
+        """Run one tool_use block and return its tool_result content block."""
+        server_name, pool, original_tool_name = self.resolve_tool(tool_use.name)
         
-        while True:
-            response = self.anthropic.messages.create(
-                max_tokens = 2024,
-                model = 'claude-3-7-sonnet-20250219', 
-                tools = self.available_tools,
-                messages = messages
-            )
+        with tracer.span(
+            "tool.call",
+            server=server_name,
+            tool=original_tool_name,
+            args_bytes=payload_size(tool_use.input)
+        ) as span:
+            if not pool:
+                print(f"Tool '{tool_use.name}' not found.")
+                span.fail("tool not found")
+                return {
+                    "type": "tool_result",
+                    "tool_use_id": tool_use.id,
+                    "content": f"Tool '{tool_use.name}' not found.",
+                    "is_error": True
+                }
             
-            assistant_content = []
-            has_tool_use = False
+            if self.tool_cache:
+                cached = self.tool_cache.get(server_name, original_tool_name, tool_use.input)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    span.set(result_bytes=payload_size(cached))
+                    return {
+                        "type": "tool_result",
+                        "tool_use_id": tool_use.id,
+                        "content": tool_result_blocks(cached)
+                    }
             
-            for content in response.content:
-                if content.type == 'text':
-                    print(content.text)
-                    assistant_content.append(content)
-                elif content.type == 'tool_use':
-                    has_tool_use = True
-                    assistant_content.append(content)
-                    messages.append({'role':'assistant', 'content':assistant_content})
-                    
-                    # Get session and call tool
-                    tool_name = content.name
-                    session = None
-                    original_tool_name = tool_name
-                    
-                    # First try to find the exact namespaced tool
-                    session = self.sessions.get(tool_name)
-                    
-                    if session:
-                        # Extract the original tool name from the namespaced name
-                        if '_' in tool_name:
-                            original_tool_name = tool_name.split('_', 1)[1]
-                    else:
-                        # Fallback: try to find any session that has this tool
-                        for namespaced_name, sess in self.sessions.items():
-                            if namespaced_name.endswith(f"_{tool_name}"):
-                                session = sess
-                                original_tool_name = tool_name
-                                break
+            try:
+                async with semaphore, pool.acquire() as session:
+                    result = await session.call_tool(
+                        original_tool_name,
+                        arguments=tool_use.input,
+                        read_timeout_seconds=timedelta(seconds=self.tool_timeout)
+                    )
+                span.set(result_bytes=payload_size(result.content))
+                if result.isError:
+                    span.fail("tool returned an error")
+                if self.tool_cache:
+                    self.tool_cache.put(
+                        server_name, original_tool_name, tool_use.input, result.content,
+                        is_error=result.isError
+                    )
+                block = {
+                    "type": "tool_result",
+                    "tool_use_id": tool_use.id,
+                    "content": tool_result_blocks(result.content)
+                }
+                if result.isError:
+                    block["is_error"] = True
+                return block
+            except Exception as e:
+                print(f"Error calling tool '{tool_use.name}': {e}")
+                span.fail(e)
+                return {
+                    "type": "tool_result",
+                    "tool_use_id": tool_use.id,
+                    "content": f"Error calling tool '{tool_use.name}': {e}",
+                    "is_error": True
+                }
+    
+    async def process_query(self, query, messages=None, on_text=None):
+        """
+        Answer a query, running tools until the model stops asking for them.
+
+        messages is the history to continue (a new one by default) and
+        on_text receives the streamed text, so several conversations can
+        share one chatbot. Returns the text of the final response.
+        """
+        if messages is None:
+            messages = []
+        if on_text is None:
+            on_text = lambda text: print(text, end='', flush=True)
+        messages.append({'role':'user', 'content':query})
+        totals = {"input": 0, "cache_read": 0, "cache_write": 0, "output": 0}
+        
+        with tracer.span("chat.query", query_bytes=payload_size(query)):
+            while True:
+                semaphore = asyncio.Semaphore(self.max_concurrent_tools)
+                tool_tasks = []
+                
+                # Keep the history under budget, then mark the stable prefix
+                # (tools and everything up to the latest user message) cacheable
+                history_tokens = compact_messages(
+                    messages,
+                    self.history_token_budget,
+                    self.max_tool_result_chars,
+                    self.keep_recent_messages
+                )
+                tools, request_messages = with_cache_breakpoints(self.available_tools, messages)
+                
+                with tracer.span(
+                    "llm.call", model=MODEL, messages=len(messages), history_tokens=history_tokens
+                ) as llm_span:
+                    started = time.perf_counter()
+                    try:
+                        async with self.anthropic.messages.stream(
+                            max_tokens = 2024,
+                            model = MODEL, 
+                            tools = tools,
+                            messages = request_messages
+                        ) as stream:
+                            async for event in stream:
+                                # message_start arrives before the model has
+                                # produced anything, so time the first delta
+                                if event.type == 'content_block_delta' and "first_token_ms" not in llm_span.attributes:
+                                    llm_span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 3))
+                                if event.type == 'text':
+                                    # Emit text as it arrives
+                                    on_text(event.text)
+                                elif event.type == 'content_block_stop':
+                                    block = event.content_block
+                                    if block.type == 'text':
+                                        on_text("\n")
+                                    elif block.type == 'tool_use':
+                                        # Start each tool as soon as its block is complete,
+                                        # while the rest of the message is still streaming
+                                        tool_tasks.append(asyncio.create_task(
+                                            self.call_tool(block, semaphore)
+                                        ))
+                            response = await stream.get_final_message()
+                    except BaseException:
+                        for task in tool_tasks:
+                            task.cancel()
+                        raise
                     
-                    if not session:
-                        print(f"Tool '{content.name}' not found.")
-                        break
-                        
-                    result = await session.call_tool(original_tool_name, arguments=content.input)
-                    messages.append({
-                        "role": "user", 
-                        "content": [
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": content.id,
-                                "content": result.content
-                            }
-                        ]
-                    })
-            
-            # Exit loop if no tool was used
-            if not has_tool_use:
-                break
+                    tokens = self.report_usage(response.usage, history_tokens, totals)
+                    llm_span.set(
+                        stop_reason=response.stop_reason,
+                        tool_calls=len(tool_tasks),
+                        **{f"{kind}_tokens": count for kind, count in tokens.items()}
+                    )
+                
+                messages.append({'role':'assistant', 'content':response.content})
+                
+                # Exit loop if no tool was used
+                if not tool_tasks:
+                    return "".join(block.text for block in response.content if block.type == 'text')
+                
+                # Tasks were created in block order, so gather keeps the
+                # results in the same order as the tool_use blocks
+                tool_results = await asyncio.gather(*tool_tasks)
+                messages.append({'role':'user', 'content':list(tool_results)})
 
+    def report_usage(self, usage, history_tokens, totals):
+        """Print token usage for one model call, add it to totals and return it."""
+        cache_read = usage.cache_read_input_tokens or 0
+        cache_write = usage.cache_creation_input_tokens or 0
+        tokens = {
+            "input": usage.input_tokens,
+            "cache_read": cache_read,
+            "cache_write": cache_write,
+            "output": usage.output_tokens
+        }
+        for kind, count in tokens.items():
+            totals[kind] += count
+            tracer.count("llm_tokens", count, type=kind)
+        if not self.show_token_usage:
+            return tokens
+        print(
+            f"[tokens] input: {usage.input_tokens}, cache read: {cache_read}, "
+            f"cache write: {cache_write}, output: {usage.output_tokens} "
+            f"(history ~{history_tokens}; query total in: "
+            f"{totals['input'] + totals['cache_read'] + totals['cache_write']}, out: {totals['output']})"
+        )
+        return tokens
+    
     async def get_resource(self, resource_uri):
-        session = self.sessions.get(resource_uri)
-        
-        # Fallback for papers URIs - try any papers resource session
-        if not session and resource_uri.startswith("papers://"):
-            for uri, sess in self.sessions.items():
-                if uri.startswith("papers://"):
-                    session = sess
-                    break
+        # Exact URIs first, then templates such as papers://{topic}
+        server_name = self.registry.resolve_resource(resource_uri)
+        pool = self.servers.get(server_name)
             
-        if not session:
+        if not pool:
             print(f"Resource '{resource_uri}' not found.")
             return
         
-        try:
-            result = await session.read_resource(uri=resource_uri)
-            if result and result.contents:
-                print(f"\nResource: {resource_uri}")
-                print("Content:")
-                print(result.contents[0].text)
-            else:
-                print("No content available.")
-        except Exception as e:
-            print(f"Error: {e}")
+        with tracer.span("resource.read", server=server_name, uri=resource_uri) as span:
+            try:
+                async with pool.acquire() as session:
+                    result = await session.read_resource(uri=resource_uri)
+                span.set(result_bytes=payload_size(result.contents))
+            except Exception as e:
+                span.fail(e)
+                print(f"Error: {e}")
+                return
+        
+        if result and result.contents:
+            print(f"\nResource: {resource_uri}")
+            print("Content:")
+            print(result.contents[0].text)
+        else:
+            print("No content available.")
     
     async def list_prompts(self):
         """List all available prompts."""
@@ -227,13 +493,16 @@ class MCP_ChatBot:
     
     async def execute_prompt(self, prompt_name, args):
         """Execute a prompt with the given arguments."""
-        session = self.sessions.get(prompt_name)
-        if not session:
+        route = self.registry.resolve_prompt(prompt_name)
+        if not route:
             print(f"Prompt '{prompt_name}' not found.")
             return
+        server_name, original_prompt_name = route
         
         try:
-            result = await session.get_prompt(prompt_name, arguments=args)
+            with tracer.span("prompt.get", server=server_name, prompt=original_prompt_name):
+                async with self.servers[server_name].acquire() as session:
+                    result = await session.get_prompt(original_prompt_name, arguments=args)
             if result and result.messages:
                 prompt_content = result.messages[0].content
                 
@@ -252,17 +521,31 @@ class MCP_ChatBot:
         except Exception as e:
             print(f"Error: {e}")
     
+    def print_cache_stats(self):
+        """Print tool result cache statistics."""
+        if not self.tool_cache:
+            print("Tool result cache is disabled. Enable it under \"toolCache\" in server_config.json.")
+            return
+        stats = self.tool_cache.stats()
+        print("\nTool result cache:")
+        print(f"- Entries: {stats['entries']} ({stats['bytes']} / {stats['max_bytes']} bytes)")
+        print(f"- Hits: {stats['hits']}, misses: {stats['misses']}, evictions: {stats['evictions']}")
+        print(f"- Hit rate: {stats['hit_rate']:.1%}")
+    
     async def chat_loop(self):
         print("\nMCP Chatbot Started!")
         print("Type your queries or 'quit' to exit.")
         print("Use @folders to see available topics")
         print("Use @<topic> to search papers in that topic")
+        print("Use @<topic>/page/<n> or @<topic>/compact/<n> to page through large topics")
         print("Use /prompts to list available prompts")
         print("Use /prompt <name> <arg1=value1> to execute a prompt")
+        print("Use /cache to show tool result cache statistics")
         
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                # Read input in a thread so background MCP traffic keeps flowing
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
                 if not query:
                     continue
         
@@ -302,31 +585,51 @@ class MCP_ChatBot:
                                 args[key] = value
                         
                         await self.execute_prompt(prompt_name, args)
+                    elif command == '/cache':
+                        self.print_cache_stats()
                     else:
                         print(f"Unknown command: {command}")
                     continue
                 
                 await self.process_query(query)
                     
+            except EOFError:
+                break
             except Exception as e:
                 print(f"\nError: {str(e)}")
     
     async def cleanup(self):
-        """Cleanly close all resources using AsyncExitStack."""
-        try:
-            await self.exit_stack.aclose()
-        except RuntimeError as e:
-            if "cancel scope" in str(e):
-                # Handle the cancel scope error gracefully
-                print("Cleaning up resources...")
-            else:
-                raise
+        """Stop background tasks and every running server."""
+        for task in list(self._background_tasks):
+            task.cancel()
+        await asyncio.gather(
+            *[pool.close() for pool in self.servers.values()],
+            return_exceptions=True
+        )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Multi-server MCP chatbot")
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="serve conversations over HTTP instead of the interactive prompt"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address to serve on")
+    parser.add_argument("--port", type=int, default=8080, help="port to serve on")
+    parser.add_argument(
+        "--idle-timeout", type=float, metavar="SECONDS",
+        help="stop servers unused for this long (overrides sessionPool.idleTimeout; 0 disables)"
+    )
+    return parser.parse_args()
 
-async def main():
-    chatbot = MCP_ChatBot()
+async def main(args):
+    # Per-query token lines would interleave across users in service mode
+    chatbot = MCP_ChatBot(show_token_usage=not args.serve, idle_timeout=args.idle_timeout)
     try:
         await chatbot.connect_to_servers()
-        await chatbot.chat_loop()
+        if args.serve:
+            await serve(chatbot, args.host, args.port)
+        else:
+            await chatbot.chat_loop()
     except KeyboardInterrupt:
         print("\nShutting down gracefully...")
     finally:
@@ -336,4 +639,4 @@ async def main():
             print(f"Cleanup warning: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main(parse_args()))
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Structured JSON rendering of papers for tools and resources.
+
+Every JSON result goes through one compact encoder, with the caller choosing
+which paper fields to include and how much of each summary to keep, so
+clients can ask for exactly the data they need instead of parsing markdown.
+"""
+
+import json
+
+FORMATS = ("markdown", "json")
+PAPER_FIELDS = ("arxiv_id", "title", "authors", "published", "summary", "pdf_url")
+
+# No whitespace between tokens, and non-ASCII titles kept as-is
+_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def to_json(payload):
+    """Serialize a tool or resource result."""
+    return _encoder.encode(payload)
+
+
+def check_format(format, fields=None, summary_chars=None):
+    """Return an error message for invalid output options, or None."""
+    if format not in FORMATS:
+        return f"Unknown format '{format}'; use one of {', '.join(FORMATS)}."
+    unknown = [field for field in fields or [] if field not in PAPER_FIELDS]
+    if unknown:
+        return f"Unknown fields {', '.join(unknown)}; choose from {', '.join(PAPER_FIELDS)}."
+    if summary_chars is not None and summary_chars < 0:
+        return "summary_chars must be zero or more."
+    return None
+
+
+def truncate(text, limit):
+    """Cut text to at most limit characters at a word boundary."""
+    if limit is None or len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + "…"
+
+
+def project(paper, fields=None, summary_chars=None):
+    """Return the selected fields of a paper, with the summary truncated."""
+    selected = {field: paper.get(field) for field in fields or PAPER_FIELDS}
+    if selected.get("summary"):
+        selected["summary"] = truncate(" ".join(selected["summary"].split()), summary_chars)
+    return selected
@@ -0,0 +1,131 @@
+"""
+In-memory BM25 index over stored papers.
+
+The index covers titles, authors and summaries and is updated incrementally
+as new papers are saved, so already-harvested topics can be searched without
+going to arXiv.
+"""
+
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the "
+    "this to was were which with we our".split()
+)
+
+# Title terms count more towards a match than summary terms
+TITLE_WEIGHT = 2
+
+
+def tokenize(text):
+    """Lowercase text and split it into index terms."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class PaperIndex:
+    """Inverted index scoring papers with Okapi BM25."""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._papers = {}
+        self._doc_lengths = {}
+        self._postings = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._papers)
+
+    def _terms(self, paper):
+        terms = Counter(tokenize(paper.get("title", "")))
+        for term in terms:
+            terms[term] *= TITLE_WEIGHT
+        terms.update(tokenize(" ".join(paper.get("authors", []))))
+        terms.update(tokenize(paper.get("summary", "")))
+        return terms
+
+    def add(self, paper):
+        """Add a paper to the index, replacing any earlier copy."""
+        paper_id = paper["arxiv_id"]
+        if paper_id in self._papers:
+            self.remove(paper_id)
+
+        terms = self._terms(paper)
+        length = sum(terms.values())
+        self._papers[paper_id] = paper
+        self._doc_lengths[paper_id] = length
+        self._total_length += length
+        for term, freq in terms.items():
+            self._postings.setdefault(term, {})[paper_id] = freq
+
+    def add_many(self, papers):
+        for paper in papers:
+            self.add(paper)
+
+    def remove(self, paper_id):
+        """Drop a paper from the index if present."""
+        paper = self._papers.pop(paper_id, None)
+        if paper is None:
+            return
+        self._total_length -= self._doc_lengths.pop(paper_id)
+        for term in self._terms(paper):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(paper_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query, limit=10):
+        """Return up to limit (score, paper) pairs ordered by relevance."""
+        if not self._papers:
+            return []
+
+        n_docs = len(self._papers)
+        avg_length = self._total_length / n_docs
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for paper_id, freq in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[paper_id] / avg_length)
+                scores[paper_id] = scores.get(paper_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(score, self._papers[paper_id]) for paper_id, score in ranked]
+
+
+def rank_passages(passages, query, limit=3, k1=1.5, b=0.75):
+    """
+    Score a small list of text passages against query with BM25.
+
+    Returns up to limit (score, position) pairs, best first, leaving out
+    passages that share no terms with the query.
+    """
+    documents = [Counter(tokenize(passage)) for passage in passages]
+    if not documents:
+        return []
+    avg_length = sum(sum(doc.values()) for doc in documents) / len(documents) or 1
+    terms = set(tokenize(query))
+    doc_freq = {term: sum(1 for doc in documents if term in doc) for term in terms}
+
+    scores = []
+    for position, doc in enumerate(documents):
+        length = sum(doc.values())
+        score = 0.0
+        for term in terms:
+            freq = doc.get(term)
+            if not freq:
+                continue
+            idf = math.log(1 + (len(documents) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            norm = k1 * (1 - b + b * length / avg_length)
+            score += idf * freq * (k1 + 1) / (freq + norm)
+        if score > 0:
+            scores.append((score, position))
+    scores.sort(key=lambda item: item[0], reverse=True)
+    return scores[:limit]
@@ -0,0 +1,340 @@
+"""
+SQLite-backed store for papers and the topics they were found under.
+
+Papers are deduplicated by arXiv ID and linked to topics through a join
+table, so repeated searches accumulate papers instead of overwriting them.
+The database runs in WAL mode so resource reads are not blocked by writes.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    published TEXT,
+    summary TEXT,
+    pdf_url TEXT
+);
+CREATE TABLE IF NOT EXISTS topics (
+    name TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS topic_papers (
+    topic TEXT NOT NULL REFERENCES topics(name) ON DELETE CASCADE,
+    arxiv_id TEXT NOT NULL REFERENCES papers(arxiv_id) ON DELETE CASCADE,
+    PRIMARY KEY (topic, arxiv_id)
+);
+CREATE TABLE IF NOT EXISTS harvest_state (
+    topic TEXT PRIMARY KEY REFERENCES topics(name) ON DELETE CASCADE,
+    next_start INTEGER NOT NULL DEFAULT 0,
+    last_seen TEXT,
+    pass_newest TEXT,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS paper_text (
+    arxiv_id TEXT PRIMARY KEY,
+    chunk_count INTEGER NOT NULL,
+    text_chars INTEGER NOT NULL,
+    pdf_bytes INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS paper_chunks (
+    arxiv_id TEXT NOT NULL REFERENCES paper_text(arxiv_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (arxiv_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_papers_title ON papers(title);
+CREATE INDEX IF NOT EXISTS idx_papers_published ON papers(published);
+CREATE INDEX IF NOT EXISTS idx_topic_papers_paper ON topic_papers(arxiv_id);
+-- Authors are read from papers.authors; this table had no readers
+DROP INDEX IF EXISTS idx_paper_authors_name;
+DROP TABLE IF EXISTS paper_authors;
+"""
+
+PAPER_COLUMNS = "p.arxiv_id, p.title, p.authors, p.published, p.summary, p.pdf_url"
+
+
+def normalize_topic(topic):
+    """Turn a free-form topic into the key used for storage."""
+    return topic.lower().replace(" ", "_")
+
+
+def _row_to_paper(row):
+    return {
+        "title": row["title"],
+        "authors": json.loads(row["authors"]),
+        "published": row["published"],
+        "summary": row["summary"],
+        "pdf_url": row["pdf_url"],
+        "arxiv_id": row["arxiv_id"],
+    }
+
+
+class PaperStore:
+    """Paper/topic store backed by a single SQLite database file."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def upsert_papers(self, topic, papers):
+        """Insert or update papers and link them to topic."""
+        with self._lock, self._conn:
+            self._add_to_topic(normalize_topic(topic), papers)
+
+    def _add_to_topic(self, topic, papers):
+        self._conn.execute("INSERT OR IGNORE INTO topics (name) VALUES (?)", (topic,))
+        for paper in papers:
+            self._upsert_paper(paper)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO topic_papers (topic, arxiv_id) VALUES (?, ?)",
+                (topic, paper["arxiv_id"]),
+            )
+
+    def _upsert_paper(self, paper):
+        self._conn.execute(
+            """
+            INSERT INTO papers (arxiv_id, title, authors, published, summary, pdf_url)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(arxiv_id) DO UPDATE SET
+                title = excluded.title,
+                authors = excluded.authors,
+                published = excluded.published,
+                summary = excluded.summary,
+                pdf_url = excluded.pdf_url
+            """,
+            (
+                paper["arxiv_id"],
+                paper["title"],
+                json.dumps(paper["authors"]),
+                paper.get("published"),
+                paper.get("summary"),
+                paper.get("pdf_url"),
+            ),
+        )
+
+    def harvest_state(self, topic):
+        """
+        Return the harvest cursor of topic.
+
+        next_start is the arXiv result offset to resume from, last_seen the
+        newest published date of the last completed harvest, and pass_newest
+        the newest date seen by the harvest in progress.
+        """
+        row = self._conn.execute(
+            "SELECT next_start, last_seen, pass_newest FROM harvest_state WHERE topic = ?",
+            (normalize_topic(topic),),
+        ).fetchone()
+        if row is None:
+            return {"next_start": 0, "last_seen": None, "pass_newest": None}
+        return dict(row)
+
+    def save_harvest_page(self, topic, papers, next_start, last_seen, pass_newest):
+        """
+        Merge one page of harvested papers and move the topic's cursor.
+
+        Both happen in one transaction, so an interrupted harvest resumes
+        after the last page that was stored in full.
+        """
+        topic = normalize_topic(topic)
+        with self._lock, self._conn:
+            self._add_to_topic(topic, papers)
+            self._conn.execute(
+                """
+                INSERT INTO harvest_state (topic, next_start, last_seen, pass_newest)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(topic) DO UPDATE SET
+                    next_start = excluded.next_start,
+                    last_seen = excluded.last_seen,
+                    pass_newest = excluded.pass_newest,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (topic, next_start, last_seen, pass_newest),
+            )
+
+    def save_chunks(self, arxiv_id, chunks, pdf_bytes):
+        """Replace the full-text chunks of a paper, stored zlib-compressed."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM paper_text WHERE arxiv_id = ?", (arxiv_id,))
+            self._conn.execute(
+                """
+                INSERT INTO paper_text (arxiv_id, chunk_count, text_chars, pdf_bytes)
+                VALUES (?, ?, ?, ?)
+                """,
+                (arxiv_id, len(chunks), sum(len(chunk) for chunk in chunks), pdf_bytes),
+            )
+            self._conn.executemany(
+                "INSERT INTO paper_chunks (arxiv_id, position, body) VALUES (?, ?, ?)",
+                [(arxiv_id, i, zlib.compress(chunk.encode())) for i, chunk in enumerate(chunks)],
+            )
+
+    def get_chunks(self, arxiv_id):
+        """Return the full-text chunks of a paper in order, or None if not ingested."""
+        if not self.has_text(arxiv_id):
+            return None
+        rows = self._conn.execute(
+            "SELECT body FROM paper_chunks WHERE arxiv_id = ? ORDER BY position", (arxiv_id,)
+        )
+        return [zlib.decompress(row["body"]).decode() for row in rows]
+
+    def chunk_count(self, arxiv_id):
+        """Return how many full-text chunks a paper has, or None if not ingested."""
+        row = self._conn.execute(
+            "SELECT chunk_count FROM paper_text WHERE arxiv_id = ?", (arxiv_id,)
+        ).fetchone()
+        return row["chunk_count"] if row else None
+
+    def has_text(self, arxiv_id):
+        """Return whether the full text of a paper has been ingested."""
+        return self.chunk_count(arxiv_id) is not None
+
+    def get_paper(self, arxiv_id):
+        """Return a stored paper by ID, or None."""
+        row = self._conn.execute(
+            f"SELECT {PAPER_COLUMNS} FROM papers p WHERE p.arxiv_id = ?", (arxiv_id,)
+        ).fetchone()
+        return _row_to_paper(row) if row else None
+
+    def get_papers(self, arxiv_ids):
+        """Return a dict of arxiv_id -> paper for the IDs that are stored."""
+        arxiv_ids = list(dict.fromkeys(arxiv_ids))
+        papers = {}
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(arxiv_ids), 500):
+            chunk = arxiv_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT {PAPER_COLUMNS} FROM papers p WHERE p.arxiv_id IN ({placeholders})",
+                chunk,
+            )
+            for row in rows:
+                papers[row["arxiv_id"]] = _row_to_paper(row)
+        return papers
+
+    def paper_topics(self, arxiv_ids):
+        """Return a dict of arxiv_id -> sorted topics for the given IDs."""
+        arxiv_ids = list(dict.fromkeys(arxiv_ids))
+        topics = {}
+        for i in range(0, len(arxiv_ids), 500):
+            chunk = arxiv_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"""
+                SELECT arxiv_id, topic FROM topic_papers
+                WHERE arxiv_id IN ({placeholders}) ORDER BY topic
+                """,
+                chunk,
+            )
+            for row in rows:
+                topics.setdefault(row["arxiv_id"], []).append(row["topic"])
+        return topics
+
+    def iter_papers(self):
+        """Yield every stored paper."""
+        for row in self._conn.execute(f"SELECT {PAPER_COLUMNS} FROM papers p"):
+            yield _row_to_paper(row)
+
+    def list_topics(self):
+        """Return (topic, paper_count) pairs for topics with papers."""
+        rows = self._conn.execute(
+            """
+            SELECT topic, COUNT(*) AS n FROM topic_papers
+            GROUP BY topic ORDER BY topic
+            """
+        ).fetchall()
+        return [(row["topic"], row["n"]) for row in rows]
+
+    def count_topic_papers(self, topic):
+        """Return how many papers are stored under topic."""
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM topic_papers WHERE topic = ?", (normalize_topic(topic),)
+        ).fetchone()
+        return row[0]
+
+    def newest_published(self, topic):
+        """Return the newest published date stored under topic, or None."""
+        row = self._conn.execute(
+            """
+            SELECT MAX(p.published) FROM topic_papers tp
+            JOIN papers p ON p.arxiv_id = tp.arxiv_id
+            WHERE tp.topic = ?
+            """,
+            (normalize_topic(topic),),
+        ).fetchone()
+        return row[0]
+
+    def iter_topic_papers(self, topic, offset=0, limit=None, compact=False):
+        """
+        Lazily yield one page of papers stored under topic, newest first.
+
+        With compact, only arxiv_id, title and published are read.
+        """
+        columns = "p.arxiv_id, p.title, p.published" if compact else PAPER_COLUMNS
+        rows = self._conn.execute(
+            f"""
+            SELECT {columns} FROM topic_papers tp
+            JOIN papers p ON p.arxiv_id = tp.arxiv_id
+            WHERE tp.topic = ?
+            ORDER BY p.published DESC, p.arxiv_id
+            LIMIT ? OFFSET ?
+            """,
+            (normalize_topic(topic), -1 if limit is None else limit, offset),
+        )
+        for row in rows:
+            yield dict(row) if compact else _row_to_paper(row)
+
+    def migrate_json_dir(self, paper_dir):
+        """
+        Import legacy papers/<topic>/papers_info.json files.
+
+        Runs once per database; later calls are no-ops.
+        """
+        done = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'json_migrated'"
+        ).fetchone()
+        if done or not os.path.isdir(paper_dir):
+            return 0
+
+        migrated = 0
+        for topic_dir in sorted(os.listdir(paper_dir)):
+            papers_file = os.path.join(paper_dir, topic_dir, "papers_info.json")
+            if not os.path.isfile(papers_file):
+                continue
+            try:
+                with open(papers_file, "r") as f:
+                    papers_data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            papers = [
+                {**paper, "arxiv_id": paper.get("arxiv_id", paper_id)}
+                for paper_id, paper in papers_data.items()
+            ]
+            self.upsert_papers(topic_dir, papers)
+            migrated += len(papers)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')"
+            )
+        return migrated
@@ -0,0 +1,276 @@
+"""
+Memory-mapped hashed TF-IDF vectors for finding similar papers.
+
+Each paper's title and summary are hashed into a fixed number of buckets
+(words and word pairs), stored as sublinear term frequencies in a float32
+matrix backed by a memory-mapped file. Document frequencies are kept per
+bucket, so IDF weighting is applied at query time and new papers never
+require re-encoding old ones. Queries are answered with one matrix product
+over the whole store. Needs the optional numpy package (the "similarity"
+extra); without it the vectors are simply not maintained.
+
+Several processes may share the files (a pool of research servers, or a
+chatbot's next to the inspector's). Writers take a lock and first adopt the rows others
+appended since their last write, so no two papers are given the same row.
+"""
+
+import json
+import os
+import tempfile
+import zlib
+from contextlib import contextmanager
+
+from paper_index import tokenize
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on Windows; a single writer is assumed there
+    fcntl = None
+
+# Rows processed per matrix product, bounding temporary memory
+BATCH_ROWS = 8192
+
+
+def _hash(term, dim):
+    # crc32 rather than hash() so buckets are stable across processes
+    return zlib.crc32(term.encode()) % dim
+
+
+class PaperVectors:
+    """Hashed TF-IDF matrix of stored papers with incremental updates."""
+
+    def __init__(self, path, dim=2048):
+        self.path = path
+        self.meta_path = path + ".json"
+        self.lock_path = path + ".lock"
+        self.dim = dim
+        self._ids = []
+        self._rows = {}
+        self._matrix = None
+        self._df = None
+        self._norms = None
+        # (mtime, size) of the meta file as last read or written
+        self._meta_stamp = None
+        if np is not None:
+            with self._locked():
+                self._load()
+
+    @property
+    def available(self):
+        return np is not None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, arxiv_id):
+        return arxiv_id in self._rows
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.meta_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_meta(self):
+        """Return the saved IDs, or None if the saved vectors are unusable."""
+        stamp = self._stamp()
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            capacity = os.path.getsize(self.path) // (4 * self.dim)
+        except (OSError, ValueError):
+            # Missing, or truncated by a crash mid-write
+            return None
+        if not isinstance(meta, dict) or meta.get("dim") != self.dim:
+            return None
+        ids = meta.get("ids")
+        if not isinstance(ids, list) or len(ids) > capacity:
+            return None
+        self._meta_stamp = stamp
+        return ids
+
+    def _load(self):
+        # Unusable vectors are rebuilt by add_many
+        self._ids = self._read_meta() or []
+        self._rows = {arxiv_id: row for row, arxiv_id in enumerate(self._ids)}
+        capacity = os.path.getsize(self.path) // (4 * self.dim) if self._ids else 0
+        self._open(max(capacity, 1024))
+        self._df = (self._matrix[:len(self._ids)] > 0).sum(axis=0).astype(np.float32)
+        self._norms = None
+
+    def _sync(self):
+        """Adopt rows other processes have appended since this one last wrote."""
+        if self._stamp() == self._meta_stamp:
+            return
+        ids = self._read_meta()
+        if ids is None or ids == self._ids:
+            return
+        if ids[:len(self._ids)] != self._ids:
+            # Rebuilt by another process
+            self._load()
+            return
+        start = len(self._ids)
+        capacity = os.path.getsize(self.path) // (4 * self.dim)
+        if capacity > self._matrix.shape[0]:
+            self._open(capacity)
+        for row, arxiv_id in enumerate(ids[start:], start):
+            self._rows[arxiv_id] = row
+        self._ids = ids
+        self._df += (self._matrix[start:len(ids)] > 0).sum(axis=0)
+        self._norms = None
+
+    def _open(self, capacity):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+        mode = "r+" if os.path.exists(self.path) else "w+"
+        if mode == "r+" and os.path.getsize(self.path) < capacity * 4 * self.dim:
+            with open(self.path, "r+b") as f:
+                f.truncate(capacity * 4 * self.dim)
+        self._matrix = np.memmap(self.path, dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+
+    def _encode(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        terms = tokenize(text)
+        terms += [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+        for term in terms:
+            vector[_hash(term, self.dim)] += 1
+        nonzero = vector > 0
+        vector[nonzero] = 1 + np.log(vector[nonzero])
+        return vector
+
+    def _paper_text(self, paper):
+        return f"{paper.get('title', '')} {paper.get('summary', '')}"
+
+    def add_many(self, papers, replace=False):
+        """
+        Encode and store papers, skipping ones already stored unless replace.
+
+        Returns how many papers were written.
+        """
+        if np is None:
+            return 0
+        with self._locked():
+            self._sync()
+            return self._add(papers, replace)
+
+    def _add(self, papers, replace):
+        written = 0
+        for paper in papers:
+            arxiv_id = paper["arxiv_id"]
+            row = self._rows.get(arxiv_id)
+            if row is not None and not replace:
+                continue
+            vector = self._encode(self._paper_text(paper))
+            if row is None:
+                row = len(self._ids)
+                if row >= self._matrix.shape[0]:
+                    self._open(self._matrix.shape[0] * 2)
+                self._ids.append(arxiv_id)
+                self._rows[arxiv_id] = row
+            else:
+                self._df -= self._matrix[row] > 0
+            self._matrix[row] = vector
+            self._df += vector > 0
+            written += 1
+        if written:
+            self._norms = None
+            self._save()
+        return written
+
+    def _save(self):
+        self._matrix.flush()
+        # A unique temp name, so a reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.meta_path) or ".",
+            prefix=os.path.basename(self.meta_path) + ".",
+            suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"dim": self.dim, "ids": self._ids}, f)
+            os.replace(tmp_path, self.meta_path)
+            self._meta_stamp = self._stamp()
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _idf(self):
+        n_docs = len(self._ids)
+        return (np.log((1 + n_docs) / (1 + self._df)) + 1).astype(np.float32)
+
+    def _row_norms(self, idf):
+        # Cached until the next write, since IDF changes with every new paper
+        if self._norms is None:
+            n_docs = len(self._ids)
+            squared_idf = idf * idf
+            norms = np.empty(n_docs, dtype=np.float32)
+            for start in range(0, n_docs, BATCH_ROWS):
+                block = self._matrix[start:start + BATCH_ROWS][:n_docs - start]
+                norms[start:start + len(block)] = np.sqrt((block * block) @ squared_idf)
+            self._norms = np.maximum(norms, 1e-9)
+        return self._norms
+
+    def similar(self, seeds, limit=5):
+        """
+        Rank stored papers by cosine similarity to each seed.
+
+        seeds is a list of arXiv IDs (stored papers) or free text. Returns one
+        list of (score, arxiv_id) pairs per seed, best first, excluding the
+        seed paper itself.
+        """
+        n_docs = len(self._ids)
+        if not n_docs or not seeds:
+            return [[] for _ in seeds]
+
+        idf = self._idf()
+        queries = np.stack([
+            self._matrix[self._rows[seed]] if seed in self._rows else self._encode(seed)
+            for seed in seeds
+        ]) * idf
+        query_norms = np.maximum(np.linalg.norm(queries, axis=1), 1e-9)
+        # Weighting the queries by idf twice applies idf to both sides
+        weighted = (queries * idf).T
+        scores = np.empty((len(seeds), n_docs), dtype=np.float32)
+        for start in range(0, n_docs, BATCH_ROWS):
+            block = self._matrix[start:start + BATCH_ROWS][:n_docs - start]
+            scores[:, start:start + len(block)] = (block @ weighted).T
+        scores /= self._row_norms(idf)
+        scores /= query_norms[:, None]
+
+        results = []
+        for seed, row_scores in zip(seeds, scores):
+            own_row = self._rows.get(seed)
+            if own_row is not None:
+                row_scores[own_row] = -1
+            k = min(limit, n_docs)
+            if k < 1:
+                results.append([])
+                continue
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top])]
+            results.append([
+                (float(row_scores[row]), self._ids[row]) for row in top if row_scores[row] > 0
+            ])
+        return results
@@ -0,0 +1,154 @@
+"""
+Full-text ingestion of arXiv PDFs.
+
+PDFs are streamed with a bounded number of concurrent downloads, their text
+is extracted in a process pool so parsing never blocks the event loop, and
+the text is split into overlapping chunks saved compressed in the paper
+store. Text extraction needs the optional pypdf package (the "pdf" extra).
+"""
+
+import asyncio
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import httpx
+
+from tracing import tracer
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+ARXIV_PDF_URL = "https://arxiv.org/pdf/{}"
+
+
+def extract_text(data: bytes) -> str:
+    """Extract the text of every page of a PDF. Runs in a worker process."""
+    reader = PdfReader(BytesIO(data))
+    pages = [page.extract_text() or "" for page in reader.pages]
+    return "\n\n".join(pages)
+
+
+def chunk_text(text: str, chunk_chars: int = 1500, overlap: int = 200) -> list[str]:
+    """
+    Split text into chunks of about chunk_chars characters.
+
+    Chunks end at a paragraph, sentence or word boundary where one falls in
+    the back half of the window, and consecutive chunks share up to overlap
+    characters so a passage cut in two is still found whole in one of them.
+    """
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n\s*\n\s*", "\n\n", text).strip()
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            floor = start + chunk_chars // 2
+            for boundary in ("\n\n", ". ", " "):
+                cut = text.rfind(boundary, floor, end)
+                if cut != -1:
+                    end = cut + len(boundary)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+        # Start the overlap on a word boundary
+        space = text.find(" ", start, end)
+        if space != -1:
+            start = space + 1
+    return chunks
+
+
+class PdfIngestor:
+    """Downloads, extracts and stores paper full text with bounded concurrency."""
+
+    def __init__(
+        self,
+        store,
+        max_downloads=4,
+        max_workers=2,
+        timeout=60.0,
+        max_bytes=50 * 1024 * 1024,
+        chunk_chars=1500,
+    ):
+        self.store = store
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.chunk_chars = chunk_chars
+        self.max_workers = max_workers
+        self._semaphore = asyncio.Semaphore(max_downloads)
+        self._in_flight = {}
+        self._client = None
+        self._executor = None
+
+    def _get_client(self):
+        # Created lazily so the client binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
+        return self._client
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def ingest(self, arxiv_id, pdf_url=None):
+        """
+        Make sure the full text of a paper is stored; return its chunk count.
+
+        Papers already ingested are not downloaded again, and concurrent
+        calls for the same paper share one download.
+        """
+        chunk_count = self.store.chunk_count(arxiv_id)
+        if chunk_count is not None:
+            return chunk_count
+        if PdfReader is None:
+            raise RuntimeError("PDF ingestion needs pypdf; install the 'pdf' extra")
+        task = self._in_flight.get(arxiv_id)
+        if task is None:
+            task = asyncio.ensure_future(self._ingest(arxiv_id, pdf_url))
+            self._in_flight[arxiv_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(arxiv_id, None))
+        # Shield so one cancelled caller does not cancel the shared ingestion
+        return await asyncio.shield(task)
+
+    async def _ingest(self, arxiv_id, pdf_url):
+        url = pdf_url or ARXIV_PDF_URL.format(arxiv_id)
+        with tracer.span("pdf.ingest", paper=arxiv_id) as span:
+            data = await self._download(url)
+            text = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), extract_text, data
+            )
+            chunks = chunk_text(text, self.chunk_chars)
+            if not chunks:
+                raise ValueError(f"No text could be extracted from {url}")
+            self.store.save_chunks(arxiv_id, chunks, len(data))
+            span.set(pdf_bytes=len(data), text_chars=len(text), chunks=len(chunks))
+            return len(chunks)
+
+    async def _download(self, url):
+        async with self._semaphore:
+            async with self._get_client().stream("GET", url) as response:
+                response.raise_for_status()
+                body = bytearray()
+                async for block in response.aiter_bytes():
+                    body.extend(block)
+                    if len(body) > self.max_bytes:
+                        raise ValueError(f"PDF at {url} is larger than {self.max_bytes} bytes")
+        if not body.startswith(b"%PDF"):
+            raise ValueError(f"{url} did not return a PDF")
+        return bytes(body)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
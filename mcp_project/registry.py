@@ -0,0 +1,151 @@
+"""
+Routing table for tools, prompts and resources across MCP servers.
+
+Tools and prompts are namespaced as "<server>_<name>" and looked up by exact
+match, so server names containing underscores route correctly. Resource URIs
+are matched exactly first, then against URI templates such as
+"papers://{topic}" stored in a segment trie.
+"""
+
+import re
+
+_SCHEME_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9+.-]*)://(.*)$")
+
+
+def _split_uri(uri):
+    match = _SCHEME_RE.match(uri)
+    if not match:
+        return None, uri.split("/")
+    scheme, rest = match.groups()
+    return scheme, rest.split("/")
+
+
+def _is_param(segment):
+    return segment.startswith("{") and segment.endswith("}")
+
+
+class _TrieNode:
+    __slots__ = ("children", "param", "value")
+
+    def __init__(self):
+        self.children = {}
+        self.param = None
+        self.value = None
+
+
+class UriTemplateTrie:
+    """Maps URI templates to values, matching one path segment per level."""
+
+    def __init__(self):
+        self._roots = {}
+
+    def insert(self, template, value):
+        scheme, segments = _split_uri(template)
+        node = self._roots.setdefault(scheme, _TrieNode())
+        for segment in segments:
+            if _is_param(segment):
+                if node.param is None:
+                    node.param = _TrieNode()
+                node = node.param
+            else:
+                node = node.children.setdefault(segment, _TrieNode())
+        node.value = value
+
+    def match(self, uri):
+        """Return the value of the most specific matching template, or None."""
+        scheme, segments = _split_uri(uri)
+        root = self._roots.get(scheme)
+        if root is None:
+            return None
+        return self._match(root, segments, 0)
+
+    def _match(self, node, segments, i):
+        if i == len(segments):
+            return node.value
+        # Literal segments win over parameters, backtracking if they dead-end
+        child = node.children.get(segments[i])
+        if child is not None:
+            found = self._match(child, segments, i + 1)
+            if found is not None:
+                return found
+        if node.param is not None and segments[i]:
+            return self._match(node.param, segments, i + 1)
+        return None
+
+    def remove_values(self, predicate):
+        """Drop every template whose value matches predicate."""
+        for root in self._roots.values():
+            self._remove(root, predicate)
+
+    def _remove(self, node, predicate):
+        if node.value is not None and predicate(node.value):
+            node.value = None
+        for child in node.children.values():
+            self._remove(child, predicate)
+        if node.param is not None:
+            self._remove(node.param, predicate)
+
+
+class CapabilityRegistry:
+    """Exact-match routing from tool, prompt and resource names to servers."""
+
+    def __init__(self):
+        # Namespaced tool name -> (server name, original tool name)
+        self.tools = {}
+        # Namespaced prompt name -> (server name, original prompt name)
+        self.prompts = {}
+        # Original prompt name -> namespaced names, for unambiguous short names
+        self._prompt_aliases = {}
+        # Static resource URI -> server name
+        self.resources = {}
+        self.templates = UriTemplateTrie()
+
+    def register(self, server_name, capabilities):
+        """Add routes for everything a server advertises."""
+        for tool in capabilities["tools"]:
+            self.tools[f"{server_name}_{tool['name']}"] = (server_name, tool["name"])
+        for prompt in capabilities["prompts"]:
+            namespaced = f"{server_name}_{prompt['name']}"
+            self.prompts[namespaced] = (server_name, prompt["name"])
+            self._prompt_aliases.setdefault(prompt["name"], set()).add(namespaced)
+        for uri in capabilities["resources"]:
+            self.resources[uri] = server_name
+        for template in capabilities.get("resource_templates", []):
+            self.templates.insert(template, server_name)
+
+    def unregister(self, server_name):
+        """Remove every route that points at a server."""
+        self.tools = {k: v for k, v in self.tools.items() if v[0] != server_name}
+        self.prompts = {k: v for k, v in self.prompts.items() if v[0] != server_name}
+        self._prompt_aliases = {
+            name: {n for n in namespaced if n in self.prompts}
+            for name, namespaced in self._prompt_aliases.items()
+        }
+        self.resources = {k: v for k, v in self.resources.items() if v != server_name}
+        self.templates.remove_values(lambda value: value == server_name)
+
+    def resolve_tool(self, tool_name):
+        """Return (server, original name) for a namespaced tool, or None."""
+        return self.tools.get(tool_name)
+
+    def resolve_prompt(self, prompt_name):
+        """
+        Return (server, original name) for a prompt, or None.
+
+        Accepts the namespaced name, or the original name when only one
+        server offers a prompt by that name.
+        """
+        route = self.prompts.get(prompt_name)
+        if route is not None:
+            return route
+        namespaced = self._prompt_aliases.get(prompt_name, set())
+        if len(namespaced) == 1:
+            return self.prompts[next(iter(namespaced))]
+        return None
+
+    def resolve_resource(self, uri):
+        """Return the server that serves uri, or None."""
+        server_name = self.resources.get(uri)
+        if server_name is not None:
+            return server_name
+        return self.templates.match(uri)
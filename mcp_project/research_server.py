@@ -1,114 +1,717 @@
+import asyncio
 import json
 import os
-import arxiv
+from contextlib import asynccontextmanager
 from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from starlette.responses import PlainTextResponse
+
+from arxiv_cache import ArxivCache, paper_key, search_key
+from arxiv_client import ARXIV_API_URL, AsyncArxivClient
+from paper_format import check_format, project, to_json, truncate
+from paper_index import PaperIndex, rank_passages
+from paper_store import PaperStore, normalize_topic
+from paper_vectors import PaperVectors
+from pdf_ingest import PdfIngestor
+from topic_scheduler import TopicScheduler
+from tracing import traced, tracer
 
 # Constants
 PAPER_DIR = "papers"
+PAPER_DB = os.path.join(PAPER_DIR, "papers.db")
+PAPER_VECTORS = os.path.join(PAPER_DIR, "vectors.f32")
+CACHE_FILE = os.path.join("cache", "arxiv_cache.json")
+CACHE_TTL_SECONDS = int(os.environ.get("ARXIV_CACHE_TTL", 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get("ARXIV_CACHE_MAX_ENTRIES", 512))
+CACHE_SERVE_STALE = os.environ.get("ARXIV_CACHE_SERVE_STALE", "0") == "1"
+ARXIV_MAX_CONCURRENCY = int(os.environ.get("ARXIV_MAX_CONCURRENCY", 4))
+ARXIV_TIMEOUT_SECONDS = float(os.environ.get("ARXIV_TIMEOUT", 15))
+# "sse" serves HTTP on port 8000; "stdio" for clients that spawn the server
+MCP_TRANSPORT = os.environ.get("MCP_TRANSPORT", "sse")
+# Maximum IDs sent in a single arXiv id_list query
+ARXIV_ID_CHUNK_SIZE = 50
+# Papers per page for the paginated papers:// resources
+TOPIC_PAGE_SIZE = int(os.environ.get("TOPIC_PAGE_SIZE", 20))
+# Summary length in the papers:// resources, markdown and JSON alike
+RESOURCE_SUMMARY_CHARS = 500
+# Minimum BM25 score for a stored paper to count as a local hit
+LOCAL_MIN_SCORE = float(os.environ.get("LOCAL_MIN_SCORE", 1.0))
+# Results per arXiv request when harvesting a topic, and the pause between
+# pages (arXiv asks clients to wait 3 seconds between requests)
+HARVEST_PAGE_SIZE = int(os.environ.get("HARVEST_PAGE_SIZE", 100))
+HARVEST_PAGE_DELAY = float(os.environ.get("HARVEST_PAGE_DELAY", 3.0))
+# Background refresh of watched topics; REFRESH_INTERVAL=0 turns it off.
+# Stored topics are always watched, WATCH_TOPICS adds more (comma-separated)
+REFRESH_INTERVAL = float(os.environ.get("REFRESH_INTERVAL", 0))
+REFRESH_JITTER = float(os.environ.get("REFRESH_JITTER", 0.1))
+REFRESH_MIN_GAP = float(os.environ.get("REFRESH_MIN_GAP", 3.0))
+REFRESH_MAX_PAPERS = int(os.environ.get("REFRESH_MAX_PAPERS", 100))
+WATCH_TOPICS = [t.strip() for t in os.environ.get("WATCH_TOPICS", "").split(",") if t.strip()]
+# max_results of the search_papers calls the refresh pre-caches
+REFRESH_SEARCH_RESULTS = 5
+# Full-text ingestion of paper PDFs
+PDF_MAX_DOWNLOADS = int(os.environ.get("PDF_MAX_DOWNLOADS", 4))
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", 2))
+PDF_CHUNK_CHARS = int(os.environ.get("PDF_CHUNK_CHARS", 1500))
+PDF_MAX_BYTES = int(float(os.environ.get("PDF_MAX_MB", 50)) * 1024 * 1024)
+# Hash buckets per paper vector for find_similar_papers
+SIMILAR_DIM = int(os.environ.get("SIMILAR_DIM", 2048))
+
+_scheduler_task = None
+
+def start_scheduler():
+    """Start refreshing watched topics in the background, once per process."""
+    global _scheduler_task
+    if REFRESH_INTERVAL > 0 and _scheduler_task is None:
+        _scheduler_task = asyncio.create_task(topic_scheduler.run())
+
+@asynccontextmanager
+async def lifespan(server):
+    start_scheduler()
+    yield
 
 # Initialize FastMCP with a port number.
-mcp = FastMCP("research-server", port=8000)
+mcp = FastMCP("research-server", port=8000, lifespan=lifespan)
+
+# Shared non-blocking arXiv client
+arxiv_client = AsyncArxivClient(
+    base_url=os.environ.get("ARXIV_API_URL", ARXIV_API_URL),
+    max_concurrency=ARXIV_MAX_CONCURRENCY,
+    timeout=ARXIV_TIMEOUT_SECONDS
+)
+
+# Shared cache for arXiv searches and paper lookups
+arxiv_cache = ArxivCache(
+    CACHE_FILE,
+    ttl_seconds=CACHE_TTL_SECONDS,
+    max_entries=CACHE_MAX_ENTRIES,
+    serve_stale=CACHE_SERVE_STALE
+)
+
+# Paper store, seeded from the legacy per-topic JSON files on first run
+paper_store = PaperStore(PAPER_DB)
+paper_store.migrate_json_dir(PAPER_DIR)
+
+# Full-text index over every stored paper
+paper_index = PaperIndex()
+paper_index.add_many(paper_store.iter_papers())
+
+# Similarity vectors over every stored paper, persisted between runs
+paper_vectors = PaperVectors(PAPER_VECTORS, dim=SIMILAR_DIM)
+paper_vectors.add_many(paper_store.iter_papers())
+
+# Downloads paper PDFs and stores their text in chunks
+pdf_ingestor = PdfIngestor(
+    paper_store,
+    max_downloads=PDF_MAX_DOWNLOADS,
+    max_workers=PDF_WORKERS,
+    max_bytes=PDF_MAX_BYTES,
+    chunk_chars=PDF_CHUNK_CHARS
+)
+
+async def _fetch_search(topic: str, max_results: int) -> list[dict]:
+    """
+    Run a topic search against arXiv and store the results.
+
+    Storing happens here rather than in search_papers, so cache hits, whose
+    papers were stored when they were fetched, skip the SQLite, index and
+    vector writes.
+    """
+    results = await arxiv_client.search(topic, max_results=max_results)
+    # Merge results into the store, keeping papers found earlier
+    paper_store.upsert_papers(topic, results)
+    paper_index.add_many(results)
+    paper_vectors.add_many(results)
+    return results
+
+def _paper_entries(papers: list[dict]) -> dict:
+    """Per-paper cache entries, so searches also warm extract_info."""
+    return {paper_key(p["arxiv_id"]): p for p in papers}
+
+async def _fetch_paper(paper_id: str) -> dict:
+    """Look up a single paper on arXiv by its ID."""
+    papers = await arxiv_client.fetch_ids([paper_id])
+    if not papers:
+        raise LookupError(f"No paper found with ID {paper_id}")
+    return papers[0]
+
+async def _fetch_papers(paper_ids: list[str]) -> tuple[dict, dict]:
+    """
+    Fetch many papers from arXiv in chunked id_list queries.
+
+    Returns (fetched, errors): papers by requested ID, and for every ID in a
+    chunk whose request failed, that request's error message.
+    """
+    chunks = [
+        paper_ids[i:i + ARXIV_ID_CHUNK_SIZE]
+        for i in range(0, len(paper_ids), ARXIV_ID_CHUNK_SIZE)
+    ]
+    responses = await asyncio.gather(
+        *[arxiv_client.fetch_ids(chunk) for chunk in chunks],
+        return_exceptions=True
+    )
+    fetched = {}
+    errors = {}
+    for requested, papers in zip(chunks, responses):
+        if isinstance(papers, Exception):
+            errors.update(dict.fromkeys(requested, str(papers)))
+            continue
+        for paper in papers:
+            # arXiv answers unversioned IDs with the latest versioned one
+            for paper_id in requested:
+                if paper["arxiv_id"] == paper_id or paper["arxiv_id"].startswith(f"{paper_id}v"):
+                    fetched[paper_id] = paper
+    if fetched:
+        arxiv_cache.set_many({paper_key(pid): paper for pid, paper in fetched.items()})
+    return fetched, errors
+
+def _format_paper_details(paper_id: str, paper: dict, summary_chars: int | None = None) -> str:
+    """Render the full details of one paper as markdown."""
+    return (
+        f"**Paper Details for {paper_id}**\n\n"
+        f"**Title**: {paper['title']}\n\n"
+        f"**Authors**: {', '.join(paper['authors'])}\n\n"
+        f"**Published**: {paper['published']}\n\n"
+        f"**PDF URL**: {paper['pdf_url']}\n\n"
+        f"**Summary**: {truncate(paper['summary'], summary_chars)}\n\n"
+    )
+
+def _format_search_summary(heading: str, results: list[dict], scores: list[float] | None = None) -> str:
+    """Render a numbered markdown list of papers."""
+    parts = [f"{heading}\n\n"]
+    for i, paper in enumerate(results, 1):
+        score = f" (score {scores[i - 1]:.2f})" if scores else ""
+        parts.append(
+            f"{i}. **{paper['title']}**{score}\n"
+            f"   - Authors: {', '.join(paper['authors'])}\n"
+            f"   - Published: {paper['published']}\n"
+            f"   - ID: {paper['arxiv_id']}\n\n"
+        )
+    return "".join(parts)
+
+def _json_papers(papers: list[dict], fields: list[str] | None, summary_chars: int | None, **extra) -> str:
+    """Render papers and any extra top-level values as compact JSON."""
+    return to_json({**extra, "papers": [project(p, fields, summary_chars) for p in papers]})
+
+def _error(format: str, message: str) -> ToolError:
+    """
+    Build a tool error with its message in the requested output format.
+
+    Raised errors reach clients with isError set, so a failure is never
+    mistaken for a result (e.g. by the chatbot's tool result cache).
+    """
+    return ToolError(to_json({"error": message}) if format == "json" else message)
+
+def _local_hits(query: str, max_results: int) -> list[dict]:
+    """Return stored papers matching query above LOCAL_MIN_SCORE."""
+    return [
+        paper for score, paper in paper_index.search(query, limit=max_results)
+        if score >= LOCAL_MIN_SCORE
+    ]
 
 @mcp.tool()
-def search_papers(topic: str, max_results: int = 5) -> str:
-    """Search for academic papers on arXiv based on a topic."""
+@traced("tool.call")
+async def search_papers(
+    topic: str,
+    max_results: int = 5,
+    local_first: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    summary_chars: int | None = None
+) -> str:
+    """
+    Search for academic papers on arXiv based on a topic.
+
+    With local_first, papers already stored on disk are returned when there
+    are at least max_results good local matches, and arXiv is only queried
+    otherwise. With format="json" the papers are returned as JSON limited to
+    fields (default all) with summaries cut to summary_chars.
+    """
+    invalid = check_format(format, fields, summary_chars)
+    if invalid:
+        raise _error(format, invalid)
     try:
-        # Search for papers
-        search = arxiv.Search(
-            query=topic,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance
+        if local_first:
+            local_results = _local_hits(topic, max_results)
+            if len(local_results) >= max_results:
+                if format == "json":
+                    return _json_papers(local_results, fields, summary_chars, source="local")
+                return _format_search_summary(
+                    f"Found {len(local_results)} stored papers on '{topic}':",
+                    local_results
+                )
+
+        # Search for papers, reusing recent results for the same query
+        results = await arxiv_cache.aget_or_fetch(
+            search_key(topic, max_results),
+            lambda: _fetch_search(topic, max_results),
+            related=_paper_entries
         )
         
-        results = []
-        for result in search.results():
-            paper_info = {
-                "title": result.title,
-                "authors": [author.name for author in result.authors],
-                "published": result.published.strftime("%Y-%m-%d"),
-                "summary": result.summary,
-                "pdf_url": result.pdf_url,
-                "arxiv_id": result.entry_id.split('/')[-1]
-            }
-            results.append(paper_info)
-        
-        # Save results to file
-        os.makedirs(PAPER_DIR, exist_ok=True)
-        topic_dir = topic.lower().replace(" ", "_")
-        topic_path = os.path.join(PAPER_DIR, topic_dir)
-        os.makedirs(topic_path, exist_ok=True)
-        
-        papers_file = os.path.join(topic_path, "papers_info.json")
-        papers_data = {}
-        
-        for paper in results:
-            papers_data[paper["arxiv_id"]] = paper
-        
-        with open(papers_file, 'w') as f:
-            json.dump(papers_data, f, indent=2)
-        
         # Return summary
-        summary = f"Found {len(results)} papers on '{topic}':\n\n"
-        for i, paper in enumerate(results, 1):
-            summary += f"{i}. **{paper['title']}**\n"
-            summary += f"   - Authors: {', '.join(paper['authors'])}\n"
-            summary += f"   - Published: {paper['published']}\n"
-            summary += f"   - ID: {paper['arxiv_id']}\n\n"
-        
-        return summary
+        if format == "json":
+            return _json_papers(results, fields, summary_chars, source="arxiv")
+        return _format_search_summary(f"Found {len(results)} papers on '{topic}':", results)
         
     except Exception as e:
-        return f"Error searching for papers: {str(e)}"
+        raise _error(format, f"Error searching for papers: {str(e)}") from e
+
+@mcp.tool()
+@traced("tool.call")
+def search_local(
+    query: str,
+    max_results: int = 5,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    summary_chars: int | None = None
+) -> str:
+    """
+    Search papers already stored on disk without contacting arXiv.
+
+    format, fields and summary_chars work as in search_papers; JSON results
+    also carry each paper's BM25 score.
+    """
+    invalid = check_format(format, fields, summary_chars)
+    if invalid:
+        raise _error(format, invalid)
+    results = paper_index.search(query, limit=max_results)
+    if format == "json":
+        return to_json({"papers": [
+            {**project(paper, fields, summary_chars), "score": round(score, 3)}
+            for score, paper in results
+        ]})
+    if not results:
+        return f"No stored papers match '{query}'. Try search_papers to fetch from arXiv."
+    
+    return _format_search_summary(
+        f"Found {len(results)} stored papers matching '{query}':",
+        [paper for _, paper in results],
+        scores=[score for score, _ in results]
+    )
 
 @mcp.tool()
-def extract_info(paper_id: str) -> str:
-    """Get detailed information about a specific paper by its arXiv ID."""
+@traced("tool.call")
+def find_similar_papers(
+    paper_ids: list[str] | None = None,
+    query: str = "",
+    max_results: int = 5,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    summary_chars: int | None = None
+) -> str:
+    """
+    Find stored papers similar to the given papers or to a free-text query.
+
+    Similarity is computed locally over every stored paper's title and
+    summary, across all topics, without contacting arXiv. Each result lists
+    the topics the paper was found under. format, fields and summary_chars
+    work as in search_papers.
+    """
+    invalid = check_format(format, fields, summary_chars)
+    if invalid:
+        raise _error(format, invalid)
+    if not paper_vectors.available:
+        raise _error(format, "Error finding similar papers: numpy is not installed (the 'similarity' extra).")
+    seeds = [paper_id.strip() for paper_id in paper_ids or []]
+    if query.strip():
+        seeds.append(query)
+    if not seeds:
+        raise _error(format, "Provide paper_ids, a query, or both.")
+    unknown = [seed for seed in seeds[:len(paper_ids or [])] if seed not in paper_vectors]
+    if unknown:
+        raise _error(format, f"Not in the local store: {', '.join(unknown)}. Search or harvest them first.")
+    
+    rankings = paper_vectors.similar(seeds, limit=max_results)
+    found = {arxiv_id for ranking in rankings for _, arxiv_id in ranking}
+    papers = paper_store.get_papers(found | set(seeds))
+    # The vectors file can hold IDs the store no longer has; skip those
+    rankings = [
+        [(score, arxiv_id) for score, arxiv_id in ranking if arxiv_id in papers]
+        for ranking in rankings
+    ]
+    topics = paper_store.paper_topics(found)
+    if format == "json":
+        return to_json({"results": [
+            {
+                "seed": seed,
+                "papers": [
+                    {
+                        **project(papers[arxiv_id], fields, summary_chars),
+                        "similarity": round(score, 3),
+                        "topics": topics.get(arxiv_id, []),
+                    }
+                    for score, arxiv_id in ranking
+                ],
+            }
+            for seed, ranking in zip(seeds, rankings)
+        ]})
+    
+    sections = []
+    for seed, ranking in zip(seeds, rankings):
+        heading = papers[seed]["title"] if seed in papers else f"'{seed}'"
+        parts = [f"**Papers similar to {heading}**\n\n"]
+        if not ranking:
+            parts.append("No similar stored papers.\n\n")
+        for i, (score, arxiv_id) in enumerate(ranking, 1):
+            paper = papers[arxiv_id]
+            parts.append(
+                f"{i}. **{paper['title']}** (similarity {score:.2f})\n"
+                f"   - ID: {arxiv_id}, published {paper['published']}\n"
+                f"   - Topics: {', '.join(topics.get(arxiv_id, [])) or 'none'}\n\n"
+            )
+        sections.append("".join(parts))
+    return "---\n\n".join(sections)
+
+_harvest_locks = {}
+
+async def _harvest(topic: str, max_papers: int, newer_than_stored: bool = False) -> dict:
+    """
+    Fetch papers on topic newer than its last completed harvest.
+
+    Results are read newest first, one page at a time. Each page and the
+    topic's cursor are saved together, so a harvest stopped by max_papers
+    or an error picks up from the same offset next time. The pass completes
+    at the first paper older than the previous pass's newest paper; the
+    topic's first pass has no such paper and completes after max_papers,
+    unless newer_than_stored makes it stop at the newest paper already
+    stored under the topic.
+    """
+    # One harvest per topic at a time, so the scheduler and a tool call
+    # cannot both advance the same cursor
+    lock = _harvest_locks.setdefault(normalize_topic(topic), asyncio.Lock())
+    async with lock:
+        return await _harvest_pages(topic, max_papers, newer_than_stored)
+
+async def _harvest_pages(topic: str, max_papers: int, newer_than_stored: bool) -> dict:
+    state = paper_store.harvest_state(topic)
+    start = state["next_start"]
+    last_seen = state["last_seen"]
+    if last_seen is None and newer_than_stored:
+        last_seen = paper_store.newest_published(topic)
+    pass_newest = state["pass_newest"]
+    before = paper_store.count_topic_papers(topic)
+    fetched = pages = 0
+    complete = False
+    
+    while fetched < max_papers:
+        if pages:
+            await asyncio.sleep(HARVEST_PAGE_DELAY)
+        page_size = min(HARVEST_PAGE_SIZE, max_papers - fetched)
+        papers = await arxiv_client.search(
+            topic, max_results=page_size, sort_by="submittedDate", start=start
+        )
+        pages += 1
+        # Papers from the last_seen day are re-read since the day may have
+        # grown after the previous harvest; storing them again is a no-op
+        fresh = [p for p in papers if not last_seen or (p["published"] or "") >= last_seen]
+        if fresh:
+            pass_newest = max([pass_newest or ""] + [p["published"] or "" for p in fresh]) or None
+        complete = len(fresh) < len(papers) or len(papers) < page_size
+        if last_seen is None and fetched + len(fresh) >= max_papers:
+            # Without a previous pass to stop at, the first pass would page
+            # through the topic's entire history; keep its newest papers
+            complete = True
+        if complete:
+            start = 0
+            last_seen = max(last_seen or "", pass_newest or "") or None
+            pass_newest = None
+        else:
+            start += len(papers)
+        paper_store.save_harvest_page(topic, fresh, start, last_seen, pass_newest)
+        paper_index.add_many(fresh)
+        paper_vectors.add_many(fresh)
+        fetched += len(fresh)
+        if complete:
+            break
+    
+    return {
+        "new": paper_store.count_topic_papers(topic) - before,
+        "pages": pages,
+        "complete": complete,
+        "next_start": start,
+        "last_seen": last_seen,
+        "total": paper_store.count_topic_papers(topic),
+    }
+
+@mcp.tool()
+@traced("tool.call")
+async def harvest_topic(topic: str, max_papers: int = 200, format: str = "markdown") -> str:
+    """
+    Incrementally collect papers on a topic into the local store.
+
+    The first harvest of a topic collects its newest max_papers papers;
+    later ones fetch only papers newer than the previous harvest, up to
+    max_papers per call. Call again to continue where the last call stopped. format="json" returns the
+    harvest counters as JSON.
+    """
+    invalid = check_format(format)
+    if invalid:
+        raise _error(format, invalid)
     try:
-        search = arxiv.Search(id_list=[paper_id])
-        result = next(search.results())
-        
-        info = f"**Paper Details for {paper_id}**\n\n"
-        info += f"**Title**: {result.title}\n\n"
-        info += f"**Authors**: {', '.join([author.name for author in result.authors])}\n\n"
-        info += f"**Published**: {result.published.strftime('%Y-%m-%d')}\n\n"
-        info += f"**PDF URL**: {result.pdf_url}\n\n"
-        info += f"**Summary**: {result.summary}\n\n"
-        
-        return info
+        result = await _harvest(topic, max_papers)
+    except Exception as e:
+        raise _error(format, f"Error harvesting papers: {str(e)}") from e
+    
+    if format == "json":
+        return to_json(result)
+    summary = (
+        f"Harvested {result['new']} new papers on '{topic}' in {result['pages']} "
+        f"request(s); {result['total']} papers stored for this topic."
+    )
+    if result["complete"]:
+        summary += f" Up to date with arXiv (newest paper: {result['last_seen'] or 'none'})."
+    else:
+        summary += (
+            f" More papers remain; call harvest_topic again to resume "
+            f"at result {result['next_start']}."
+        )
+    return summary
+
+def _watchlist() -> list[str]:
+    """Configured topics plus every topic with stored papers."""
+    topics = {normalize_topic(t): t for t in WATCH_TOPICS}
+    for topic, _ in paper_store.list_topics():
+        topics.setdefault(topic, topic.replace("_", " "))
+    return list(topics.values())
+
+async def _refresh_topic(topic: str) -> None:
+    """Harvest new papers for topic and re-cache its default search."""
+    # Only the papers published since the topic was last stored; older
+    # ones are left to explicit harvest_topic calls
+    await _harvest(topic, REFRESH_MAX_PAPERS, newer_than_stored=True)
+    await asyncio.sleep(HARVEST_PAGE_DELAY)
+    results = await _fetch_search(topic, REFRESH_SEARCH_RESULTS)
+    arxiv_cache.set_many({
+        **_paper_entries(results),
+        search_key(topic, REFRESH_SEARCH_RESULTS): results
+    })
+
+topic_scheduler = TopicScheduler(
+    _refresh_topic,
+    _watchlist,
+    interval=REFRESH_INTERVAL,
+    jitter=REFRESH_JITTER,
+    min_gap=REFRESH_MIN_GAP
+)
+
+@mcp.tool()
+@traced("tool.call")
+async def extract_info(
+    paper_id: str,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    summary_chars: int | None = None
+) -> str:
+    """
+    Get detailed information about a specific paper by its arXiv ID.
+
+    format, fields and summary_chars work as in search_papers.
+    """
+    invalid = check_format(format, fields, summary_chars)
+    if invalid:
+        raise _error(format, invalid)
+    try:
+        paper = await arxiv_cache.aget_or_fetch(
+            paper_key(paper_id),
+            lambda: _fetch_paper(paper_id)
+        )
+        if format == "json":
+            return to_json(project(paper, fields, summary_chars))
+        return _format_paper_details(paper_id, paper, summary_chars)
         
     except Exception as e:
-        return f"Error extracting paper info: {str(e)}"
+        raise _error(format, f"Error extracting paper info: {str(e)}") from e
+
+@mcp.tool()
+@traced("tool.call")
+async def extract_info_batch(
+    paper_ids: list[str],
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    summary_chars: int | None = None
+) -> str:
+    """
+    Get detailed information about several papers by their arXiv IDs.
+
+    Papers already in the local store are served from it; the rest are
+    fetched from arXiv in as few requests as possible. Results are returned
+    in the order requested, with an error line for any ID that was not found.
+    format, fields and summary_chars work as in search_papers.
+    """
+    invalid = check_format(format, fields, summary_chars)
+    if invalid:
+        raise _error(format, invalid)
+    paper_ids = [paper_id.strip() for paper_id in paper_ids]
+    papers = paper_store.get_papers(paper_ids)
+    
+    missing = []
+    for paper_id in dict.fromkeys(paper_ids):
+        if paper_id in papers:
+            continue
+        cached = arxiv_cache.get(paper_key(paper_id))
+        if cached is not None:
+            papers[paper_id] = cached
+        else:
+            missing.append(paper_id)
+    
+    errors = {}
+    if missing:
+        fetched, errors = await _fetch_papers(missing)
+        papers.update(fetched)
+    
+    def error_for(paper_id):
+        return errors.get(paper_id, f"No paper found with ID {paper_id}")
+    
+    if format == "json":
+        output = to_json({"papers": [
+            project(papers[paper_id], fields, summary_chars) if paper_id in papers
+            else {"arxiv_id": paper_id, "error": error_for(paper_id)}
+            for paper_id in paper_ids
+        ]})
+    else:
+        sections = []
+        for paper_id in paper_ids:
+            if paper_id in papers:
+                sections.append(_format_paper_details(paper_id, papers[paper_id], summary_chars))
+            else:
+                sections.append(f"**Error for {paper_id}**: {error_for(paper_id)}\n\n")
+        output = "---\n\n".join(sections)
+    # Found papers are still returned, but flagged so the result is not cached
+    if any(paper_id not in papers for paper_id in paper_ids):
+        raise ToolError(output)
+    return output
+
+async def _ingest_paper(paper_id: str) -> int:
+    """Store the full text of a paper, using its known PDF URL if any."""
+    paper = paper_store.get_paper(paper_id) or arxiv_cache.get(paper_key(paper_id))
+    pdf_url = paper.get("pdf_url") if paper else None
+    return await pdf_ingestor.ingest(paper_id, pdf_url)
+
+@mcp.tool()
+@traced("tool.call")
+async def ingest_papers(paper_ids: list[str], format: str = "markdown") -> str:
+    """
+    Download the PDFs of papers and store their full text for search_paper_text.
+
+    Downloads run in parallel up to a fixed limit; papers already ingested
+    are skipped. format="json" returns the chunk count or error per paper.
+    """
+    invalid = check_format(format)
+    if invalid:
+        raise _error(format, invalid)
+    paper_ids = list(dict.fromkeys(paper_id.strip() for paper_id in paper_ids))
+    results = await asyncio.gather(
+        *[_ingest_paper(paper_id) for paper_id in paper_ids],
+        return_exceptions=True
+    )
+    if format == "json":
+        output = to_json({"papers": [
+            {"arxiv_id": paper_id, "error": str(result)} if isinstance(result, Exception)
+            else {"arxiv_id": paper_id, "chunks": result}
+            for paper_id, result in zip(paper_ids, results)
+        ]})
+    else:
+        lines = []
+        for paper_id, result in zip(paper_ids, results):
+            if isinstance(result, Exception):
+                lines.append(f"- {paper_id}: error: {result}")
+            else:
+                lines.append(f"- {paper_id}: {result} chunks stored")
+        output = f"Ingested {len(paper_ids)} papers:\n\n" + "\n".join(lines)
+    if any(isinstance(result, Exception) for result in results):
+        raise ToolError(output)
+    return output
+
+@mcp.tool()
+@traced("tool.call")
+async def search_paper_text(
+    paper_id: str,
+    query: str,
+    max_chunks: int = 3,
+    format: str = "markdown"
+) -> str:
+    """
+    Return the passages of a paper's full text most relevant to a query.
+
+    The paper's PDF is ingested first if it has not been already.
+    format="json" returns the passages with their positions and scores.
+    """
+    invalid = check_format(format)
+    if invalid:
+        raise _error(format, invalid)
+    paper_id = paper_id.strip()
+    try:
+        await _ingest_paper(paper_id)
+    except Exception as e:
+        raise _error(format, f"Error ingesting paper {paper_id}: {str(e)}") from e
+    
+    chunks = paper_store.get_chunks(paper_id)
+    ranked = rank_passages(chunks, query, limit=max_chunks)
+    if format == "json":
+        return to_json({
+            "arxiv_id": paper_id,
+            "chunks": len(chunks),
+            "passages": [
+                {"position": position + 1, "score": round(score, 3), "text": chunks[position]}
+                for score, position in ranked
+            ],
+        })
+    if not ranked:
+        return f"No passages in {paper_id} match '{query}'."
+    
+    parts = [f"Top {len(ranked)} of {len(chunks)} passages in {paper_id} for '{query}':\n\n"]
+    parts.extend(
+        f"### Passage {position + 1} (score {score:.2f})\n{chunks[position]}\n\n"
+        for score, position in ranked
+    )
+    return "".join(parts)
+
+@mcp.resource("cache://stats")
+@traced("resource.read", label="resource")
+def get_cache_stats() -> str:
+    """Report hit/miss counters for the arXiv query cache."""
+    return json.dumps(arxiv_cache.stats(), indent=2)
+
+@mcp.resource("scheduler://status")
+@traced("resource.read", label="resource")
+def get_scheduler_status() -> str:
+    """Report the watched topics and when each was last refreshed."""
+    return json.dumps({
+        "enabled": _scheduler_task is not None,
+        "watchlist": _watchlist(),
+        **topic_scheduler.status()
+    }, indent=2)
 
 @mcp.resource("papers://folders")
+@traced("resource.read", label="resource")
 def get_available_folders() -> str:
     """
-    List all available topic folders in the papers directory.
+    List all available topic folders in the paper store.
     
     This resource provides a simple list of all available topic folders.
     """
-    folders = []
-    
-    # Get all topic directories
-    if os.path.exists(PAPER_DIR):
-        for topic_dir in os.listdir(PAPER_DIR):
-            topic_path = os.path.join(PAPER_DIR, topic_dir)
-            if os.path.isdir(topic_path):
-                papers_file = os.path.join(topic_path, "papers_info.json")
-                if os.path.exists(papers_file):
-                    folders.append(topic_dir)
+    folders = [topic for topic, _ in paper_store.list_topics()]
     
     # Create a simple markdown list
-    content = "# Available Topics\n\n"
+    parts = ["# Available Topics\n\n"]
     if folders:
-        for folder in folders:
-            content += f"- {folder}\n"
-        content += f"\nUse @{folder} to access papers in that topic.\n"
+        parts.extend(f"- {folder}\n" for folder in folders)
+        parts.append(f"\nUse @{folders[-1]} to access papers in that topic.\n")
     else:
-        content += "No topics found.\n"
+        parts.append("No topics found.\n")
     
-    return content
+    return "".join(parts)
+
+@mcp.resource("papers://folders/json")
+@traced("resource.read", label="resource")
+def get_available_folders_json() -> str:
+    """List every topic in the paper store with its paper count, as JSON."""
+    return to_json({"topics": [
+        {"topic": topic, "papers": count} for topic, count in paper_store.list_topics()
+    ]})
 
 @mcp.resource("papers://{topic}")
+@traced("resource.read", label="resource")
 def get_topic_papers(topic: str) -> str:
     """
     Get detailed information about papers on a specific topic.
@@ -116,34 +719,138 @@ def get_topic_papers(topic: str) -> str:
     Args:
         topic: The research topic to retrieve papers for
     """
-    topic_dir = topic.lower().replace(" ", "_")
-    papers_file = os.path.join(PAPER_DIR, topic_dir, "papers_info.json")
+    total = paper_store.count_topic_papers(topic)
     
-    if not os.path.exists(papers_file):
+    if not total:
         return f"# No papers found for topic: {topic}\n\nTry searching for papers on this topic first."
     
+    # Create markdown content with paper details
+    parts = [
+        f"# Papers on {topic.replace('_', ' ').title()}\n\n",
+        f"Total papers: {total}\n\n",
+    ]
+    parts.extend(_render_paper_section(paper) for paper in paper_store.iter_topic_papers(topic))
+    return "".join(parts)
+
+def _render_paper_section(paper_info: dict) -> str:
+    """Render one paper as a markdown section for the papers:// resources."""
+    return (
+        f"## {paper_info['title']}\n"
+        f"- **Paper ID**: {paper_info['arxiv_id']}\n"
+        f"- **Authors**: {', '.join(paper_info['authors'])}\n"
+        f"- **Published**: {paper_info['published']}\n"
+        f"- **PDF URL**: [{paper_info['pdf_url']}]({paper_info['pdf_url']})\n\n"
+        f"### Summary\n{paper_info['summary'][:RESOURCE_SUMMARY_CHARS]}...\n\n"
+        "---\n\n"
+    )
+
+def _render_topic_page(topic: str, page: str, compact: bool) -> str:
+    """Render one page of a topic, either full or compact."""
     try:
-        with open(papers_file, 'r') as f:
-            papers_data = json.load(f)
-        
-        # Create markdown content with paper details
-        content = f"# Papers on {topic.replace('_', ' ').title()}\n\n"
-        content += f"Total papers: {len(papers_data)}\n\n"
-        
-        for paper_id, paper_info in papers_data.items():
-            content += f"## {paper_info['title']}\n"
-            content += f"- **Paper ID**: {paper_id}\n"
-            content += f"- **Authors**: {', '.join(paper_info['authors'])}\n"
-            content += f"- **Published**: {paper_info['published']}\n"
-            content += f"- **PDF URL**: [{paper_info['pdf_url']}]({paper_info['pdf_url']})\n\n"
-            content += f"### Summary\n{paper_info['summary'][:500]}...\n\n"
-            content += "---\n\n"
-        
-        return content
-    except json.JSONDecodeError:
-        return f"# Error reading papers data for {topic}\n\nThe papers data file is corrupted."
+        page = int(page)
+    except ValueError:
+        return f"# Invalid page: {page}\n\nPages are numbered from 1."
+    if page < 1:
+        return f"# Invalid page: {page}\n\nPages are numbered from 1."
+    
+    total = paper_store.count_topic_papers(topic)
+    if not total:
+        return f"# No papers found for topic: {topic}\n\nTry searching for papers on this topic first."
+    
+    pages = (total + TOPIC_PAGE_SIZE - 1) // TOPIC_PAGE_SIZE
+    mode = "compact" if compact else "page"
+    papers = paper_store.iter_topic_papers(
+        topic,
+        offset=(page - 1) * TOPIC_PAGE_SIZE,
+        limit=TOPIC_PAGE_SIZE,
+        compact=compact
+    )
+    
+    parts = [
+        f"# Papers on {topic.replace('_', ' ').title()}\n\n",
+        f"Page {page} of {pages} ({total} papers)\n\n",
+    ]
+    if compact:
+        parts.extend(f"- {p['arxiv_id']} | {p['published']} | {p['title']}\n" for p in papers)
+        parts.append("\n")
+    else:
+        parts.extend(_render_paper_section(paper) for paper in papers)
+    if page < pages:
+        parts.append(f"Next page: papers://{topic}/{mode}/{page + 1}\n")
+    return "".join(parts)
+
+@mcp.resource("papers://{topic}/page/{page}")
+@traced("resource.read", label="resource")
+def get_topic_papers_page(topic: str, page: str) -> str:
+    """
+    Get one page of detailed paper information for a topic.
+    
+    Args:
+        topic: The research topic to retrieve papers for
+        page: Page number, starting at 1
+    """
+    return _render_topic_page(topic, page, compact=False)
+
+@mcp.resource("papers://{topic}/compact/{page}")
+@traced("resource.read", label="resource")
+def get_topic_papers_compact(topic: str, page: str) -> str:
+    """
+    Get one page of a topic listing only ID, publication date and title.
+    
+    Args:
+        topic: The research topic to retrieve papers for
+        page: Page number, starting at 1
+    """
+    return _render_topic_page(topic, page, compact=True)
+
+def _render_topic_json(topic: str, page: str, fields: list[str] | None) -> str:
+    """Render one page of a topic as JSON with the selected paper fields."""
+    invalid = check_format("json", fields)
+    if not page.isdigit() or int(page) < 1:
+        invalid = f"Invalid page: {page}. Pages are numbered from 1."
+    if invalid:
+        return to_json({"error": invalid})
+    
+    page = int(page)
+    total = paper_store.count_topic_papers(topic)
+    pages = (total + TOPIC_PAGE_SIZE - 1) // TOPIC_PAGE_SIZE
+    papers = paper_store.iter_topic_papers(
+        topic,
+        offset=(page - 1) * TOPIC_PAGE_SIZE,
+        limit=TOPIC_PAGE_SIZE
+    )
+    return _json_papers(
+        list(papers), fields, RESOURCE_SUMMARY_CHARS,
+        topic=topic, page=page, pages=pages, total=total
+    )
+
+@mcp.resource("papers://{topic}/json/{page}")
+@traced("resource.read", label="resource")
+def get_topic_papers_json(topic: str, page: str) -> str:
+    """
+    Get one page of a topic's papers as JSON with every field.
+    
+    Args:
+        topic: The research topic to retrieve papers for
+        page: Page number, starting at 1
+    """
+    return _render_topic_json(topic, page, None)
+
+@mcp.resource("papers://{topic}/json/{page}/{fields}")
+@traced("resource.read", label="resource")
+def get_topic_papers_json_fields(topic: str, page: str, fields: str) -> str:
+    """
+    Get one page of a topic's papers as JSON with only the chosen fields.
+    
+    Args:
+        topic: The research topic to retrieve papers for
+        page: Page number, starting at 1
+        fields: Comma-separated paper fields, e.g. arxiv_id,title,published
+    """
+    return _render_topic_json(topic, page, [f.strip() for f in fields.split(",") if f.strip()])
 
 @mcp.prompt()
+@traced("prompt.get", label="prompt")
 def generate_search_prompt(topic: str, num_papers: int = 5) -> str:
     """Generate a prompt for Claude to find and discuss academic papers on a specific topic."""
     return f"""Search for {num_papers} academic papers about '{topic}' using the search_papers tool. Follow these instructions:
@@ -167,5 +874,17 @@ def generate_search_prompt(topic: str, num_papers: int = 5) -> str:
     
     Please present both detailed information about each paper and a high-level synthesis of the research landscape in {topic}."""
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request):
+    """Latency histograms for tool, resource and arXiv calls."""
+    return PlainTextResponse(tracer.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+async def main():
+    # Begin the first refresh pass (if REFRESH_INTERVAL is set) in the
+    # background; it does not delay startup, so early requests may still
+    # go to arXiv until it finishes
+    start_scheduler()
+    await mcp.run_async(transport=MCP_TRANSPORT)
+
 if __name__ == "__main__":
-    mcp.run(transport='sse') 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+On-demand connection to a single MCP server.
+
+The server subprocess and its ClientSession live inside one background task,
+so they are entered and exited from the same task no matter which task
+starts or stops the connection. Messages from the server are forwarded
+through a watcher that notices when the subprocess closes its output, so a
+crashed server is detected at once rather than at the next health check.
+"""
+
+import asyncio
+import time
+
+import anyio
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+
+from tracing import tracer
+
+# Restart delays grow from BACKOFF_BASE up to BACKOFF_MAX seconds
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Seconds a server may take to answer the initialize handshake
+START_TIMEOUT = 30.0
+
+
+async def _forward(source, sink, exited):
+    """Copy messages from source to sink, setting exited when source ends."""
+    try:
+        async with sink:
+            async for message in source:
+                await sink.send(message)
+    except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+        pass
+    finally:
+        exited.set()
+
+
+class ServerConnection:
+    """Starts an MCP server on first use and can stop it again when idle."""
+
+    def __init__(self, name, config, on_start=None, on_notification=None, start_timeout=START_TIMEOUT):
+        self.name = name
+        self.config = config
+        self.start_timeout = start_timeout
+        # Called with the new session each time the server starts
+        self.on_start = on_start
+        # Called with (notification, session) for notifications from the server
+        self.on_notification = on_notification
+        self.session = None
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        # Set when the server exits without being asked to stop
+        self.crashed = False
+        self.failures = 0
+        self._retry_at = 0.0
+        self._task = None
+        self._ready = None
+        self._stop = None
+        self._error = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def is_running(self):
+        return self.session is not None
+
+    def retry_in(self):
+        """Seconds until another start attempt is allowed."""
+        return max(0.0, self._retry_at - time.monotonic())
+
+    async def get_session(self):
+        """Return the running session, starting the server if needed."""
+        self.last_used = time.monotonic()
+        if self.session is not None:
+            return self.session
+        async with self._start_lock:
+            if self.session is None:
+                if self.retry_in():
+                    raise ConnectionError(
+                        f"Server {self.name} failed to start, retrying in {self.retry_in():.0f}s"
+                    )
+                await self._start()
+                if self.on_start:
+                    self.on_start(self.session)
+        return self.session
+
+    async def _start(self):
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error = None
+        self.crashed = False
+        # Covers spawning the subprocess and the MCP initialize handshake
+        with tracer.span("server.connect", server=self.name, command=self.config.get("command")):
+            self._task = asyncio.create_task(self._run())
+            await self._ready.wait()
+            if self._error is not None:
+                self.failures += 1
+                delay = min(BACKOFF_BASE * 2 ** (self.failures - 1), BACKOFF_MAX)
+                self._retry_at = time.monotonic() + delay
+                raise self._error
+        self.failures = 0
+
+    async def _run(self):
+        started = False
+        forwarder = None
+        try:
+            server_params = StdioServerParameters(**self.config)
+            async with stdio_client(server_params) as (read, write):
+                exited = asyncio.Event()
+                sink, watched = anyio.create_memory_object_stream(0)
+                forwarder = asyncio.create_task(_forward(read, sink, exited))
+                async with ClientSession(
+                    watched, write, message_handler=self._handle_message
+                ) as session:
+                    # A server that never answers would otherwise hold
+                    # _start_lock, and with it every caller, forever
+                    try:
+                        await asyncio.wait_for(session.initialize(), self.start_timeout)
+                    except asyncio.TimeoutError:
+                        raise TimeoutError(
+                            f"Server {self.name} did not initialize within {self.start_timeout}s"
+                        ) from None
+                    self.session = session
+                    started = True
+                    self._ready.set()
+                    stop = asyncio.ensure_future(self._stop.wait())
+                    exit = asyncio.ensure_future(exited.wait())
+                    try:
+                        await asyncio.wait({stop, exit}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        stop.cancel()
+                        exit.cancel()
+        except Exception as e:
+            # The transport's task groups wrap errors raised inside them
+            while isinstance(e, ExceptionGroup) and len(e.exceptions) == 1:
+                e = e.exceptions[0]
+            self._error = e
+        finally:
+            if forwarder is not None:
+                forwarder.cancel()
+            self.session = None
+            self.crashed = started and not self._stop.is_set()
+            self._ready.set()
+
+    async def _handle_message(self, message):
+        if self.on_notification and isinstance(message, types.ServerNotification):
+            self.on_notification(message.root, self.session)
+
+    async def restart(self):
+        """Stop the server and start it again, backing off after failures."""
+        await self.close()
+        while True:
+            await asyncio.sleep(self.retry_in())
+            try:
+                await self.get_session()
+                return
+            except Exception:
+                continue
+
+    def idle_for(self):
+        """Seconds since the connection was last used, 0 while in use."""
+        if self.in_flight:
+            return 0.0
+        return time.monotonic() - self.last_used
+
+    async def close_if_idle(self, idle_timeout):
+        """Stop the server if it has been idle longer than idle_timeout."""
+        if self.is_running and self.idle_for() > idle_timeout:
+            await self.close()
+            return True
+        return False
+
+    async def close(self):
+        """Stop the server if it is running."""
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await self._task
+        except Exception:
+            pass
+        self._task = None
+        self.crashed = False
@@ -0,0 +1,185 @@
+"""
+Supervised pool of MCP sessions for one server.
+
+A pool holds one or more ServerConnections to the same server. Requests go
+to the least-loaded session; when every session is at its limit they wait in
+a bounded queue. A supervisor task pings running sessions and restarts
+servers that crash or stop answering.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from server_connection import ServerConnection
+
+DEFAULT_POOL_CONFIG = {
+    # Server processes per server name
+    "size": 1,
+    # Requests a single session may have in flight at once
+    "maxConcurrentPerSession": 8,
+    # Requests allowed to wait when every session is busy
+    "maxQueue": 32,
+    # Seconds a request may wait for a session
+    "acquireTimeout": 30.0,
+    # Seconds between health checks, and how long a ping may take
+    "healthInterval": 30.0,
+    "pingTimeout": 5.0,
+    # Seconds a server may take to start and answer initialize
+    "startTimeout": 30.0,
+}
+
+
+class PoolBusyError(Exception):
+    """Raised when a server's request queue is full."""
+
+
+def pool_config(config, server_name):
+    """Merge defaults, the pool section and a server's overrides."""
+    merged = dict(DEFAULT_POOL_CONFIG)
+    merged.update({k: v for k, v in config.items() if k != "servers"})
+    merged.update(config.get("servers", {}).get(server_name, {}))
+    return merged
+
+
+class ServerPool:
+    """Routes requests for one server across a pool of connections."""
+
+    def __init__(self, name, config, pool_settings=None, on_start=None, on_notification=None):
+        settings = dict(DEFAULT_POOL_CONFIG)
+        settings.update(pool_settings or {})
+        self.name = name
+        self.config = config
+        # Called with the session the first time any server in the pool starts
+        self.on_start = on_start
+        # Called with (notification, session) for server notifications
+        self.on_notification = on_notification
+        self.max_per_session = settings["maxConcurrentPerSession"]
+        self.max_queue = settings["maxQueue"]
+        self.acquire_timeout = settings["acquireTimeout"]
+        self.health_interval = settings["healthInterval"]
+        self.ping_timeout = settings["pingTimeout"]
+        self.connections = [
+            ServerConnection(
+                name, config,
+                on_start=self._connection_started,
+                on_notification=self._notification_received,
+                start_timeout=settings["startTimeout"]
+            )
+            for _ in range(settings["size"])
+        ]
+        self._started = False
+        self._waiting = 0
+        self._available = asyncio.Condition()
+        self._restart_tasks = {}
+
+    @property
+    def is_running(self):
+        return any(connection.is_running for connection in self.connections)
+
+    def _connection_started(self, session):
+        if not self._started:
+            self._started = True
+            if self.on_start:
+                self.on_start(session)
+
+    def _notification_received(self, notification, session):
+        if self.on_notification:
+            self.on_notification(notification, session)
+
+    def _pick(self):
+        candidates = [c for c in self.connections if c.in_flight < self.max_per_session]
+        if not candidates:
+            return None
+        running = [c for c in candidates if c.is_running]
+        # Use an idle running session, then start another server, and only
+        # then share a busy session
+        idle = [c for c in running if c.in_flight == 0]
+        if idle:
+            return idle[0]
+        stopped = [c for c in candidates if not c.is_running]
+        if stopped:
+            return stopped[0]
+        return min(running, key=lambda c: c.in_flight)
+
+    async def _checkout(self):
+        async with self._available:
+            connection = self._pick()
+            if connection is None:
+                if self._waiting >= self.max_queue:
+                    raise PoolBusyError(
+                        f"Server {self.name} is busy: {self._waiting} requests already queued"
+                    )
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._available.wait_for(lambda: self._pick() is not None),
+                        self.acquire_timeout
+                    )
+                except asyncio.TimeoutError:
+                    raise TimeoutError(
+                        f"Timed out after {self.acquire_timeout}s waiting for a {self.name} session"
+                    )
+                finally:
+                    self._waiting -= 1
+                connection = self._pick()
+            # Reserve the slot before yielding control to anyone else
+            connection.in_flight += 1
+            return connection
+
+    async def _checkin(self, connection):
+        connection.in_flight -= 1
+        connection.last_used = time.monotonic()
+        async with self._available:
+            self._available.notify()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Yield a session from the pool, starting a server if needed."""
+        connection = await self._checkout()
+        try:
+            yield await connection.get_session()
+        finally:
+            await self._checkin(connection)
+
+    async def supervise(self):
+        """Health-check running servers forever, restarting unhealthy ones."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for connection in self.connections:
+                if connection in self._restart_tasks:
+                    continue
+                if connection.crashed:
+                    print(f"\nServer {self.name} exited unexpectedly, restarting")
+                    self._restart(connection)
+                elif connection.is_running:
+                    try:
+                        await asyncio.wait_for(connection.session.send_ping(), self.ping_timeout)
+                    except Exception:
+                        print(f"\nServer {self.name} failed a health check, restarting")
+                        self._restart(connection)
+
+    def _restart(self, connection):
+        async def restart():
+            try:
+                await connection.restart()
+            finally:
+                self._restart_tasks.pop(connection, None)
+            async with self._available:
+                self._available.notify_all()
+
+        self._restart_tasks[connection] = asyncio.create_task(restart())
+
+    async def close_idle(self, idle_timeout):
+        """Stop every server in the pool that has been idle past idle_timeout."""
+        results = [await c.close_if_idle(idle_timeout) for c in self.connections]
+        return any(results)
+
+    async def close(self):
+        """Stop every server in the pool."""
+        for task in list(self._restart_tasks.values()):
+            task.cancel()
+        await asyncio.gather(
+            *[connection.close() for connection in self.connections],
+            return_exceptions=True
+        )
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import threading
+import time
+
+from arxiv_cache import ArxivCache, paper_key, search_key
+
+
+def make_cache(tmp_path, **kwargs):
+    return ArxivCache(str(tmp_path / "cache.json"), **kwargs)
+
+
+def expire(cache, key, seconds=3600):
+    cache._entries[key]["stored_at"] -= seconds
+
+
+def test_keys_normalize_topic_and_id():
+    assert search_key("  Graph   Neural ", 5) == search_key("graph neural", 5)
+    assert search_key("graph", 5) != search_key("graph", 5, sort_by="submittedDate")
+    assert paper_key(" 2401.00001 ") == "paper:2401.00001"
+
+
+def test_get_misses_after_ttl(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("k", [1])
+    assert cache.get("k") == [1]
+    expire(cache, "k", 61)
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_survive_reload(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set_many({"a": 1, "b": 2})
+    cache.flush()
+    reloaded = make_cache(tmp_path)
+    assert reloaded.get("a") == 1
+    assert reloaded.get("b") == 2
+
+
+def test_corrupt_file_starts_empty(tmp_path):
+    (tmp_path / "cache.json").write_text("{not json")
+    assert make_cache(tmp_path).stats()["entries"] == 0
+
+
+def test_writes_are_batched_off_the_calling_thread(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, save_delay=0.05)
+    writers = []
+    save = cache._save
+    monkeypatch.setattr(cache, "_save", lambda: (writers.append(threading.current_thread()), save()))
+    for i in range(10):
+        cache.set(f"k{i}", i)
+    assert writers == []
+    deadline = time.monotonic() + 5
+    while not writers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(writers) == 1
+    assert writers[0] is not threading.current_thread()
+    assert make_cache(tmp_path).stats()["entries"] == 10
+
+
+def test_flush_writes_pending_changes_once(tmp_path):
+    cache = make_cache(tmp_path, save_delay=60)
+    cache.set("k", 1)
+    assert not (tmp_path / "cache.json").exists()
+    cache.flush()
+    cache.flush()
+    assert make_cache(tmp_path).get("k") == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_fetch_caches_related_entries_in_one_write(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, save_delay=60)
+    saves = []
+    save = cache._save
+    monkeypatch.setattr(cache, "_save", lambda: (saves.append(1), save()))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return [{"arxiv_id": "1"}, {"arxiv_id": "2"}]
+
+    def related(papers):
+        return {paper_key(p["arxiv_id"]): p for p in papers}
+
+    papers = cache.get_or_fetch("search", fetch, related)
+    assert cache.get_or_fetch("search", fetch, related) == papers
+    cache.flush()
+    assert len(calls) == 1
+    assert len(saves) == 1
+    assert cache.get(paper_key("2")) == {"arxiv_id": "2"}
+    with open(cache.path) as f:
+        assert len(json.load(f)["entries"]) == 3
+
+
+def test_expired_entry_is_refetched_without_serve_stale(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("k", "old")
+    expire(cache, "k")
+    assert cache.get_or_fetch("k", lambda: "new") == "new"
+    assert cache.get("k") == "new"
+
+
+def test_serve_stale_refreshes_in_background(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=60, serve_stale=True)
+    cache.set("k", "old")
+    expire(cache, "k")
+    assert cache.get_or_fetch("k", lambda: "new") == "old"
+    deadline = time.monotonic() + 5
+    while cache.get("k") != "new" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get("k") == "new"
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_async_serve_stale_refreshes_on_the_loop(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=60, serve_stale=True)
+    cache.set("k", "old")
+    expire(cache, "k")
+
+    async def fetch():
+        return "new"
+
+    async def scenario():
+        first = await cache.aget_or_fetch("k", fetch)
+        await asyncio.gather(*cache._tasks)
+        return first, await cache.aget_or_fetch("k", fetch)
+
+    assert asyncio.run(scenario()) == ("old", "new")
+
+
+def test_failed_background_refresh_keeps_stale_entry(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=60, serve_stale=True)
+    cache.set("k", "old")
+    expire(cache, "k")
+
+    async def fetch():
+        raise RuntimeError("arXiv unavailable")
+
+    async def scenario():
+        await cache.aget_or_fetch("k", fetch)
+        await asyncio.gather(*cache._tasks)
+        value = await cache.aget_or_fetch("k", fetch)
+        # Still stale, so that lookup started another refresh
+        await asyncio.gather(*cache._tasks)
+        return value
+
+    assert asyncio.run(scenario()) == "old"
+    assert not cache._refreshing
@@ -0,0 +1,73 @@
+"""Chat service over HTTP against the fake Anthropic endpoint from benchmarks."""
+
+import asyncio
+
+import httpx
+import pytest
+from anthropic import AsyncAnthropic
+
+from benchmarks.fake_anthropic import FakeAnthropic
+from chat_service import ChatService
+from mcp_chatbot import MCP_ChatBot
+
+
+@pytest.fixture
+def fake_anthropic():
+    # No tool calls, so every query is answered in one streamed message
+    fake = FakeAnthropic(tool_calls=[], rounds=0, first_token_delay=0.2).start()
+    yield fake
+    fake.stop()
+
+
+def test_concurrent_conversations_keep_separate_histories(fake_anthropic):
+    async def scenario():
+        bot = MCP_ChatBot(show_token_usage=False)
+        bot.anthropic = AsyncAnthropic(base_url=fake_anthropic.url, api_key="test")
+        service = ChatService(bot)
+        transport = httpx.ASGITransport(app=service.app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ids = [(await client.post("/conversations")).json()["id"] for _ in range(3)]
+
+            async def ask(conversation_id, content):
+                response = await client.post(f"/conversations/{conversation_id}/messages", json={"content": content})
+                assert response.status_code == 200
+                return response.json()["reply"]
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            replies = await asyncio.gather(*[
+                ask(conversation_id, f"{conversation_id} question {n}")
+                for conversation_id in ids for n in range(2)
+            ])
+            elapsed = loop.time() - start
+
+            assert set(replies) == {"Here is the summary. "}
+            # Conversations answer in parallel; queries within one run in turn
+            assert elapsed < 6 * 0.2
+            for conversation_id in ids:
+                messages = service.conversations[conversation_id].messages
+                assert [m["role"] for m in messages] == ["user", "assistant", "user", "assistant"]
+                assert [m["content"] for m in messages[::2]] == [
+                    f"{conversation_id} question 0", f"{conversation_id} question 1"
+                ]
+                assert (await client.get(f"/conversations/{conversation_id}")).json()["messages"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_conversation_rejects_queries_past_its_queue(fake_anthropic):
+    async def scenario():
+        bot = MCP_ChatBot(show_token_usage=False)
+        bot.anthropic = AsyncAnthropic(base_url=fake_anthropic.url, api_key="test")
+        service = ChatService(bot, {"maxPendingPerConversation": 1})
+        transport = httpx.ASGITransport(app=service.app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            conversation_id = (await client.post("/conversations")).json()["id"]
+            url = f"/conversations/{conversation_id}/messages"
+            first = asyncio.create_task(client.post(url, json={"content": "first"}))
+            await asyncio.sleep(0.05)
+            assert (await client.post(url, json={"content": "second"})).status_code == 429
+            assert (await first).status_code == 200
+            assert len(service.conversations[conversation_id].messages) == 2
+
+    asyncio.run(scenario())
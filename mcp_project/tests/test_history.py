@@ -0,0 +1,70 @@
+from history import (
+    CACHE_CONTROL,
+    compact_messages,
+    estimate_tokens,
+    truncate_tool_results,
+    with_cache_breakpoints,
+)
+
+
+def tool_turn(n, text):
+    return [
+        {"role": "assistant", "content": [{"type": "tool_use", "id": f"t{n}", "name": "fetch", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": f"t{n}", "content": text}]},
+    ]
+
+
+def result_content(message):
+    return message["content"][0]["content"]
+
+
+def test_truncate_tool_results_caps_strings_and_text_blocks():
+    messages = tool_turn(1, "x" * 50)
+    messages.append({"role": "user", "content": [
+        {"type": "tool_result", "tool_use_id": "t2", "content": [{"type": "text", "text": "y" * 50}]}
+    ]})
+    truncate_tool_results(messages, 10)
+    assert result_content(messages[1]).startswith("x" * 10 + "\n[... truncated 40 characters]")
+    assert messages[2]["content"][0]["content"][0]["text"].startswith("y" * 10 + "\n")
+
+
+def test_compact_messages_within_budget_leaves_messages_alone():
+    messages = [{"role": "user", "content": "question"}] + tool_turn(1, "short result")
+    before = [dict(m) for m in messages]
+    total = compact_messages(messages, token_budget=1000, max_tool_result_chars=1000)
+    assert messages == before
+    assert total == estimate_tokens(messages)
+
+
+def test_compact_messages_omits_oldest_results_first():
+    messages = [{"role": "user", "content": "question"}]
+    for n in range(4):
+        messages += tool_turn(n, "r" * 4000)
+    total = compact_messages(messages, token_budget=2500, max_tool_result_chars=10000, keep_recent=2)
+
+    assert total <= 2500
+    assert total == estimate_tokens(messages)
+    assert result_content(messages[2]).startswith("[Earlier tool result omitted")
+    assert result_content(messages[4]).startswith("[Earlier tool result omitted")
+    # Recent turns are kept whole, and compaction stops once under budget
+    assert result_content(messages[8]) == "r" * 4000
+    assert result_content(messages[6]) == "r" * 4000
+    # Every tool_use still has its tool_result
+    assert [m["content"][0]["type"] for m in messages[1:]] == ["tool_use", "tool_result"] * 4
+
+
+def test_compact_messages_keeps_recent_even_over_budget():
+    messages = tool_turn(1, "r" * 4000)
+    total = compact_messages(messages, token_budget=10, max_tool_result_chars=10000, keep_recent=2)
+    assert result_content(messages[1]) == "r" * 4000
+    assert total > 10
+
+
+def test_cache_breakpoints_mark_copies():
+    tools = [{"name": "a"}, {"name": "b"}]
+    messages = [{"role": "user", "content": "hello"}]
+    cached_tools, cached_messages = with_cache_breakpoints(tools, messages)
+    assert cached_tools[-1]["cache_control"] == CACHE_CONTROL
+    assert "cache_control" not in tools[-1]
+    assert cached_messages[-1]["content"] == [{"type": "text", "text": "hello", "cache_control": CACHE_CONTROL}]
+    assert messages[-1]["content"] == "hello"
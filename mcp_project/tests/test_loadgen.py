@@ -0,0 +1,37 @@
+import json
+import sys
+
+import pytest
+
+import loadgen
+
+
+@pytest.fixture
+def files(tmp_path):
+    config = tmp_path / "server_config.json"
+    config.write_text(json.dumps({"mcpServers": {
+        "research": {"command": "uv", "args": ["run", "research_server.py"]},
+        "custom": {"command": "server", "env": {"MCP_TRANSPORT": "sse", "DEBUG": "1"}},
+        "broken": {"command": sys.executable, "args": ["-c", "import sys; sys.exit(1)"]},
+    }}))
+    workload = tmp_path / "workload.json"
+    workload.write_text(json.dumps({"calls": [{"type": "resource", "uri": "papers://folders"}]}))
+    return config, workload
+
+
+def test_servers_are_started_over_stdio(files):
+    config, _ = files
+    params = loadgen.server_params(str(config), "research")
+    assert params.env == {"MCP_TRANSPORT": "stdio"}
+    assert params.cwd == str(config.parent)
+    # A server's own settings win
+    assert loadgen.server_params(str(config), "custom").env == {"MCP_TRANSPORT": "sse", "DEBUG": "1"}
+    with pytest.raises(ValueError, match="No server named 'missing'"):
+        loadgen.server_params(str(config), "missing")
+
+
+def test_connection_failure_is_reported_cleanly(files, capsys):
+    config, workload = files
+    argv = [str(workload), "--config", str(config), "--server", "broken", "--requests", "1"]
+    assert loadgen.main(argv) == 1
+    assert "Could not connect to server 'broken'" in capsys.readouterr().err
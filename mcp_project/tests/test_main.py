@@ -0,0 +1,49 @@
+"""The inspector launcher at the repository root."""
+
+import importlib.util
+import os
+
+import pytest
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main.py")
+
+
+@pytest.fixture
+def launcher(monkeypatch):
+    spec = importlib.util.spec_from_file_location("inspector_main", MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    syncs = []
+    monkeypatch.setattr(module.subprocess, "run", lambda cmd, **kwargs: syncs.append(cmd))
+    module.syncs = syncs
+    return module
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "uv.lock").write_text("lock v1")
+    (tmp_path / "pyproject.toml").write_text("[project]")
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "pyvenv.cfg").write_text("version = 3.13")
+    return tmp_path
+
+
+def test_sync_is_skipped_until_the_fingerprint_changes(launcher, project):
+    assert launcher.sync_dependencies(project)
+    assert not launcher.sync_dependencies(project)
+    assert launcher.sync_dependencies(project, force=True)
+    assert len(launcher.syncs) == 2
+
+    (project / "uv.lock").write_text("lock v2")
+    assert launcher.sync_dependencies(project)
+    assert not launcher.sync_dependencies(project)
+    assert launcher.syncs == [["uv", "sync"]] * 3
+
+
+def test_recreated_environment_syncs_again(launcher, project):
+    launcher.sync_dependencies(project)
+    (project / ".venv" / launcher.SYNC_FINGERPRINT_FILE).unlink()
+    assert launcher.sync_dependencies(project)
+    (project / ".venv" / "pyvenv.cfg").write_text("version = 3.14")
+    assert launcher.sync_dependencies(project)
+    assert len(launcher.syncs) == 3
@@ -0,0 +1,28 @@
+"""Chatbot query loop against the fake Anthropic endpoint from benchmarks."""
+
+import asyncio
+import json
+
+from anthropic import AsyncAnthropic
+
+from benchmarks.fake_anthropic import FakeAnthropic
+from mcp_chatbot import MCP_ChatBot
+from tracing import tracer
+
+
+def test_first_token_is_timed_from_the_first_delta(tmp_path, monkeypatch):
+    log = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(tracer, "log_path", str(log))
+    # message_start is sent at once; the first text only after the delay
+    fake = FakeAnthropic(tool_calls=[], rounds=0, first_token_delay=0.3).start()
+    try:
+        bot = MCP_ChatBot(show_token_usage=False)
+        bot.anthropic = AsyncAnthropic(base_url=fake.url, api_key="test")
+        reply = asyncio.run(bot.process_query("Hello", on_text=lambda text: None))
+    finally:
+        fake.stop()
+
+    assert reply == "Here is the summary. "
+    spans = [json.loads(line) for line in log.read_text().splitlines()]
+    (llm_call,) = [span for span in spans if span["name"] == "llm.call"]
+    assert 300 <= llm_call["first_token_ms"] <= llm_call["duration_ms"]
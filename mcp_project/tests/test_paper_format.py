@@ -0,0 +1,50 @@
+import json
+
+from paper_format import PAPER_FIELDS, check_format, project, to_json, truncate
+
+PAPER = {
+    "arxiv_id": "2401.00001v1",
+    "title": "Über graphs",
+    "authors": ["A. Author"],
+    "published": "2024-01-01",
+    "summary": "Graphs  are\n everywhere and this summary is long enough to cut.",
+    "pdf_url": "http://arxiv.org/pdf/2401.00001v1",
+}
+
+
+def test_to_json_is_compact_and_keeps_unicode():
+    encoded = to_json({"title": "Über", "n": [1, 2]})
+    assert encoded == '{"title":"Über","n":[1,2]}'
+
+
+def test_check_format():
+    assert check_format("json") is None
+    assert check_format("markdown", ["title"], 0) is None
+    assert "Unknown format" in check_format("xml")
+    assert "Unknown fields color" in check_format("json", ["title", "color"])
+    assert "zero or more" in check_format("json", summary_chars=-1)
+
+
+def test_truncate_leaves_short_text_and_none_limit():
+    assert truncate("short", 10) == "short"
+    assert truncate("anything at all", None) == "anything at all"
+
+
+def test_truncate_cuts_at_word_boundary():
+    assert truncate("alpha beta gamma delta", 12) == "alpha beta…"
+
+
+def test_truncate_cuts_mid_word_when_no_boundary_in_back_half():
+    assert truncate("a verylongwordwithoutspaces", 10) == "a verylong…"
+
+
+def test_project_selects_fields_in_order():
+    assert project(PAPER, ["title", "arxiv_id"]) == {"title": "Über graphs", "arxiv_id": "2401.00001v1"}
+    assert list(project(PAPER)) == list(PAPER_FIELDS)
+
+
+def test_project_normalizes_and_truncates_summary():
+    projected = project(PAPER, ["summary"], summary_chars=22)
+    assert projected["summary"] == "Graphs are everywhere…"
+    assert project(PAPER, ["summary"])["summary"].startswith("Graphs are everywhere")
+    assert json.loads(to_json(project({"arxiv_id": "1"}))) == {field: None for field in PAPER_FIELDS} | {"arxiv_id": "1"}
@@ -0,0 +1,80 @@
+from paper_index import PaperIndex, rank_passages, tokenize
+
+
+def paper(arxiv_id, title, summary="", authors=()):
+    return {"arxiv_id": arxiv_id, "title": title, "summary": summary, "authors": list(authors)}
+
+
+def ids(results):
+    return [p["arxiv_id"] for _, p in results]
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Graph of Neural-Networks, 2024") == ["graph", "neural", "networks", "2024"]
+
+
+def test_empty_index_returns_nothing():
+    assert PaperIndex().search("graph") == []
+
+
+def test_title_matches_outrank_summary_matches():
+    index = PaperIndex()
+    index.add_many([
+        paper("1", "Protein folding", "We also mention graph methods briefly."),
+        paper("2", "Graph neural networks", "A survey of message passing."),
+        paper("3", "Weather forecasting", "Numerical models."),
+    ])
+    assert ids(index.search("graph")) == ["2", "1"]
+
+
+def test_rare_terms_weigh_more_than_common_ones():
+    index = PaperIndex()
+    index.add_many([
+        paper("1", "Learning transformers"),
+        paper("2", "Learning kernels"),
+        paper("3", "Learning to rank"),
+    ])
+    results = index.search("learning kernels")
+    assert ids(results)[0] == "2"
+    assert results[0][0] > results[1][0]
+
+
+def test_authors_are_searchable():
+    index = PaperIndex()
+    index.add(paper("1", "Some title", authors=["Ada Lovelace"]))
+    assert ids(index.search("lovelace")) == ["1"]
+
+
+def test_add_replaces_earlier_copy():
+    index = PaperIndex()
+    index.add(paper("1", "Graph theory"))
+    index.add(paper("1", "Category theory"))
+    assert len(index) == 1
+    assert index.search("graph") == []
+    assert ids(index.search("category")) == ["1"]
+
+
+def test_remove_drops_postings():
+    index = PaperIndex()
+    index.add_many([paper("1", "Graph theory"), paper("2", "Graph drawing")])
+    index.remove("1")
+    index.remove("missing")
+    assert ids(index.search("graph theory")) == ["2"]
+    assert "theory" not in index._postings
+
+
+def test_limit_caps_results():
+    index = PaperIndex()
+    index.add_many([paper(str(i), f"Graph paper {i}") for i in range(20)])
+    assert len(index.search("graph", limit=5)) == 5
+
+
+def test_rank_passages_skips_passages_without_query_terms():
+    passages = [
+        "Attention weights are computed per head.",
+        "Unrelated text about weather.",
+        "Attention and attention again.",
+    ]
+    ranked = rank_passages(passages, "attention", limit=3)
+    assert [position for _, position in ranked] == [2, 0]
+    assert rank_passages([], "attention") == []
@@ -0,0 +1,113 @@
+import json
+import sqlite3
+
+import pytest
+
+from paper_store import PaperStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.db"))
+    yield store
+    store.close()
+
+
+def paper(arxiv_id, published="2024-01-01", title=None):
+    return {
+        "arxiv_id": arxiv_id,
+        "title": title or f"Paper {arxiv_id}",
+        "authors": ["A. Author", "B. Author"],
+        "published": published,
+        "summary": "Summary.",
+        "pdf_url": f"http://arxiv.org/pdf/{arxiv_id}",
+    }
+
+
+def test_upsert_deduplicates_across_topics(store):
+    store.upsert_papers("Graph Neural", [paper("1"), paper("2")])
+    store.upsert_papers("graph_neural", [paper("2", title="Renamed")])
+    assert store.get_paper("2")["title"] == "Renamed"
+    store.upsert_papers("other", [paper("2")])
+    assert store.list_topics() == [("graph_neural", 2), ("other", 1)]
+    assert store.get_paper("2")["authors"] == ["A. Author", "B. Author"]
+    assert store.paper_topics(["2"]) == {"2": ["graph_neural", "other"]}
+
+
+def test_topic_pages_are_newest_first(store):
+    store.upsert_papers("t", [paper("1", "2023-01-01"), paper("2", "2024-06-01"), paper("3", "2024-01-01")])
+    page = list(store.iter_topic_papers("t", offset=1, limit=1))
+    assert [p["arxiv_id"] for p in page] == ["3"]
+    compact = list(store.iter_topic_papers("t", compact=True))
+    assert compact[0] == {"arxiv_id": "2", "title": "Paper 2", "published": "2024-06-01"}
+
+
+def test_harvest_state_defaults_to_start(store):
+    assert store.harvest_state("new topic") == {"next_start": 0, "last_seen": None, "pass_newest": None}
+
+
+def test_harvest_page_saves_papers_and_cursor_together(store):
+    store.save_harvest_page("Topic", [paper("1"), paper("2")], 2, None, "2024-01-01")
+    store.save_harvest_page("topic", [paper("3")], 0, "2024-02-01", None)
+    assert store.harvest_state("TOPIC") == {"next_start": 0, "last_seen": "2024-02-01", "pass_newest": None}
+    assert store.count_topic_papers("topic") == 3
+
+
+def test_failed_harvest_page_leaves_cursor_unchanged(store):
+    store.save_harvest_page("topic", [paper("1")], 1, None, "2024-01-01")
+    broken = {"arxiv_id": "2"}  # no title or authors
+    with pytest.raises(KeyError):
+        store.save_harvest_page("topic", [paper("3"), broken], 3, None, "2024-03-01")
+    assert store.harvest_state("topic")["next_start"] == 1
+    assert store.count_topic_papers("topic") == 1
+    assert store.get_paper("3") is None
+
+
+def test_chunks_round_trip(store):
+    assert store.chunk_count("1") is None
+    assert store.get_chunks("1") is None
+    store.save_chunks("1", ["first chunk", "second chunk"], 1234)
+    assert store.has_text("1")
+    assert store.chunk_count("1") == 2
+    assert store.get_chunks("1") == ["first chunk", "second chunk"]
+    store.save_chunks("1", ["replaced"], 10)
+    assert store.get_chunks("1") == ["replaced"]
+
+
+def write_legacy(paper_dir, topic, papers):
+    (paper_dir / topic).mkdir(parents=True)
+    (paper_dir / topic / "papers_info.json").write_text(json.dumps(papers))
+
+
+def test_migrate_json_dir_imports_once(store, tmp_path):
+    paper_dir = tmp_path / "papers"
+    legacy = paper("1")
+    del legacy["arxiv_id"]
+    write_legacy(paper_dir, "graphs", {"1": legacy, "2": paper("2")})
+    (paper_dir / "broken").mkdir()
+    (paper_dir / "broken" / "papers_info.json").write_text("{")
+
+    assert store.migrate_json_dir(str(paper_dir)) == 2
+    assert store.get_paper("1")["title"] == "Paper 1"
+    assert store.count_topic_papers("graphs") == 2
+
+    write_legacy(paper_dir, "later", {"3": paper("3")})
+    assert store.migrate_json_dir(str(paper_dir)) == 0
+    assert store.get_paper("3") is None
+
+
+def test_migrate_json_dir_without_directory(store, tmp_path):
+    assert store.migrate_json_dir(str(tmp_path / "missing")) == 0
+
+
+def test_unused_author_table_is_dropped(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE paper_authors (arxiv_id TEXT, position INTEGER, name TEXT)")
+    conn.commit()
+    conn.close()
+    store = PaperStore(path)
+    tables = {row[0] for row in store._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    store.close()
+    assert "paper_authors" not in tables
+    assert "papers" in tables
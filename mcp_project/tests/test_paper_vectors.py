@@ -0,0 +1,49 @@
+import pytest
+
+from paper_vectors import PaperVectors
+
+pytest.importorskip("numpy")
+
+
+def paper(arxiv_id, words):
+    return {"arxiv_id": arxiv_id, "title": words, "summary": words}
+
+
+def test_similar_ranks_by_shared_terms(tmp_path):
+    vectors = PaperVectors(str(tmp_path / "vectors.f32"), dim=256)
+    vectors.add_many([
+        paper("graphs", "graph neural networks message passing"),
+        paper("vision", "convolutional image classification"),
+        paper("more-graphs", "message passing on graph networks"),
+    ])
+    (ranked,) = vectors.similar(["graphs"])
+    assert [arxiv_id for _, arxiv_id in ranked] == ["more-graphs"]
+
+
+def test_corrupt_meta_is_rebuilt(tmp_path):
+    path = str(tmp_path / "vectors.f32")
+    PaperVectors(path, dim=256).add_many([paper("1", "graph networks")])
+    with open(path + ".json", "w") as f:
+        f.write('{"dim": 256, "ids": ["1"')
+
+    vectors = PaperVectors(path, dim=256)
+    assert len(vectors) == 0
+    vectors.add_many([paper("2", "image classification")])
+    assert len(PaperVectors(path, dim=256)) == 1
+
+
+def test_writers_sharing_files_never_reuse_a_row(tmp_path):
+    path = str(tmp_path / "vectors.f32")
+    # Two processes' views of the same files
+    first = PaperVectors(path, dim=256)
+    second = PaperVectors(path, dim=256)
+    first.add_many([paper("a", "graph neural networks")])
+    second.add_many([paper("b", "image classification")])
+    first.add_many([paper("c", "reinforcement learning agents"), paper("b", "image classification")])
+
+    assert "b" in first
+    reopened = PaperVectors(path, dim=256)
+    assert reopened._ids == ["a", "b", "c"]
+    for arxiv_id, words in [("a", "graph neural networks"), ("b", "image classification")]:
+        (ranked,) = reopened.similar([words])
+        assert ranked[0][1] == arxiv_id
@@ -0,0 +1,158 @@
+import asyncio
+import http.server
+import threading
+
+import pytest
+
+import pdf_ingest
+from conftest import make_pdf
+from paper_store import PaperStore
+from pdf_ingest import PdfIngestor, chunk_text
+
+WORDS = " ".join(f"word{i}" for i in range(400))
+
+
+def test_chunk_text_short_text_is_one_chunk():
+    assert chunk_text("  Just   a\tline.  ") == ["Just a line."]
+    assert chunk_text("   ") == []
+
+
+def test_chunk_text_respects_size_and_overlap():
+    chunks = chunk_text(WORDS, chunk_chars=300, overlap=50)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        # Chunks end and start on whole words and share some of them
+        first_word = current.split()[0]
+        assert first_word in previous.split()
+    assert chunks[-1].endswith("word399")
+
+
+def test_chunk_text_prefers_paragraph_then_sentence_boundaries():
+    paragraph = "First paragraph sentence one. " * 5
+    text = f"{paragraph.strip()}\n\n   \n{paragraph.strip()}"
+    chunks = chunk_text(text, chunk_chars=200, overlap=0)
+    assert chunks[0] == paragraph.strip()
+    sentences = chunk_text("Aaaa bbbb cccc. " * 20, chunk_chars=100, overlap=0)
+    assert all(chunk.endswith(".") for chunk in sentences[:-1])
+
+
+def test_chunk_text_without_spaces_still_progresses():
+    chunks = chunk_text("x" * 1000, chunk_chars=300, overlap=100)
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert "".join(chunk[:200] for chunk in chunks).startswith("x" * 600)
+
+
+class PdfServer:
+    """Serves fixed bodies by path and counts requests."""
+
+    def __init__(self, bodies):
+        self.requests = 0
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                body = bodies.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._server.server_address[1]}{path}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def pdf_server():
+    server = PdfServer({
+        "/paper.pdf": make_pdf(["Attention is computed per head.", "Results improve on baselines."]),
+        "/page.html": b"<html>not a pdf</html>",
+        "/empty.pdf": make_pdf([""]),
+    })
+    yield server
+    server.stop()
+
+
+async def ingest(ingestor, *args):
+    try:
+        return await ingestor.ingest(*args)
+    finally:
+        await ingestor.aclose()
+
+
+def test_extract_text_reads_every_page():
+    pytest.importorskip("pypdf")
+    text = pdf_ingest.extract_text(make_pdf(["First page (one).", "Second page."]))
+    assert "First page (one)." in text
+    assert "Second page." in text
+
+
+def test_ingest_downloads_extracts_and_stores(store, pdf_server):
+    pytest.importorskip("pypdf")
+    ingestor = PdfIngestor(store, max_workers=1)
+    assert asyncio.run(ingest(ingestor, "2401.00001", pdf_server.url("/paper.pdf"))) == 1
+    assert "Attention is computed per head." in store.get_chunks("2401.00001")[0]
+
+
+def test_concurrent_ingests_share_one_download(store, pdf_server):
+    pytest.importorskip("pypdf")
+    ingestor = PdfIngestor(store, max_workers=1)
+
+    async def scenario():
+        try:
+            url = pdf_server.url("/paper.pdf")
+            return await asyncio.gather(*[ingestor.ingest("2401.00001", url) for _ in range(3)])
+        finally:
+            await ingestor.aclose()
+
+    assert asyncio.run(scenario()) == [1, 1, 1]
+    assert pdf_server.requests == 1
+
+
+def test_ingested_paper_needs_neither_download_nor_pypdf(store, pdf_server, monkeypatch):
+    store.save_chunks("2401.00001", ["a", "b", "c"], 100)
+    monkeypatch.setattr(pdf_ingest, "PdfReader", None)
+    ingestor = PdfIngestor(store)
+    assert asyncio.run(ingest(ingestor, "2401.00001", pdf_server.url("/paper.pdf"))) == 3
+    assert pdf_server.requests == 0
+
+
+def test_missing_pypdf_is_reported_for_new_papers(store, monkeypatch):
+    monkeypatch.setattr(pdf_ingest, "PdfReader", None)
+    with pytest.raises(RuntimeError, match="pypdf"):
+        asyncio.run(ingest(PdfIngestor(store), "2401.00001"))
+
+
+@pytest.mark.parametrize("path, max_bytes, message", [
+    ("/page.html", 1024 * 1024, "did not return a PDF"),
+    ("/paper.pdf", 100, "larger than 100 bytes"),
+    ("/empty.pdf", 1024 * 1024, "No text could be extracted"),
+])
+def test_ingest_rejects_bad_downloads(store, pdf_server, path, max_bytes, message):
+    pytest.importorskip("pypdf")
+    ingestor = PdfIngestor(store, max_workers=1, max_bytes=max_bytes)
+    with pytest.raises(ValueError, match=message):
+        asyncio.run(ingest(ingestor, "2401.00001", pdf_server.url(path)))
+    assert not store.has_text("2401.00001")
@@ -0,0 +1,82 @@
+from registry import CapabilityRegistry, UriTemplateTrie
+
+
+def test_trie_matches_templates_by_segment():
+    trie = UriTemplateTrie()
+    trie.insert("papers://{topic}", "topic")
+    trie.insert("papers://{topic}/{page}", "page")
+    assert trie.match("papers://graphs") == "topic"
+    assert trie.match("papers://graphs/2") == "page"
+    assert trie.match("papers://graphs/2/extra") is None
+    assert trie.match("notes://graphs") is None
+
+
+def test_trie_prefers_literal_segments():
+    trie = UriTemplateTrie()
+    trie.insert("papers://{topic}", "topic")
+    trie.insert("papers://folders", "folders")
+    trie.insert("papers://{topic}/json/{page}", "json page")
+    trie.insert("papers://{topic}/{page}", "page")
+    assert trie.match("papers://folders") == "folders"
+    assert trie.match("papers://graphs/json/1") == "json page"
+    assert trie.match("papers://graphs/3") == "page"
+
+
+def test_trie_backtracks_from_dead_end_literal():
+    trie = UriTemplateTrie()
+    trie.insert("papers://folders/json", "folders json")
+    trie.insert("papers://{topic}/{page}", "page")
+    assert trie.match("papers://folders/2") == "page"
+
+
+def test_trie_parameters_need_a_value():
+    trie = UriTemplateTrie()
+    trie.insert("papers://{topic}", "topic")
+    assert trie.match("papers://") is None
+
+
+def test_trie_remove_values():
+    trie = UriTemplateTrie()
+    trie.insert("papers://{topic}", "a")
+    trie.insert("notes://{id}", "b")
+    trie.remove_values(lambda value: value == "a")
+    assert trie.match("papers://graphs") is None
+    assert trie.match("notes://1") == "b"
+
+
+def capabilities(tools=(), prompts=(), resources=(), templates=()):
+    return {
+        "tools": [{"name": name} for name in tools],
+        "prompts": [{"name": name} for name in prompts],
+        "resources": list(resources),
+        "resource_templates": list(templates),
+    }
+
+
+def test_registry_routes_namespaced_names():
+    registry = CapabilityRegistry()
+    registry.register("my_server", capabilities(tools=["search"], prompts=["summarize"]))
+    assert registry.resolve_tool("my_server_search") == ("my_server", "search")
+    assert registry.resolve_tool("search") is None
+    assert registry.resolve_prompt("my_server_summarize") == ("my_server", "summarize")
+
+
+def test_registry_short_prompt_names_only_when_unambiguous():
+    registry = CapabilityRegistry()
+    registry.register("a", capabilities(prompts=["summarize"]))
+    assert registry.resolve_prompt("summarize") == ("a", "summarize")
+    registry.register("b", capabilities(prompts=["summarize"]))
+    assert registry.resolve_prompt("summarize") is None
+    registry.unregister("a")
+    assert registry.resolve_prompt("summarize") == ("b", "summarize")
+
+
+def test_registry_resources_exact_then_templates():
+    registry = CapabilityRegistry()
+    registry.register("research", capabilities(resources=["papers://folders"], templates=["papers://{topic}"]))
+    registry.register("notes", capabilities(resources=["papers://pinned"]))
+    assert registry.resolve_resource("papers://pinned") == "notes"
+    assert registry.resolve_resource("papers://graphs") == "research"
+    registry.unregister("research")
+    assert registry.resolve_resource("papers://graphs") is None
+    assert registry.resolve_resource("papers://pinned") == "notes"
@@ -0,0 +1,188 @@
+"""Research server tools against the fake arXiv endpoint from benchmarks."""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from benchmarks.fake_arxiv import FakeArxiv
+
+
+@pytest.fixture(scope="module")
+def rs(tmp_path_factory):
+    # The server keeps its store and cache relative to the working directory
+    workdir = tmp_path_factory.mktemp("research")
+    cwd = os.getcwd()
+    fake = FakeArxiv().start()
+    saved_env = dict(os.environ)
+    os.environ.update({
+        "ARXIV_API_URL": fake.url,
+        "HARVEST_PAGE_SIZE": "5",
+        "HARVEST_PAGE_DELAY": "0",
+    })
+    os.chdir(workdir)
+    try:
+        sys.modules.pop("research_server", None)
+        module = importlib.import_module("research_server")
+        module.fake_arxiv = fake
+        yield module
+    finally:
+        sys.modules.pop("research_server", None)
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+        fake.stop()
+
+
+@pytest.fixture
+def run(rs):
+    def run(coro):
+        async def scenario():
+            try:
+                return await coro
+            finally:
+                # The HTTP client is bound to the loop, which asyncio.run closes
+                await rs.arxiv_client.aclose()
+        return asyncio.run(scenario())
+    return run
+
+
+def test_search_is_cached_with_its_papers_in_one_write(rs, run, monkeypatch):
+    saves = []
+    save = rs.arxiv_cache._save
+    monkeypatch.setattr(rs.arxiv_cache, "_save", lambda: (saves.append(1), save()))
+    requests = rs.fake_arxiv.requests
+
+    first = json.loads(run(rs.search_papers.fn("cached topic", max_results=3, format="json")))
+    second = json.loads(run(rs.search_papers.fn("cached topic", max_results=3, format="json")))
+
+    assert first["papers"] == second["papers"]
+    assert len(first["papers"]) == 3
+    assert rs.fake_arxiv.requests == requests + 1
+    rs.arxiv_cache.flush()
+    assert len(saves) == 1
+    # The search's papers were cached too, so extracting one skips arXiv
+    run(rs.extract_info.fn(first["papers"][0]["arxiv_id"]))
+    assert rs.fake_arxiv.requests == requests + 1
+
+
+def test_cache_hits_skip_storing_papers(rs, run, monkeypatch):
+    run(rs.search_papers.fn("stored once", max_results=3))
+    stored = []
+    monkeypatch.setattr(rs.paper_store, "upsert_papers", lambda topic, papers: stored.append(topic))
+    run(rs.search_papers.fn("stored once", max_results=3))
+    assert stored == []
+    assert rs.paper_store.count_topic_papers("stored once") == 3
+
+
+def test_extract_info_batch_reports_errors_per_chunk(rs, run, monkeypatch):
+    monkeypatch.setattr(rs, "ARXIV_ID_CHUNK_SIZE", 2)
+    fetch_ids = rs.arxiv_client.fetch_ids
+
+    async def flaky_fetch_ids(paper_ids):
+        if "2499.00003v1" in paper_ids:
+            raise RuntimeError("arXiv returned 503")
+        return await fetch_ids(paper_ids)
+
+    monkeypatch.setattr(rs.arxiv_client, "fetch_ids", flaky_fetch_ids)
+    ids = ["2499.00001v1", "2499.00002v1", "2499.00003v1", "2499.00004v1"]
+    # Found papers are returned, but the call is flagged as failed
+    with pytest.raises(ToolError) as failed:
+        run(rs.extract_info_batch.fn(ids, format="json"))
+    result = json.loads(str(failed.value))
+
+    by_id = {paper["arxiv_id"]: paper for paper in result["papers"]}
+    assert "error" not in by_id["2499.00001v1"]
+    assert "error" not in by_id["2499.00002v1"]
+    assert by_id["2499.00003v1"]["error"] == "arXiv returned 503"
+    assert by_id["2499.00004v1"]["error"] == "arXiv returned 503"
+
+
+def test_failures_raise_tool_errors(rs, run, monkeypatch):
+    async def outage(*args, **kwargs):
+        raise RuntimeError("arXiv unavailable")
+
+    monkeypatch.setattr(rs.arxiv_client, "search", outage)
+    with pytest.raises(ToolError, match="Error searching for papers: arXiv unavailable"):
+        run(rs.search_papers.fn("outage topic"))
+    with pytest.raises(ToolError, match='"error":"Unknown fields color'):
+        run(rs.search_papers.fn("outage topic", format="json", fields=["color"]))
+
+
+class NewestFirstArxiv:
+    """Search results for one topic, newest first like sort_by=submittedDate."""
+
+    def __init__(self, dates):
+        self.papers = []
+        self.add(dates)
+
+    def add(self, dates):
+        new = [{
+            "arxiv_id": f"2401.{len(self.papers) + i:05d}", "title": f"Paper from {date}",
+            "authors": ["A. Author"], "published": date, "summary": "Summary.", "pdf_url": "",
+        } for i, date in enumerate(dates)]
+        self.papers = sorted(self.papers + new, key=lambda p: p["published"], reverse=True)
+
+    async def search(self, topic, max_results, sort_by, start=0):
+        return self.papers[start:start + max_results]
+
+
+def test_harvest_first_pass_keeps_the_newest_papers(rs, run, monkeypatch):
+    arxiv = NewestFirstArxiv([f"2024-01-{day:02d}" for day in range(1, 13)])
+    monkeypatch.setattr(rs.arxiv_client, "search", arxiv.search)
+
+    first = run(rs._harvest("dated topic", 5))
+    assert first == {
+        "new": 5, "pages": 1, "complete": True, "next_start": 0, "last_seen": "2024-01-12", "total": 5,
+    }
+
+    # More new papers than one call may fetch: the pass stops and resumes
+    arxiv.add([f"2024-02-{day:02d}" for day in range(1, 9)])
+    second = run(rs._harvest("dated topic", 5))
+    assert not second["complete"]
+    assert second["new"] == 5
+    assert second["next_start"] == 5
+    assert second["last_seen"] == "2024-01-12"
+
+    third = run(rs._harvest("dated topic", 5))
+    assert third["complete"]
+    assert third["new"] == 3
+    assert third["last_seen"] == "2024-02-08"
+    assert third["total"] == 13
+
+    # Nothing new: one page, stopped at the previous pass's newest paper
+    fourth = run(rs._harvest("dated topic", 5))
+    assert (fourth["new"], fourth["pages"], fourth["complete"]) == (0, 1, True)
+
+
+def test_refresh_harvest_stops_at_stored_papers(rs, run, monkeypatch):
+    arxiv = NewestFirstArxiv([f"2024-03-{day:02d}" for day in range(1, 21)])
+    monkeypatch.setattr(rs.arxiv_client, "search", arxiv.search)
+    # Stored by an earlier search, without any harvest of the topic
+    rs.paper_store.upsert_papers("searched topic", arxiv.papers[:2])
+    arxiv.add(["2024-04-01", "2024-04-02"])
+
+    result = run(rs._harvest("searched topic", 10, newer_than_stored=True))
+    assert result["complete"]
+    assert result["new"] == 2
+    assert result["last_seen"] == "2024-04-02"
+
+
+def test_find_similar_papers_skips_ids_missing_from_the_store(rs, run):
+    if not rs.paper_vectors.available:
+        pytest.skip("numpy is not installed")
+    run(rs.search_papers.fn("similar topic", max_results=3))
+    rs.paper_vectors.add_many([{
+        "arxiv_id": "ghost", "title": "Benchmark paper on similar topic",
+        "summary": "We study similar topic with a method evaluated on standard benchmarks.",
+    }])
+
+    result = json.loads(rs.find_similar_papers.fn(query="similar topic benchmarks", format="json"))
+    found = [paper["arxiv_id"] for paper in result["results"][0]["papers"]]
+    assert found
+    assert "ghost" not in found
+    assert "ghost" not in rs.find_similar_papers.fn(query="similar topic benchmarks")
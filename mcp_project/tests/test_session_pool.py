@@ -0,0 +1,84 @@
+"""Session pool against the stub MCP server from benchmarks."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from session_pool import PoolBusyError, ServerPool
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "stub_server.py")
+
+
+def stub_config(**env):
+    return {"command": sys.executable, "args": [STUB_SERVER], "env": {**os.environ, **env}}
+
+
+def test_full_queue_is_rejected_and_waiters_time_out():
+    async def scenario():
+        pool = ServerPool("stub", stub_config(), {
+            "maxConcurrentPerSession": 1, "maxQueue": 1, "acquireTimeout": 0.5
+        })
+        try:
+            async def call(delay_ms):
+                async with pool.acquire() as session:
+                    return await session.call_tool("echo", {"text": "hi", "delay_ms": delay_ms})
+
+            busy = asyncio.create_task(call(2000))
+            await asyncio.sleep(0.1)
+            queued = asyncio.create_task(call(0))
+            await asyncio.sleep(0.1)
+            with pytest.raises(PoolBusyError):
+                await call(0)
+            with pytest.raises(TimeoutError):
+                await queued
+            result = await busy
+            assert result.content[0].text == "hi"
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_crashed_server_is_detected_and_replaced():
+    async def scenario():
+        pool = ServerPool("stub", stub_config())
+        connection = pool.connections[0]
+        try:
+            async with pool.acquire() as session:
+                await session.call_tool("echo", {"text": "first"})
+            async with pool.acquire() as session:
+                asyncio.create_task(session.call_tool("crash"))
+            for _ in range(50):
+                if connection.crashed:
+                    break
+                await asyncio.sleep(0.1)
+            assert connection.crashed
+            assert not connection.is_running
+
+            async with pool.acquire() as session:
+                result = await session.call_tool("echo", {"text": "again"})
+            assert result.content[0].text == "again"
+            assert not connection.crashed
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+
+def test_slow_start_times_out_and_backs_off():
+    async def scenario():
+        pool = ServerPool("stub", stub_config(STUB_STARTUP_MS="5000"), {"startTimeout": 0.5})
+        connection = pool.connections[0]
+        try:
+            with pytest.raises(TimeoutError, match="did not initialize"):
+                async with pool.acquire():
+                    pass
+            assert connection.failures == 1
+            assert connection.retry_in() > 0
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
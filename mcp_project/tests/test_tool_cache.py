@@ -0,0 +1,73 @@
+from mcp import types
+
+from tool_cache import ToolResultCache, canonical_arguments
+
+RULES = {
+    "research": {"search_papers": {"ttl": 60}},
+    "fetch": {"*": {"ttl": 10}},
+}
+
+
+def text(value):
+    return [types.TextContent(type="text", text=value)]
+
+
+def test_from_config_is_opt_in():
+    assert ToolResultCache.from_config({}) is None
+    assert ToolResultCache.from_config({"enabled": False, "tools": RULES}) is None
+    cache = ToolResultCache.from_config({"enabled": True, "tools": RULES, "maxBytes": 100})
+    assert cache.max_bytes == 100
+
+
+def test_only_listed_tools_are_cached():
+    cache = ToolResultCache(RULES)
+    assert cache.ttl_for("research", "search_papers") == 60
+    assert cache.ttl_for("research", "harvest_topic") is None
+    assert cache.ttl_for("fetch", "anything") == 10
+    cache.put("research", "harvest_topic", {}, text("result"))
+    assert cache.get("research", "harvest_topic", {}) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_arguments_are_normalized():
+    assert canonical_arguments({"b": 1, "a": [1, 2]}) == canonical_arguments({"a": [1, 2], "b": 1})
+    assert canonical_arguments(None) == canonical_arguments({})
+    cache = ToolResultCache(RULES)
+    cache.put("research", "search_papers", {"topic": "graphs", "max_results": 5}, text("result"))
+    assert cache.get("research", "search_papers", {"max_results": 5, "topic": "graphs"}) == text("result")
+    assert cache.get("research", "search_papers", {"topic": "graphs", "max_results": 6}) is None
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("tool_cache.time.monotonic", lambda: now[0])
+    cache = ToolResultCache(RULES)
+    cache.put("research", "search_papers", {}, text("result"))
+    now[0] += 59
+    assert cache.get("research", "search_papers", {}) == text("result")
+    now[0] += 2
+    assert cache.get("research", "search_papers", {}) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_errors_are_never_cached():
+    cache = ToolResultCache(RULES)
+    cache.put("research", "search_papers", {}, text("Error searching for papers: 503"), is_error=True)
+    assert cache.get("research", "search_papers", {}) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used_past_byte_budget():
+    entry_size = len(text("x" * 100)[0].model_dump_json())
+    cache = ToolResultCache(RULES, max_bytes=entry_size * 2)
+    cache.put("fetch", "fetch", {"url": "a"}, text("x" * 100))
+    cache.put("fetch", "fetch", {"url": "b"}, text("x" * 100))
+    cache.get("fetch", "fetch", {"url": "a"})
+    cache.put("fetch", "fetch", {"url": "c"}, text("x" * 100))
+    assert cache.get("fetch", "fetch", {"url": "b"}) is None
+    assert cache.get("fetch", "fetch", {"url": "a"}) is not None
+    assert cache.stats()["evictions"] == 1
+    # Results larger than the whole budget are not stored at all
+    cache.put("fetch", "fetch", {"url": "d"}, text("x" * 1000))
+    assert cache.get("fetch", "fetch", {"url": "d"}) is None
@@ -0,0 +1,82 @@
+import asyncio
+
+from topic_scheduler import TopicScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def scheduler(monkeypatch, refresh, topics, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr("topic_scheduler.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("topic_scheduler.time.time", clock.monotonic)
+    monkeypatch.setattr("topic_scheduler.asyncio.sleep", clock.sleep)
+    monkeypatch.setattr("topic_scheduler.random.uniform", lambda low, high: 0.0)
+    return TopicScheduler(refresh, lambda: topics, interval=100, **kwargs), clock
+
+
+def test_due_topics_are_refreshed_once_per_interval(monkeypatch):
+    refreshed = []
+
+    async def refresh(topic):
+        refreshed.append(topic)
+
+    topics = ["graphs", "agents"]
+    sched, clock = scheduler(monkeypatch, refresh, topics, min_gap=3.0)
+    assert asyncio.run(sched.run_once()) == 2
+    assert refreshed == ["graphs", "agents"]
+    # The second refresh waited out the minimum gap
+    assert clock.now == 1003.0
+
+    assert asyncio.run(sched.run_once()) == 0
+    clock.now += 100
+    assert asyncio.run(sched.run_once()) == 2
+    assert sched.refreshes == 4
+
+    # Topics dropped from the watchlist are no longer scheduled
+    topics.remove("agents")
+    asyncio.run(sched.run_once())
+    assert list(sched.status()["topics"]) == ["graphs"]
+
+
+def test_failed_refresh_waits_for_the_next_interval(monkeypatch):
+    calls = []
+
+    async def refresh(topic):
+        calls.append(topic)
+        raise RuntimeError("arXiv unavailable")
+
+    sched, clock = scheduler(monkeypatch, refresh, ["graphs"])
+    assert asyncio.run(sched.run_once()) == 1
+    assert asyncio.run(sched.run_once()) == 0
+    assert calls == ["graphs"]
+    assert sched.failures == 1
+    assert sched.refreshes == 0
+    assert sched.status()["topics"]["graphs"]["last_error"] == "arXiv unavailable"
+
+
+def test_status_reports_each_topic(monkeypatch):
+    async def refresh(topic):
+        if topic == "broken":
+            raise RuntimeError("timeout")
+
+    sched, clock = scheduler(monkeypatch, refresh, ["graphs", "broken"], min_gap=0)
+    asyncio.run(sched.run_once())
+    clock.now += 40
+    assert sched.status() == {
+        "interval_seconds": 100,
+        "refreshes": 1,
+        "failures": 1,
+        "topics": {
+            "broken": {"last_refreshed": 1000.0, "next_in_seconds": 60.0, "last_error": "timeout"},
+            "graphs": {"last_refreshed": 1000.0, "next_in_seconds": 60.0, "last_error": None},
+        },
+    }
@@ -0,0 +1,112 @@
+"""
+Client-side cache for MCP tool results.
+
+Only tools listed in the "toolCache" section of server_config.json are
+cached, each with its own TTL. Entries are evicted least-recently-used once
+the cache grows past its byte budget.
+"""
+
+import json
+import time
+from collections import OrderedDict
+
+
+def canonical_arguments(arguments):
+    """Serialize tool arguments so equal arguments give equal keys."""
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _content_size(content):
+    size = 0
+    for item in content:
+        if hasattr(item, "model_dump_json"):
+            size += len(item.model_dump_json())
+        else:
+            size += len(json.dumps(item, default=str))
+    return size
+
+
+class ToolResultCache:
+    """LRU cache of tool results keyed by (server, tool, arguments)."""
+
+    def __init__(self, rules, max_bytes=10 * 1024 * 1024):
+        # rules maps server name -> tool name (or "*") -> {"ttl": seconds}
+        self.rules = rules
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a cache from the "toolCache" config section, or None if disabled."""
+        if not config.get("enabled", False):
+            return None
+        return cls(
+            config.get("tools", {}),
+            max_bytes=config.get("maxBytes", 10 * 1024 * 1024),
+        )
+
+    def ttl_for(self, server, tool):
+        """Return the TTL for a tool, or None if it is not cacheable."""
+        server_rules = self.rules.get(server, {})
+        rule = server_rules.get(tool, server_rules.get("*"))
+        if not rule:
+            return None
+        return rule.get("ttl")
+
+    def get(self, server, tool, arguments):
+        """Return cached content for the call, or None."""
+        if self.ttl_for(server, tool) is None:
+            return None
+        key = (server, tool, canonical_arguments(arguments))
+        entry = self._entries.get(key)
+        if entry is None or entry["expires_at"] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["content"]
+
+    def put(self, server, tool, arguments, content, is_error=False):
+        """Store content for the call if the tool is cacheable and succeeded."""
+        ttl = self.ttl_for(server, tool)
+        if ttl is None or is_error:
+            return
+        size = _content_size(content)
+        if size > self.max_bytes:
+            return
+        key = (server, tool, canonical_arguments(arguments))
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = {
+            "content": content,
+            "size": size,
+            "expires_at": time.monotonic() + ttl,
+        }
+        self._size += size
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry["size"]
+
+    def stats(self):
+        """Return hit/miss counters and memory use."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,83 @@
+"""
+Background refresh of watched topics for the research server.
+
+Every topic on the watchlist is refreshed as soon as it is first seen and
+then once per interval, stretched or shortened by random jitter so topics
+added together drift apart. Refreshes run one at a time with a minimum gap
+between them, which keeps the load on arXiv polite.
+"""
+
+import asyncio
+import random
+import time
+
+# Longest the scheduler sleeps before looking for newly watched topics
+POLL_SECONDS = 60.0
+
+
+class TopicScheduler:
+    """Calls refresh(topic) for each topic in watchlist() on a schedule."""
+
+    def __init__(self, refresh, watchlist, interval, jitter=0.1, min_gap=3.0):
+        self.refresh = refresh
+        self.watchlist = watchlist
+        self.interval = interval
+        self.jitter = jitter
+        self.min_gap = min_gap
+        self.refreshes = 0
+        self.failures = 0
+        self._next_due = {}
+        self._last_run = {}
+        self._last_error = {}
+        self._last_refresh_at = 0.0
+
+    def _schedule(self, topic):
+        spread = random.uniform(-self.jitter, self.jitter)
+        self._next_due[topic] = time.monotonic() + self.interval * (1 + spread)
+
+    async def run_once(self):
+        """Refresh every watched topic that is due; return how many were."""
+        topics = self.watchlist()
+        for topic in list(self._next_due):
+            if topic not in topics:
+                del self._next_due[topic]
+
+        due = [t for t in topics if self._next_due.get(t, 0.0) <= time.monotonic()]
+        for topic in due:
+            wait = self._last_refresh_at + self.min_gap - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self.refresh(topic)
+                self.refreshes += 1
+                self._last_error.pop(topic, None)
+            except Exception as e:
+                self.failures += 1
+                self._last_error[topic] = str(e)
+            self._last_refresh_at = time.monotonic()
+            self._last_run[topic] = time.time()
+            self._schedule(topic)
+        return len(due)
+
+    async def run(self):
+        """Refresh topics forever, starting with every watched topic."""
+        while True:
+            await self.run_once()
+            next_due = min(self._next_due.values(), default=float("inf"))
+            await asyncio.sleep(max(self.min_gap, min(next_due - time.monotonic(), POLL_SECONDS)))
+
+    def status(self):
+        now = time.monotonic()
+        return {
+            "interval_seconds": self.interval,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "topics": {
+                topic: {
+                    "last_refreshed": self._last_run.get(topic),
+                    "next_in_seconds": round(max(0.0, due - now), 1),
+                    "last_error": self._last_error.get(topic),
+                }
+                for topic, due in sorted(self._next_due.items())
+            },
+        }
@@ -0,0 +1,216 @@
+"""
+Latency tracing for the chatbot and the research server.
+
+Wrap an operation in tracer.span("tool.call", server=..., tool=...) to time
+it. Every finished span is added to a latency histogram, exported in
+Prometheus text format by render_prometheus(), and, when TRACE_LOG is set,
+written as one JSON line to that file ("-" for stderr). Spans opened while
+another is active in the same task become its children, so the lines of one
+chatbot query share a trace_id.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# File to append JSON span records to; "-" writes to stderr
+TRACE_LOG = os.environ.get("TRACE_LOG")
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Span attributes that become histogram labels; the rest only go to the log
+LABEL_KEYS = ("server", "tool", "resource", "prompt")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _jsonable(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return str(value)
+
+
+def payload_size(value):
+    """Approximate size in bytes of a value serialized as JSON."""
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    try:
+        return len(json.dumps(value, default=_jsonable))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+
+
+class Span:
+    """One timed operation and the attributes recorded for it."""
+
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error):
+        """Mark the span as failed without raising."""
+        self.error = str(error)
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+class Tracer:
+    """Records spans into histograms and an optional JSON log."""
+
+    def __init__(self, service, log_path=None):
+        self.service = service
+        self.log_path = log_path
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time the enclosed block as a span called name."""
+        span = Span(name, attributes, _current_span.get())
+        token = _current_span.set(span)
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            self._record(span, started_at, time.perf_counter() - start)
+
+    def count(self, name, value=1, **labels):
+        """Add value to the counter name with the given labels."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def _record(self, span, started_at, duration):
+        labels = [("span", span.name)]
+        labels += [
+            (key, span.attributes[key]) for key in LABEL_KEYS
+            if span.attributes.get(key) is not None
+        ]
+        labels.append(("status", "error" if span.error else "ok"))
+        with self._lock:
+            self._histograms.setdefault(tuple(labels), _Histogram()).observe(duration)
+        if self.log_path:
+            self._write({
+                "ts": started_at,
+                "service": self.service,
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "duration_ms": round(duration * 1000, 3),
+                "status": "error" if span.error else "ok",
+                "error": span.error,
+                **span.attributes,
+            })
+
+    def _write(self, record):
+        line = json.dumps(record, default=_jsonable) + "\n"
+        with self._lock:
+            # Never stdout: stdio MCP servers use it for the protocol
+            if self.log_path == "-":
+                sys.stderr.write(line)
+                sys.stderr.flush()
+            else:
+                with open(self.log_path, "a") as f:
+                    f.write(line)
+
+    def render_prometheus(self):
+        """Histograms and counters in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {labels: (list(h.buckets), h.count, h.sum) for labels, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = [
+            "# HELP mcp_span_duration_seconds Duration of traced operations.",
+            "# TYPE mcp_span_duration_seconds histogram",
+        ]
+        for labels, (buckets, count, total) in sorted(histograms.items()):
+            label_text = _format_labels(labels)
+            for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f'mcp_span_duration_seconds_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+            lines.append(f'mcp_span_duration_seconds_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"mcp_span_duration_seconds_sum{{{label_text}}} {total}")
+            lines.append(f"mcp_span_duration_seconds_count{{{label_text}}} {count}")
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE mcp_{name}_total counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"mcp_{name}_total{{{_format_labels(labels)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def traced(name, label="tool"):
+    """
+    Decorator recording a span around every call of a function.
+
+    The span is labelled with the function's name under label and records
+    the size of its arguments and result. Works for plain and async functions.
+    """
+    def decorator(fn):
+        def start(kwargs):
+            return tracer.span(name, **{label: fn.__name__}, args_bytes=payload_size(kwargs))
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with start(kwargs) as span:
+                    result = await fn(*args, **kwargs)
+                    span.set(result_bytes=payload_size(result))
+                    return result
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with start(kwargs) as span:
+                    result = fn(*args, **kwargs)
+                    span.set(result_bytes=payload_size(result))
+                    return result
+        return wrapper
+    return decorator
+
+
+# One tracer per process, named after the script that was run
+tracer = Tracer(os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0], TRACE_LOG)